@@ -8,7 +8,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import utilities
 try:
-    from utils import GroqClient, TicketManager, KnowledgeBase
+    from utils.jobs import get_shared_job_queue, get_shared_worker_pool
+    from utils.resources import get_shared_groq_client, get_shared_knowledge_base, get_shared_ticket_manager
 except ImportError as e:
     st.error(f"❌ Failed to import required modules: {e}")
     st.info("Please ensure all files in the 'utils' folder are present.")
@@ -51,23 +52,35 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
+# Initialize session state; the objects themselves are shared by every session
+if 'ticket_manager' not in st.session_state:
+    st.session_state.ticket_manager = get_shared_ticket_manager()
+
+if 'knowledge_base' not in st.session_state:
+    st.session_state.knowledge_base = get_shared_knowledge_base()
+
 if 'groq_client' not in st.session_state:
     try:
-        st.session_state.groq_client = GroqClient()
+        st.session_state.groq_client = get_shared_groq_client(
+            st.session_state.ticket_manager, st.session_state.knowledge_base
+        )
     except ValueError as e:
         st.error(f"⚠️ {e}")
         st.stop()
 
-if 'ticket_manager' not in st.session_state:
-    st.session_state.ticket_manager = TicketManager()
-
-if 'knowledge_base' not in st.session_state:
-    st.session_state.knowledge_base = KnowledgeBase()
-
 if 'current_analysis' not in st.session_state:
     st.session_state.current_analysis = None
 
+# Analyses stream inline so the first fields show up within a few hundred ms;
+# HELPDESK_ANALYSIS_QUEUE=on runs them on the shared background workers instead.
+USE_JOB_QUEUE = os.getenv("HELPDESK_ANALYSIS_QUEUE", "off").lower() in ("1", "on", "true")
+if USE_JOB_QUEUE:
+    job_queue = get_shared_job_queue()
+    get_shared_worker_pool(st.session_state.ticket_manager, st.session_state.groq_client)
+
+if 'analysis_job' not in st.session_state:
+    st.session_state.analysis_job = None
+
 # Header
 st.markdown('<div class="main-header">🎫 Smart AI Helpdesk System</div>', unsafe_allow_html=True)
 
@@ -82,6 +95,39 @@ with st.sidebar:
     st.metric("Total Tickets", stats['total_tickets'])
     st.metric("AI Resolution Rate", f"{stats['resolution_rate']:.1f}%")
     st.metric("Escalated", stats['escalated'])
+    cache_stats = st.session_state.groq_client.get_cache_stats()
+    st.metric("Analysis Cache Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+
+    with st.expander("LLM Usage"):
+        llm_metrics = st.session_state.groq_client.get_metrics()
+        st.metric("Total Tokens", f"{llm_metrics['total_tokens']:,}")
+        st.metric("p95 Latency", f"{llm_metrics['latency_p95']:.2f}s")
+        st.metric("p95 Time to First Token", f"{llm_metrics['first_token_p95']:.2f}s")
+        st.caption(
+            f"{llm_metrics['calls']} calls · {llm_metrics['retries']} retries · "
+            f"{llm_metrics['errors']} errors · {llm_metrics['coalesced']} shared in-flight"
+        )
+        scheduler_stats = st.session_state.groq_client.get_scheduler_stats()
+        st.caption(
+            f"Rate limiter: {scheduler_stats['queued']} waiting · p95 wait "
+            f"{scheduler_stats['interactive_wait_p95']:.2f}s interactive, "
+            f"{scheduler_stats['batch_wait_p95']:.2f}s batch"
+        )
+        breaker_stats = st.session_state.groq_client.get_breaker_stats()
+        st.caption(
+            f"Circuit breaker: {breaker_stats['state'].replace('_', '-')} · {breaker_stats['trips']} trips · "
+            f"{llm_metrics['fallbacks']} fallback answers"
+        )
+
+    if breaker_stats['state'] != 'closed':
+        st.warning("⚠️ The AI service is having trouble. Answers come from local data until it recovers.")
+
+    if USE_JOB_QUEUE:
+        with st.expander("Analysis Queue"):
+            job_counts = job_queue.counts()
+            st.metric("Waiting", job_counts['pending'])
+            st.metric("Running", job_counts['running'])
+            st.caption(f"{job_counts['done']:,} done · {job_counts['dead']} failed permanently")
     
     st.markdown("---")
     st.info("💡 **Tip**: Describe your IT issue clearly for best results!")
@@ -115,72 +161,197 @@ user_query = st.text_area(
     placeholder="Example: My laptop screen is flickering and showing weird colors..."
 )
 
+CATEGORY_ICONS = {
+    'Software': '🖥️',
+    'Hardware': '💻',
+    'Network': '🌐',
+    'Login/Access': '🔐',
+    'Other': '📋'
+}
+URGENCY_ICONS = {
+    'High': '🔴',
+    'Medium': '🟡',
+    'Low': '🟢'
+}
+
+
+def show_related(analysis: dict, user_query: str):
+    """Show related knowledge base articles and the recommended department."""
+    kb_articles = [
+        article for article in st.session_state.knowledge_base.search(user_query, k=3)
+        if article['title'] not in analysis.get('knowledge_base_articles', [])
+    ]
+    if analysis.get('knowledge_base_articles') or kb_articles:
+        st.markdown("### 📚 Related Articles")
+        for article in analysis.get('knowledge_base_articles', []):
+            st.markdown(f"- {article}")
+        for article in kb_articles:
+            with st.expander(f"📄 {article['title']} ({article['category']})"):
+                st.write(article['solution'])
+
+    # Department routing
+    st.markdown("### 🏢 Recommended Department")
+    st.write(f"**{analysis['department']}**")
+
+
+def show_source(analysis: dict):
+    """Caption answers that didn't need a fresh LLM call."""
+    if analysis.get('degraded'):
+        follow_up = " It will be re-analyzed once the service recovers." if analysis.get('ticket_id') else ""
+        st.warning(f"⚠️ AI analysis is unavailable, so this is a provisional answer from local data.{follow_up}")
+        st.caption(analysis.get('fallback_reason', ''))
+    elif analysis.get('source') == 'fast_path':
+        st.caption("⚡ Answered instantly by the local classifier")
+    elif analysis.get('matched_ticket_id'):
+        st.caption(
+            f"♻️ Reused the analysis of similar ticket {analysis['matched_ticket_id']} "
+            f"({analysis['similarity']:.0%} match)"
+        )
+
+
+@st.fragment(run_every=1.0)
+def poll_analysis_job():
+    """Show the queued analysis' progress; rerun the page once it finishes."""
+    job = job_queue.get(st.session_state.analysis_job)
+    if job is not None and job['state'] != 'done' and job['result']:
+        # The LLM is unavailable: show the provisional answer now, the job refines it later.
+        st.session_state.analysis_job = None
+        st.session_state.current_analysis = {
+            'user_query': job['user_query'],
+            'ticket_id': job['ticket_id'],
+            **job['result']
+        }
+        st.rerun()
+    elif job is None or job['state'] == 'dead':
+        st.session_state.analysis_job = None
+        st.session_state.analysis_error = job['error'] if job else "Job not found"
+        st.rerun()
+    elif job['state'] == 'done':
+        st.session_state.analysis_job = None
+        st.session_state.current_analysis = {
+            'user_query': job['user_query'],
+            'ticket_id': job['ticket_id'],
+            **job['result']
+        }
+        st.rerun()
+    elif job['state'] == 'running':
+        st.info(f"🤖 AI is analyzing ticket {job['ticket_id']}...")
+    else:
+        st.info(f"⏳ Ticket {job['ticket_id']} is queued for analysis...")
+    if job and job['error'] and job['state'] != 'done':
+        st.caption(f"Retrying (attempt {job['attempts']} of {job_queue.max_attempts}): {job['error']}")
+
+
 # Analyze button
 if st.button("🔍 Analyze Issue", type="primary"):
     if not user_query.strip():
         st.warning("⚠️ Please describe your issue first!")
+    elif USE_JOB_QUEUE:
+        # Store the ticket now so it survives a restart; the workers fill in the analysis.
+        ticket_id = st.session_state.ticket_manager.save_ticket({
+            'user_query': user_query,
+            'category': '',
+            'urgency': '',
+            'solution': '',
+            'department': '',
+            'status': 'Open',
+            'resolved_by': '',
+            'confidence': None,
+            'source': ''
+        })
+        st.session_state.current_analysis = None
+        st.session_state.analysis_job = job_queue.enqueue(ticket_id, user_query)
     else:
-        with st.spinner("🤖 AI is analyzing your issue..."):
-            analysis = st.session_state.groq_client.analyze_ticket(user_query)
-            
-            if analysis:
-                st.session_state.current_analysis = {
-                    'user_query': user_query,
-                    **analysis
-                }
-                
-                # Display results
-                st.success("✅ Analysis Complete!")
-                
-                # Results in columns
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    category_colors = {
-                        'Software': '🖥️',
-                        'Hardware': '💻',
-                        'Network': '🌐',
-                        'Login/Access': '🔐',
-                        'Other': '📋'
-                    }
-                    st.metric(
-                        "Category",
-                        f"{category_colors.get(analysis['category'], '📋')} {analysis['category']}"
-                    )
-                
-                with col2:
-                    urgency_colors = {
-                        'High': '🔴',
-                        'Medium': '🟡',
-                        'Low': '🟢'
-                    }
-                    st.metric(
-                        "Urgency",
-                        f"{urgency_colors.get(analysis['urgency'], '🟢')} {analysis['urgency']}"
-                    )
-                
-                with col3:
-                    st.metric(
-                        "Confidence",
-                        f"{analysis.get('confidence', 0.95) * 100:.1f}%"
-                    )
-                
-                # Solution
-                st.markdown("### 💡 Suggested Solution")
-                st.info(analysis['solution'])
-                
-                # Knowledge base articles
-                if analysis.get('knowledge_base_articles'):
-                    st.markdown("### 📚 Related Articles")
-                    for article in analysis['knowledge_base_articles']:
-                        st.markdown(f"- {article}")
-                
-                # Department routing
-                st.markdown("### 🏢 Recommended Department")
-                st.write(f"**{analysis['department']}**")
-                
+        st.session_state.current_analysis = None
+        status_slot = st.empty()
+        status_slot.info("🤖 AI is analyzing your issue...")
+        caption_slot = st.empty()
+
+        # Results in columns, filled in as each field streams in
+        col1, col2, col3 = st.columns(3)
+        category_slot = col1.empty()
+        urgency_slot = col2.empty()
+        confidence_slot = col3.empty()
+
+        # Solution
+        st.markdown("### 💡 Suggested Solution")
+        solution_slot = st.empty()
+        solution_text = ""
+
+        analysis = None
+        for event in st.session_state.groq_client.analyze_ticket_stream(user_query):
+            if event['type'] == 'delta' and event['name'] == 'solution':
+                solution_text += event['text']
+                solution_slot.info(solution_text + " ▌")
+            elif event['type'] == 'field' and event['name'] == 'category':
+                category_slot.metric(
+                    "Category", f"{CATEGORY_ICONS.get(event['value'], '📋')} {event['value']}"
+                )
+            elif event['type'] == 'field' and event['name'] == 'urgency':
+                urgency_slot.metric(
+                    "Urgency", f"{URGENCY_ICONS.get(event['value'], '🟢')} {event['value']}"
+                )
+            elif event['type'] == 'field' and event['name'] == 'confidence':
+                confidence_slot.metric("Confidence", f"{event['value'] * 100:.1f}%")
+            elif event['type'] == 'field' and event['name'] == 'solution':
+                solution_slot.info(event['value'])
+            elif event['type'] == 'done':
+                analysis = event['analysis']
+                # Grounded answers expand cited article IDs after streaming.
+                solution_slot.info(analysis['solution'])
+
+        if analysis:
+            st.session_state.current_analysis = {
+                'user_query': user_query,
+                **analysis
+            }
+
+            # Display results
+            if analysis.get('degraded'):
+                status_slot.warning("⚠️ Provisional analysis")
             else:
-                st.error("❌ Failed to analyze ticket. Please try again.")
+                status_slot.success("✅ Analysis Complete!")
+            with caption_slot.container():
+                show_source(analysis)
+            if 'confidence' not in analysis:
+                confidence_slot.metric("Confidence", "95.0%")
+
+            show_related(analysis, user_query)
+
+        else:
+            status_slot.error("❌ Failed to analyze ticket. Please try again.")
+
+if st.session_state.analysis_job:
+    poll_analysis_job()
+
+if st.session_state.get('analysis_error'):
+    st.error(f"❌ Failed to analyze ticket: {st.session_state.pop('analysis_error')}. Please try again.")
+
+# A finished queued analysis stays on screen until it is resolved or escalated.
+if st.session_state.current_analysis and st.session_state.current_analysis.get('ticket_id'):
+    analysis = st.session_state.current_analysis
+    if analysis.get('degraded'):
+        st.warning(f"⚠️ Provisional analysis for ticket {analysis['ticket_id']}")
+    else:
+        st.success(f"✅ Analysis Complete! Ticket {analysis['ticket_id']}")
+    show_source(analysis)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Category", f"{CATEGORY_ICONS.get(analysis['category'], '📋')} {analysis['category']}")
+    col2.metric("Urgency", f"{URGENCY_ICONS.get(analysis['urgency'], '🟢')} {analysis['urgency']}")
+    col3.metric("Confidence", f"{analysis.get('confidence', 0.95) * 100:.1f}%")
+    st.markdown("### 💡 Suggested Solution")
+    st.info(analysis['solution'])
+    show_related(analysis, analysis['user_query'])
+
+
+def record_ticket(ticket_data: dict) -> str:
+    """Save the analyzed ticket, or update it if the job queue already stored it."""
+    ticket_id = ticket_data.pop('ticket_id', None)
+    if ticket_id:
+        st.session_state.ticket_manager.update_ticket(ticket_id, ticket_data)
+        return ticket_id
+    return st.session_state.ticket_manager.save_ticket(ticket_data)
+
 
 # Action buttons
 if st.session_state.current_analysis:
@@ -195,7 +366,7 @@ if st.session_state.current_analysis:
             ticket_data['status'] = 'Resolved'
             ticket_data['resolved_by'] = 'AI'
             
-            ticket_id = st.session_state.ticket_manager.save_ticket(ticket_data)
+            ticket_id = record_ticket(ticket_data)
             
             st.success(f"🎉 Ticket {ticket_id} marked as resolved!")
             st.balloons()
@@ -208,7 +379,7 @@ if st.session_state.current_analysis:
             ticket_data['status'] = 'Escalated'
             ticket_data['resolved_by'] = 'Escalated'
             
-            ticket_id = st.session_state.ticket_manager.save_ticket(ticket_data)
+            ticket_id = record_ticket(ticket_data)
             
             st.success(f"📨 Ticket {ticket_id} escalated to {ticket_data['department']}!")
             st.session_state.current_analysis = None
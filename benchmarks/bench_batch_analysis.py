@@ -0,0 +1,53 @@
+"""Compare serial and batched ticket analysis against the fake Groq server.
+
+Usage:
+    python benchmarks/bench_batch_analysis.py --tickets 100 --latency 0.2 --concurrency 16
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.cache import AnalysisCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate-limit-every", type=int, default=15)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(latency=args.latency, rate_limit_every=args.rate_limit_every)
+    os.environ["GROQ_BASE_URL"] = server.start()
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+    from utils.groq_client import GroqClient
+
+    queries = [f"Ticket {i}: my laptop screen keeps flickering" for i in range(args.tickets)]
+    serial_count = min(args.tickets, 20)
+
+    client = GroqClient(cache=AnalysisCache(max_entries=0))
+    client.backoff_base = 0.05
+    start = time.perf_counter()
+    for query in queries[:serial_count]:
+        client.analyze_ticket(query)
+    serial_rate = serial_count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = client.analyze_tickets_batch(queries, max_concurrency=args.concurrency)
+    batch_elapsed = time.perf_counter() - start
+
+    server.stop()
+    print(f"serial:  {serial_rate:8.1f} tickets/s")
+    print(f"batched: {len(queries) / batch_elapsed:8.1f} tickets/s "
+          f"(concurrency={args.concurrency}, peak in flight={server.max_in_flight})")
+    print(f"ordered: {all(r is not None for r in results)} failures: {sum(r is None for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Ticket latency through a simulated Groq incident, with and without degraded mode.
+
+The fake Groq server goes through four phases: healthy, slow (every
+response hangs for ``--hang`` seconds), down (every request fails with a
+500) and recovered. The same tickets are analyzed by:
+
+  * baseline: no deadline, no breaker, no fallback (the old behaviour)
+  * degraded mode: a per-call deadline, a circuit breaker and the local
+    fallback chain
+
+Usage:
+    python benchmarks/bench_breaker.py --tickets 10 --hang 3 --timeout 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.breaker import CircuitBreaker
+from utils.cache import AnalysisCache
+from utils.classifier import FastPathClassifier
+from utils.knowledge_base import KnowledgeBase
+from utils.metrics import percentile
+
+QUERIES = [
+    "My laptop screen flickers when I unplug it",
+    "Outlook keeps asking for my password",
+    "The VPN disconnects every few minutes",
+    "I forgot my password and can't log in",
+    "The printer on floor 3 jams on every page",
+]
+
+
+def run_phase(client, server, name: str, tickets: int) -> dict:
+    """Analyze ``tickets`` distinct tickets one after another; return latency and outcome counts."""
+    latencies, failed, degraded = [], 0, 0
+    before = server.requests
+    for i in range(tickets):
+        start = time.perf_counter()
+        analysis = client.analyze_ticket(f"{QUERIES[i % len(QUERIES)]} ({name} #{i})")
+        latencies.append(time.perf_counter() - start)
+        if analysis is None:
+            failed += 1
+        elif analysis.get('degraded'):
+            degraded += 1
+    return {
+        'p50': percentile(latencies, 50),
+        'max': max(latencies),
+        'failed': failed,
+        'degraded': degraded,
+        'llm_calls': server.requests - before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=10, help="tickets per phase")
+    parser.add_argument("--hang", type=float, default=3.0, help="response delay while the API is slow")
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-call deadline in degraded mode")
+    parser.add_argument("--reset", type=float, default=2.0, help="seconds the breaker stays open")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(latency=0.05)
+    os.environ["GROQ_BASE_URL"] = server.start()
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+    from utils.groq_client import GroqClient
+
+    knowledge_base = KnowledgeBase(os.path.join(tempfile.mkdtemp(), "knowledge_base.json"))
+    clients = {
+        "baseline": GroqClient(
+            cache=AnalysisCache(max_entries=0), timeout=0, fallback=False,
+            breaker=CircuitBreaker(failure_threshold=10 ** 9)
+        ),
+        "degraded mode": GroqClient(
+            cache=AnalysisCache(max_entries=0), timeout=args.timeout,
+            fast_path=FastPathClassifier(knowledge_base),
+            breaker=CircuitBreaker(failure_threshold=3, reset_seconds=args.reset,
+                                   slow_call_seconds=args.timeout * 0.8)
+        ),
+    }
+    phases = [
+        ("healthy", dict(latency=0.05, error_every=0)),
+        ("slow", dict(latency=args.hang, error_every=0)),
+        ("down", dict(latency=0.05, error_every=1)),
+        ("recovered", dict(latency=0.05, error_every=0)),
+    ]
+
+    print(f"{args.tickets} tickets per phase; slow phase hangs {args.hang:.1f}s, deadline {args.timeout:.1f}s")
+    for client_name, client in clients.items():
+        print(client_name)
+        for phase, settings in phases:
+            if phase != "healthy":
+                time.sleep(args.reset)  # each phase starts with the breaker's cooldown over
+            for key, value in settings.items():
+                setattr(server, key, value)
+            result = run_phase(client, server, phase, args.tickets)
+            print(f"  {phase:<10} p50 {result['p50']:5.2f}s  max {result['max']:5.2f}s  "
+                  f"failed {result['failed']:2d}  degraded {result['degraded']:2d}  "
+                  f"LLM calls {result['llm_calls']:2d}  breaker {client.breaker.state}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
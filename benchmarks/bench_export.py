@@ -0,0 +1,91 @@
+"""Compare peak memory of eager vs. streamed ticket exports.
+
+The old dashboard serialized the whole history with
+``load_tickets().to_csv()``; ``TicketManager.export`` streams chunks from
+the store instead. Each variant runs in a fresh subprocess so its peak
+RSS can be measured on its own.
+
+Usage:
+    python benchmarks/bench_export.py --rows 1000000 [--backend sqlite]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_csv
+from utils.ticket_manager import TicketManager
+
+MODES = ['eager-csv', 'stream-csv', 'stream-csv.gz', 'stream-parquet']
+
+
+def peak_rss() -> int:
+    """Return this process's peak RSS in bytes.
+
+    Linux keeps ``ru_maxrss`` across fork/exec, so a child would inherit the
+    parent's peak; ``VmHWM`` is reset on exec and is preferred when present.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_mode(mode: str, csv_path: str, backend: str, out_path: str):
+    """Export every ticket to ``out_path`` the way ``mode`` says."""
+    manager = TicketManager(csv_path, backend=backend)
+    with open(out_path, 'wb') as f:
+        if mode == 'eager-csv':
+            f.write(manager.load_tickets(include_text=True).to_csv(index=False).encode('utf-8'))
+        else:
+            for chunk in manager.export(mode.split('-', 1)[1]):
+                f.write(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--backend", default="csv", choices=["csv", "sqlite"])
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        baseline = peak_rss()
+        start = time.perf_counter()
+        run_mode(args.mode, args.csv, args.backend, args.out)
+        elapsed = time.perf_counter() - start
+        print(f"{elapsed:.3f} {baseline} {peak_rss()}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        write_csv(csv_path, args.rows)
+        # Build the snapshot / SQLite import once, outside the measurements.
+        TicketManager(csv_path, backend=args.backend).load_tickets(['ticket_id'])
+
+        print(f"{args.rows:,} tickets, {args.backend} backend")
+        for mode in MODES:
+            out_path = os.path.join(tmp, f"export-{mode}")
+            result = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--csv", csv_path,
+                 "--backend", args.backend, "--out", out_path],
+                capture_output=True, text=True, check=True
+            )
+            elapsed, baseline, peak = result.stdout.split()[-3:]
+            print(f"{mode:<15} {float(elapsed):6.2f}s  peak RSS {int(peak) / 1e6:7.1f} MB "
+                  f"(after imports {int(baseline) / 1e6:5.1f} MB)  file {os.path.getsize(out_path) / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
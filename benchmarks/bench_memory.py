@@ -0,0 +1,63 @@
+"""Check the in-memory footprint of typed ticket frames on a large synthetic file.
+
+Loads the same CSV the old way (``pd.read_csv``: object columns, text
+included) and through ``TicketManager.load_tickets`` (typed, text left on
+disk), prints both memory reports and exits non-zero if the footprint did
+not drop by at least ``--min-factor``.
+
+Usage:
+    python benchmarks/bench_memory.py --rows 1000000 --min-factor 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_csv
+from utils.schema import memory_report
+from utils.ticket_manager import TicketManager
+
+
+def describe(name: str, report: dict, elapsed: float):
+    print(f"{name}: {report['total_bytes'] / 1e6:8.1f} MB  "
+          f"({report['bytes_per_row']:.0f} B/row, loaded in {elapsed:.2f}s)")
+    for column, info in report['columns'].items():
+        print(f"    {column:<12} {info['dtype']:<16} {info['bytes'] / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--min-factor", type=float, default=8.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        write_csv(csv_path, args.rows)
+
+        start = time.perf_counter()
+        raw = pd.read_csv(csv_path)
+        raw_report = memory_report(raw)
+        describe("untyped (read_csv)", raw_report, time.perf_counter() - start)
+        del raw
+
+        manager = TicketManager(csv_path)
+        manager.load_tickets()  # builds the Parquet snapshot once
+        start = time.perf_counter()
+        typed = manager.load_tickets()
+        typed_report = manager.memory_report(typed)
+        describe("typed (load_tickets)", typed_report, time.perf_counter() - start)
+
+    factor = raw_report['total_bytes'] / max(typed_report['total_bytes'], 1)
+    ok = factor >= args.min_factor
+    print(f"{'PASS' if ok else 'FAIL'}: footprint reduced {factor:.1f}x (expected >= {args.min_factor}x)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
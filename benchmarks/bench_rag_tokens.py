@@ -0,0 +1,96 @@
+"""Compare token usage of the free-form and knowledge-base-grounded prompts.
+
+Runs the same tickets through ``GroqClient`` with and without a
+``ContextRetriever`` and reports average prompt/completion tokens and
+latency. Against the fake server token counts are estimates (characters / 4);
+pass ``--live`` to use the real API with ``GROQ_API_KEY``.
+
+Usage:
+    python benchmarks/bench_rag_tokens.py
+    python benchmarks/bench_rag_tokens.py --live
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.cache import AnalysisCache
+from utils.knowledge_base import KnowledgeBase
+from utils.metrics import ClientMetrics
+from utils.retrieval import ContextRetriever
+
+
+QUERIES = [
+    "My application keeps crashing when I open large files",
+    "I forgot my password and can't log in to email",
+    "My account is locked after too many attempts",
+    "The printer on floor 3 is not printing anything",
+    "My computer won't turn on this morning",
+    "No internet connection on my laptop since the update",
+    "The network is really slow in the afternoon",
+    "Software update failed with an error code",
+    "Outlook won't launch after installing the add-in",
+    "Wi-Fi keeps disconnecting in the meeting room",
+    "I need access to the finance shared drive",
+    "Laptop screen flickers when I move the lid",
+]
+
+
+def run(client, queries):
+    """Analyze each query once and return (metrics snapshot, analyses)."""
+    results = [client.analyze_ticket(query) for query in queries]
+    return client.metrics.snapshot(), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call the real Groq API")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake server latency per request")
+    args = parser.parse_args()
+
+    server = None
+    if not args.live:
+        server = FakeGroqServer(latency=args.latency)
+        os.environ["GROQ_BASE_URL"] = server.start()
+        os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+    from utils.groq_client import GroqClient
+
+    with tempfile.TemporaryDirectory() as tmp:
+        knowledge_base = KnowledgeBase(os.path.join(tmp, "knowledge_base.json"))
+        variants = {
+            'free-form': None,
+            'grounded': ContextRetriever(knowledge_base),
+        }
+        rows = {}
+        for name, retriever in variants.items():
+            client = GroqClient(
+                cache=AnalysisCache(max_entries=0), metrics=ClientMetrics(), retriever=retriever
+            )
+            snapshot, results = run(client, QUERIES)
+            answered = [r for r in results if r]
+            cited = sum(bool(r.get('knowledge_base_articles')) for r in answered)
+            rows[name] = (snapshot, len(answered), cited)
+
+    if server is not None:
+        server.stop()
+
+    print(f"{'variant':<10} {'prompt':>8} {'completion':>11} {'total':>8} {'p50 s':>7} {'cited':>7}")
+    for name, (snapshot, answered, cited) in rows.items():
+        calls = max(snapshot['calls'], 1)
+        print(
+            f"{name:<10} {snapshot['prompt_tokens'] / calls:8.1f} "
+            f"{snapshot['completion_tokens'] / calls:11.1f} {snapshot['total_tokens'] / calls:8.1f} "
+            f"{snapshot['latency_p50']:7.3f} {cited:>3}/{answered:<3}"
+        )
+    before, after = rows['free-form'][0], rows['grounded'][0]
+    if before['completion_tokens']:
+        change = after['completion_tokens'] / before['completion_tokens'] - 1
+        print(f"completion tokens per ticket: {change:+.0%} with grounding")
+
+
+if __name__ == "__main__":
+    main()
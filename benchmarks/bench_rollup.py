@@ -0,0 +1,94 @@
+"""Compare serving the dashboard charts from ticket rows vs. the per-day rollup.
+
+For a synthetic history, times what one dashboard render needs: the
+four chart series and the KPI tiles, over the whole range and over a
+one-week slice. The raw path loads the typed ticket frame and counts it;
+the rollup path reads the maintained cube and sums it.
+
+Usage:
+    python benchmarks/bench_rollup.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_csv
+from utils.analytics import AnalyticsDashboard
+from utils.ticket_manager import TicketManager
+
+
+def chart_data(df, day_column: str) -> dict:
+    """Compute the series behind the four charts."""
+    series = {column: AnalyticsDashboard._counts(df, column) for column in ('category', 'urgency', 'department')}
+    if 'count' in df.columns:
+        series['timeline'] = df.groupby(df[day_column].dt.date)['count'].sum()
+    else:
+        series['timeline'] = df.groupby(df[day_column].dt.date).size()
+    return series
+
+
+def from_rows(manager: TicketManager, start=None, end=None) -> dict:
+    df = manager.load_tickets()
+    if start is not None:
+        df = df[(df['timestamp'].dt.date >= start) & (df['timestamp'].dt.date <= end)]
+    series = chart_data(df, 'timestamp')
+    series['escalated'] = int((df['resolved_by'] == 'Escalated').sum())
+    return series
+
+
+def from_rollup(manager: TicketManager, start=None, end=None) -> dict:
+    cube = manager.load_rollup(start, end)
+    series = chart_data(cube, 'day')
+    series['escalated'] = manager.rollup_statistics(cube)['escalated']
+    return series
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        write_csv(csv_path, args.rows)
+        manager = TicketManager(csv_path)
+        # First reads build the Parquet snapshot, stats and rollup files once.
+        manager.load_tickets()
+        manager.get_statistics()
+        start = time.perf_counter()
+        manager.load_rollup()
+        print(f"rollup rebuild: {time.perf_counter() - start:.2f}s, {len(manager.load_rollup()):,} cells")
+
+        week = (date(2024, 3, 1), date(2024, 3, 7))
+        for label, bounds in (("all days", (None, None)), ("one week", week)):
+            raw, cube = from_rows(manager, *bounds), from_rollup(manager, *bounds)
+            assert raw['escalated'] == cube['escalated']
+            assert raw['category'].to_dict() == cube['category'].to_dict()
+            raw_time = timed(lambda: from_rows(manager, *bounds))
+            cube_time = timed(lambda: from_rollup(manager, *bounds))
+            print(f"{label:<9} rows: {raw_time * 1000:8.1f} ms   rollup: {cube_time * 1000:7.1f} ms   "
+                  f"({raw_time / cube_time:.0f}x)")
+
+        # The first save of a day seeds that day's ID counter; time the next one.
+        manager.save_ticket({'user_query': 'benchmark ticket', 'confidence': 0.9})
+        start = time.perf_counter()
+        manager.save_ticket({'user_query': 'benchmark ticket', 'confidence': 0.9})
+        print(f"save_ticket with rollup upkeep: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
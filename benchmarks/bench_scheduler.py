@@ -0,0 +1,87 @@
+"""Interactive latency under a batch import, with and without the LLM scheduler.
+
+The fake Groq server enforces a request rate limit. A batch run floods
+it while a simulated user submits tickets one at a time; the user's
+latency is compared for:
+
+  * no scheduler: every caller fires at will and backs off on 429s
+  * one lane: calls are paced to the limit but served first come, first served
+  * priority lanes: paced, and interactive calls jump ahead of the batch
+
+Usage:
+    python benchmarks/bench_scheduler.py --batch 150 --rpm 600 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.cache import AnalysisCache
+from utils.metrics import percentile
+from utils.scheduler import LLMScheduler
+
+
+class SingleLaneScheduler(LLMScheduler):
+    """Paces calls like ``LLMScheduler`` but ignores their priority."""
+
+    def acquire(self, lane: str = 'interactive', tokens: int = 0, retry: bool = False, timeout=None) -> float:
+        return super().acquire('interactive', tokens, retry, timeout)
+
+
+def run(scheduler: LLMScheduler, batch: int, users: int, gap: float) -> dict:
+    """Run a batch import and a stream of interactive analyses side by side."""
+    from utils.groq_client import GroqClient
+
+    client = GroqClient(cache=AnalysisCache(max_entries=0), scheduler=scheduler)
+    client.backoff_base = 0.05
+    queries = [f"Backlog ticket {i}: laptop screen flickers" for i in range(batch)]
+    importer = threading.Thread(target=client.analyze_tickets_batch, args=(queries, 8))
+    importer.start()
+    time.sleep(0.5)  # let the import saturate the limit first
+
+    latencies, failures = [], 0
+    for i in range(users):
+        start = time.perf_counter()
+        if client.analyze_ticket(f"User {i}: I can't log in to my account") is None:
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+        time.sleep(gap)
+    importer.join()
+    return {'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95), 'failures': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=150)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--gap", type=float, default=0.5, help="seconds between interactive submits")
+    parser.add_argument("--rpm", type=int, default=600, help="server request limit per minute")
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # A one-second window keeps the run short; the scheduler paces just
+    # under it with a small burst so it never trips the server's limit.
+    server = FakeGroqServer(latency=args.latency, requests_per_minute=args.rpm, rate_window=1.0)
+    os.environ["GROQ_BASE_URL"] = server.start()
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    paced = dict(requests_per_minute=args.rpm * 0.9, burst_seconds=0.1)
+
+    print(f"batch of {args.batch} + {args.users} interactive tickets, server limit {args.rpm}/min")
+    for name, scheduler in (
+        ("no scheduler", LLMScheduler()),
+        ("one lane", SingleLaneScheduler(**paced)),
+        ("priority lanes", LLMScheduler(**paced)),
+    ):
+        limited = server.rate_limited
+        result = run(scheduler, args.batch, args.users, args.gap)
+        print(f"{name:<15} interactive p50 {result['p50']:5.2f}s  p95 {result['p95']:5.2f}s  "
+              f"failures {result['failures']}  429s {server.rate_limited - limited:4d}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
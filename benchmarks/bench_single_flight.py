@@ -0,0 +1,77 @@
+"""Simulate an outage burst of identical tickets against the fake Groq server.
+
+Many threads (standing in for Streamlit sessions) analyze the same query
+at once. With single-flight coalescing they share one LLM call; the
+baseline gives every thread its own client, so nothing is shared.
+
+Usage:
+    python benchmarks/bench_single_flight.py --users 50 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.cache import AnalysisCache
+
+
+def burst(clients, query: str):
+    """Analyze ``query`` from one thread per client, all released together."""
+    barrier = threading.Barrier(len(clients))
+    results = [None] * len(clients)
+
+    def run(i: int):
+        barrier.wait()
+        results[i] = clients[i].analyze_ticket(query)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(clients))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(latency=args.latency)
+    os.environ["GROQ_BASE_URL"] = server.start()
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+    from utils.groq_client import GroqClient
+
+    query = "I can't connect to the internet"
+    # No caching, so only in-flight sharing can save calls.
+    shared = GroqClient(cache=AnalysisCache(max_entries=0))
+    for name, clients in (
+        ("independent calls", [GroqClient(cache=AnalysisCache(max_entries=0)) for _ in range(args.users)]),
+        ("single-flight", [shared] * args.users),
+    ):
+        before = server.requests
+        results, elapsed = burst(clients, query)
+        failures = sum(result is None for result in results)
+        print(f"{name:<18} {args.users} users: {server.requests - before:3d} LLM calls, "
+              f"{elapsed:5.2f}s, {failures} failures")
+    print(f"single-flight counters: {shared.single_flight.stats()}")
+
+    # A failing leader must not poison later callers.
+    server.error_every = 1
+    results, _ = burst([shared] * 10, query)
+    server.error_every = 0
+    after_error = shared.analyze_ticket(query)
+    print(f"leader error: {sum(r is None for r in results)}/10 waiters failed, "
+          f"next call {'succeeded' if after_error else 'failed'}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Measure cold-start import time and per-session setup cost of the pages.
+
+Cold start: each step runs in a fresh interpreter, timing the imports a
+page script does and, for the dashboard, the first chart render (which
+is now where matplotlib/seaborn get imported).
+
+Per session: builds what a new browser session used to build for itself
+(its own ``TicketManager``, ``KnowledgeBase`` and ``GroqClient`` with a
+private HTTP connection pool) and compares it with the process-wide
+objects from ``utils.resources``.
+
+Usage:
+    python benchmarks/bench_startup.py --sessions 50 --rows 10000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_csv
+
+# name -> (setup, timed statement), run in a fresh interpreter
+COLD_START = {
+    'submit page imports': (
+        "",
+        "import streamlit, utils.jobs, utils.resources"
+    ),
+    'dashboard page imports': (
+        "",
+        "import streamlit, utils.analytics, utils.export, utils.resources"
+    ),
+    'dashboard first chart': (
+        "import pandas as pd, utils.analytics as a; d = a.AnalyticsDashboard(); "
+        "df = pd.DataFrame({'category': ['Network'], 'count': [1]})",
+        "d.chart_png('category', df, 0)"
+    ),
+}
+
+
+def cold_start(setup: str, statement: str) -> float:
+    """Return seconds ``statement`` takes in a new interpreter after ``setup``."""
+    code = (
+        f"import sys, time; sys.path.insert(0, {ROOT!r}); {setup}\n"
+        f"start = time.perf_counter(); {statement}\n"
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def per_session_old(csv_path: str, kb_path: str):
+    """What app.py built into st.session_state for each new session."""
+    from utils.classifier import get_shared_classifier
+    from utils.groq_client import GroqClient
+    from utils.knowledge_base import KnowledgeBase
+    from utils.retrieval import get_retriever
+    from utils.similarity import get_shared_semantic_cache
+    from utils.ticket_manager import TicketManager
+
+    ticket_manager = TicketManager(csv_path)
+    knowledge_base = KnowledgeBase(kb_path)
+    semantic_cache = get_shared_semantic_cache(ticket_manager)
+    client = GroqClient(
+        semantic_cache=semantic_cache,
+        fast_path=get_shared_classifier(ticket_manager, knowledge_base),
+        retriever=get_retriever(knowledge_base, semantic_cache)
+    )
+    return ticket_manager, knowledge_base, client
+
+
+def per_session_shared():
+    """What app.py does for each new session now."""
+    from utils import resources
+    return (
+        resources.get_shared_ticket_manager(),
+        resources.get_shared_knowledge_base(),
+        resources.get_shared_groq_client()
+    )
+
+
+def measure(build, sessions: int):
+    """Return (ms per session, KB allocated per session, distinct HTTP pools)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = [build() for _ in range(sessions)]
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pools = {id(client.client._client) for _, _, client in kept}
+    return elapsed / sessions * 1000, allocated / sessions / 1024, len(pools)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print("cold start (fresh interpreter)")
+    for name, (setup, statement) in COLD_START.items():
+        print(f"  {name:<24} {cold_start(setup, statement) * 1000:7.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        kb_path = os.path.join(tmp, "knowledge_base.json")
+        write_csv(csv_path, args.rows)
+        os.environ.setdefault("GROQ_API_KEY", "fake-key")
+        # The shared getters use the default paths; point them at the temp data.
+        os.chdir(tmp)
+        os.makedirs("data")
+        os.replace(csv_path, "data/tickets.csv")
+        csv_path, kb_path = "data/tickets.csv", "data/knowledge_base.json"
+
+        # Warm the semantic cache / classifier, which were shared before as well.
+        per_session_old(csv_path, kb_path)
+
+        print(f"per session ({args.sessions} sessions, {args.rows:,} tickets)")
+        for name, build in (
+            ("per-session objects", lambda: per_session_old(csv_path, kb_path)),
+            ("shared objects", per_session_shared),
+        ):
+            ms, kb, pools = measure(build, args.sessions)
+            print(f"  {name:<24} {ms:7.2f} ms  {kb:8.1f} KB  {pools:3d} HTTP pool(s)")
+
+
+if __name__ == "__main__":
+    main()
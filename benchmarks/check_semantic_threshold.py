@@ -0,0 +1,97 @@
+"""Precision check for the semantic cache's match threshold.
+
+The semantic cache hands a stored analysis to any new query whose
+similarity clears the threshold, so a near-miss ("can't connect to the
+printer" vs "... to the internet") that clears it gets a wrong answer.
+This scores labelled paraphrase pairs (same issue, reusing the analysis
+is fine) and near-miss pairs (different issue, it is not) with IDF
+weights fitted on synthetic tickets, prints precision and recall per
+threshold, and fails if any near-miss clears the threshold being checked.
+
+Usage:
+    python benchmarks/check_semantic_threshold.py --threshold 0.85
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_tickets
+from utils.similarity import SemanticCache
+
+PARAPHRASES = [
+    ("I can't log in", "login not working"),
+    ("I can't log in to my account", "Unable to login to my account"),
+    ("locked out of my account", "my account got locked out"),
+    ("my account is locked", "account locked after too many attempts"),
+    ("I forgot my password", "forgot password, need a reset"),
+    ("My laptop screen is flickering", "laptop screen keeps flickering"),
+    ("Outlook keeps asking for my password", "Outlook keeps prompting for my password"),
+    ("The VPN disconnects every few minutes", "VPN keeps disconnecting every few minutes"),
+    ("My computer won't turn on", "computer will not turn on"),
+    ("I can't connect to the internet", "cannot connect to internet"),
+    ("The printer on floor 3 is jammed", "printer on the third floor jammed"),
+    ("Excel crashes when I open large files", "Excel crashing when opening large files"),
+    ("wifi keeps dropping", "Wi-Fi connection keeps dropping"),
+]
+
+NEAR_MISSES = [
+    ("I can't connect to the printer", "I can't connect to the internet"),
+    ("I can't log in to the VPN", "I can't connect to the VPN"),
+    ("The VPN disconnects every few minutes", "The Wi-Fi disconnects every few minutes"),
+    ("Reset my password", "Reset my printer"),
+    ("My laptop won't turn on", "My laptop won't charge"),
+    ("Outlook won't open", "Excel won't open"),
+    ("The network is slow", "The laptop is slow"),
+    ("My keyboard is not working", "My mouse is not working"),
+    ("Can't access the shared drive", "Can't access my email"),
+    ("My monitor screen is flickering", "My phone screen is cracked"),
+    ("Printer is out of toner", "Printer is out of paper"),
+    ("My VPN is not connecting", "My VPN is connecting"),
+    ("I can't log in to email", "I can log in to email"),
+    ("The printer is not printing", "The printer is printing"),
+    ("Outlook won't sync", "Outlook syncs fine"),
+    ("My laptop is not charging", "My laptop is charging"),
+]
+
+
+def score_pairs(tickets: int, seed: int) -> tuple:
+    """Return the similarities of the paraphrase and near-miss pairs."""
+    cache = SemanticCache.from_tickets(pd.DataFrame(generate_tickets(tickets, seed=seed)))
+    similarity = cache.vectorizer.similarity
+    return (
+        [similarity(a, b) for a, b in PARAPHRASES],
+        [similarity(a, b) for a, b in NEAR_MISSES]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=SemanticCache().threshold, help="threshold to check")
+    parser.add_argument("--tickets", type=int, default=5000, help="synthetic tickets the IDF is fitted on")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    paraphrases, near_misses = score_pairs(args.tickets, args.seed)
+    for label, pairs, scores in (("paraphrase", PARAPHRASES, paraphrases), ("near miss", NEAR_MISSES, near_misses)):
+        for (a, b), score in sorted(zip(pairs, scores), key=lambda item: -item[1]):
+            print(f"{label:<10} {score:.3f}  {a!r} / {b!r}")
+
+    print("\nthreshold  precision  recall")
+    for threshold in sorted({0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, args.threshold}):
+        hits = sum(score >= threshold for score in paraphrases)
+        false_hits = sum(score >= threshold for score in near_misses)
+        precision = hits / (hits + false_hits) if hits + false_hits else 1.0
+        marker = "  <- checked" if threshold == args.threshold else ""
+        print(f"{threshold:9.2f}  {precision:9.0%}  {hits / len(paraphrases):6.0%}{marker}")
+
+    worst = max(near_misses)
+    print(f"\nclosest near miss {worst:.3f}, threshold {args.threshold:.2f}")
+    sys.exit(0 if worst < args.threshold else 1)
+
+
+if __name__ == "__main__":
+    main()
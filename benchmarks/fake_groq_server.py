@@ -0,0 +1,277 @@
+"""Local stand-in for the Groq chat completions API.
+
+Serves ``POST /openai/v1/chat/completions`` with OpenAI-shaped JSON and a
+keyword-based analysis, so ``GroqClient`` can run offline. Point the SDK
+at it with ``GROQ_BASE_URL=http://127.0.0.1:8765`` and any ``GROQ_API_KEY``.
+Requests with ``"stream": true`` are answered as server-sent events, a few
+characters per chunk, with ``--latency`` spread across the chunks. Grounded
+prompts (see ``GROUNDED_SYSTEM_PROMPT``) get the listed article IDs back.
+
+With ``--rpm`` it enforces a sliding-window request limit the way the
+real API does, answering 429 with a ``retry-after`` once it is exceeded.
+
+Usage:
+    python benchmarks/fake_groq_server.py --port 8765 --latency 0.2 --rate-limit-every 10
+
+It can also be embedded: ``FakeGroqServer(latency=0.1).start()`` returns
+the base URL and serves from a background thread.
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+RULES = [
+    (('password', 'login', 'log in', 'locked', 'account', 'access'), 'Login/Access', 'IT Security'),
+    (('internet', 'wifi', 'network', 'vpn', 'connect'), 'Network', 'Network Team'),
+    (('printer', 'laptop', 'computer', 'screen', 'keyboard', 'turn on'), 'Hardware', 'Hardware Team'),
+    (('crash', 'application', 'install', 'update', 'software', 'outlook'), 'Software', 'Software Team'),
+]
+
+
+ARTICLE_ID = re.compile(r"^\[([\w-]+)\]", re.MULTILINE)
+
+
+def fake_analysis(query: str) -> dict:
+    """Return a deterministic analysis for a ticket description."""
+    text = query.split("\n\n", 1)[0].lower()
+    category, department = 'Other', 'General Support'
+    for keywords, rule_category, rule_department in RULES:
+        if any(keyword in text for keyword in keywords):
+            category, department = rule_category, rule_department
+            break
+    urgency = 'High' if any(word in text for word in ('down', 'outage', 'breach', 'everyone')) else 'Medium'
+    return {
+        'category': category,
+        'urgency': urgency,
+        'department': department,
+        'confidence': 0.9,
+        'knowledge_base_articles': [],
+        'solution': f"- Restart the affected system\n- Check recent changes\n- Contact {department} if it persists"
+    }
+
+
+def fake_grounded_analysis(query: str) -> dict:
+    """Answer a grounded prompt: cite the listed article IDs, add one short step."""
+    analysis = fake_analysis(query)
+    analysis.pop('knowledge_base_articles')
+    solution = analysis.pop('solution')
+    analysis['article_ids'] = ARTICLE_ID.findall(query)[:2]
+    analysis['solution'] = solution.splitlines()[-1]
+    return analysis
+
+
+class _Server(ThreadingHTTPServer):
+    # Bursts of simultaneous clients shouldn't be refused at connect time.
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline hang up before a slow reply is written.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeGroqServer:
+    """Threaded fake Groq server with latency, error and rate-limit injection.
+
+    ``requests_per_minute`` admits that many requests per minute, counted
+    over a sliding ``rate_window`` (seconds, scaled down proportionally
+    so short benchmarks can use a one-second window).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        error_every: int = 0,
+        requests_per_minute: int = 0,
+        rate_window: float = 60.0
+    ):
+        """Initialize server; port 0 picks a free port."""
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.error_every = error_every
+        self.requests_per_minute = requests_per_minute
+        self.rate_window = rate_window
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._admitted = deque()
+        self._lock = threading.Lock()
+        self.httpd = _Server((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve from a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Shut the server down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_events(self, events):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                for event, delay in events:
+                    if delay:
+                        time.sleep(delay)
+                    self.wfile.write(f"data: {event}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                with server._lock:
+                    server.requests += 1
+                    number = server.requests
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    server.respond(self, request, number)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+    def _over_limit(self) -> float:
+        """Admit a request under the sliding-window limit; return the retry-after if not."""
+        if not self.requests_per_minute:
+            return 0.0
+        now = time.monotonic()
+        allowed = max(1, int(self.requests_per_minute * self.rate_window / 60))
+        with self._lock:
+            while self._admitted and now - self._admitted[0] >= self.rate_window:
+                self._admitted.popleft()
+            if len(self._admitted) < allowed:
+                self._admitted.append(now)
+                return 0.0
+            self.rate_limited += 1
+            return self.rate_window - (now - self._admitted[0])
+
+    def respond(self, handler, request: dict, number: int):
+        """Write the response for one request."""
+        retry_after = self._over_limit()
+        if retry_after:
+            handler._send(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                          {'retry-after': f"{retry_after:.3f}"})
+            return
+        if self.rate_limit_every and number % self.rate_limit_every == 0:
+            handler._send(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                          {'retry-after': '0.05'})
+            return
+        if self.error_every and number % self.error_every == 0:
+            handler._send(500, {'error': {'message': 'Injected failure', 'type': 'server_error'}})
+            return
+        messages = request.get('messages', [{}])
+        query = messages[-1].get('content', '')
+        grounded = '"article_ids"' in messages[0].get('content', '')
+        content = json.dumps(fake_grounded_analysis(query) if grounded else fake_analysis(query))
+        prompt_tokens = sum(len(m.get('content', '')) for m in request.get('messages', [])) // 4
+        completion_tokens = len(content) // 4
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+        if request.get('stream'):
+            handler._send_events(self._stream_events(request, number, content, usage))
+            return
+        if self.latency:
+            time.sleep(self.latency)
+
+        handler._send(200, {
+            'id': f"chatcmpl-{number}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage
+        })
+
+    def _stream_events(self, request: dict, number: int, content: str, usage: dict, chunk_size: int = 8):
+        """Yield (SSE data, delay before sending) pairs for a streamed completion."""
+        pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        delay = self.latency / len(pieces) if pieces else 0.0
+
+        def chunk(delta: dict, finish_reason=None, x_groq=None) -> str:
+            body = {
+                'id': f"chatcmpl-{number}",
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': request.get('model', 'fake'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            if x_groq is not None:
+                body['x_groq'] = x_groq
+            return json.dumps(body)
+
+        yield chunk({'role': 'assistant', 'content': ''}), 0.0
+        for piece in pieces:
+            yield chunk({'content': piece}), delay
+        yield chunk({}, 'stop', {'id': f"req-{number}", 'usage': usage}), 0.0
+        yield '[DONE]', 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each response")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--error-every", type=int, default=0, help="answer every Nth request with 500")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before answering 429")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(
+        args.host, args.port, args.latency, args.rate_limit_every, args.error_every, args.rpm
+    )
+    print(f"Fake Groq server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""Benchmark TicketManager, KnowledgeBase and AnalyticsDashboard on synthetic data.
+
+For each size (default 1k, 10k, 100k and 1M tickets) a seeded synthetic
+ticket file is generated (see ``benchmarks/synthetic.py``) and, in a
+fresh process, these are timed:
+
+  * ``TicketManager``: opening the store, ``load_tickets`` and
+    ``get_statistics`` (first call and warm), ``get_ticket_by_id``,
+    ``update_ticket_status`` and ``save_ticket``
+  * every ``AnalyticsDashboard.create_*`` chart, from the ticket rows
+    and from the per-day rollup the dashboard actually uses
+  * a submitted ticket end to end: ``GroqClient.analyze_ticket`` plus
+    ``save_ticket``
+
+A synthetic knowledge base is benchmarked once: index build,
+``search`` with and without a category, and ``get_articles_by_category``.
+
+Each operation reports p50/p95/min milliseconds and the peak memory it
+allocated (tracemalloc, which sees Python and NumPy allocations); each
+size also reports the process's peak RSS. Everything runs offline: the
+``GroqClient`` talks to a stub instead of the Groq API.
+
+Results are written as JSON, by default to
+``benchmarks/results/<commit>.json``. Pass an earlier file to
+``--compare`` to list operations whose fastest run got slower by more
+than ``--tolerance`` (the minimum is far less noisy than the median);
+the exit status is 1 if any did.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --backend csv sqlite
+    python benchmarks/run_benchmarks.py --sizes 10000 --compare benchmarks/results/a00eeac.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_groq_server import fake_analysis, fake_grounded_analysis
+from benchmarks.synthetic import generate_knowledge_base, generate_tickets, write_csv
+from utils.analytics import AnalyticsDashboard
+from utils.breaker import CircuitBreaker
+from utils.cache import AnalysisCache
+from utils.knowledge_base import KnowledgeBase
+from utils.metrics import ClientMetrics, percentile
+from utils.retrieval import ContextRetriever
+from utils.scheduler import LLMScheduler
+from utils.ticket_manager import TicketManager
+
+CHARTS = [
+    'create_category_distribution',
+    'create_urgency_distribution',
+    'create_department_workload',
+    'create_resolution_timeline',
+]
+# Operations faster than this (ms) at both ends of a comparison are noise.
+NOISE_FLOOR_MS = 1.0
+
+
+class StubCompletions:
+    """Answers ``chat.completions.create`` instantly with the fake server's canned analysis."""
+
+    def create(self, **request):
+        messages = request['messages']
+        grounded = '"article_ids"' in messages[0]['content']
+        query = messages[-1]['content']
+        content = json.dumps(fake_grounded_analysis(query) if grounded else fake_analysis(query))
+        prompt_tokens = sum(len(m['content']) for m in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=len(content) // 4,
+                total_tokens=prompt_tokens + len(content) // 4
+            )
+        )
+
+
+def stub_groq_client(knowledge_base: KnowledgeBase):
+    """Return a grounded ``GroqClient`` on the stub API, with nothing cached or shared."""
+    from utils.groq_client import GroqClient
+
+    return GroqClient(
+        cache=AnalysisCache(max_entries=0),
+        client=SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions())),
+        metrics=ClientMetrics(),
+        retriever=ContextRetriever(knowledge_base),
+        scheduler=LLMScheduler(),
+        breaker=CircuitBreaker()
+    )
+
+
+def measure(fn: Callable, calls: Sequence = ((),) * 3, trace: bool = True, budget: Optional[float] = None) -> Dict:
+    """Time ``fn(*args)`` for each ``args`` in ``calls``.
+
+    Stops early once ``budget`` seconds are spent and at least 3 calls
+    ran. With ``trace`` the first call is run once more under tracemalloc
+    to record its peak allocation; one-off operations (first loads) skip it.
+    """
+    times = []
+    deadline = time.perf_counter() + budget if budget else None
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+        if deadline is not None and len(times) >= 3 and time.perf_counter() > deadline:
+            break
+    result = {
+        'runs': len(times),
+        'p50_ms': round(percentile(times, 50), 3),
+        'p95_ms': round(percentile(times, 95), 3),
+        'min_ms': round(min(times), 3),
+    }
+    if trace:
+        tracemalloc.start()
+        try:
+            fn(*calls[0])
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def max_rss_mb() -> Optional[float]:
+    """Return this process's peak resident set size in MB, where the platform reports it."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1e6 if sys.platform == 'darwin' else 1e3), 1)
+
+
+def new_tickets(count: int, seed: int) -> List[Dict]:
+    """Return ``count`` fresh ticket dicts for ``save_ticket``."""
+    frame = generate_tickets(count, seed=seed).drop(columns=['ticket_id', 'timestamp'])
+    return frame.to_dict('records')
+
+
+def run_size(rows: int, backend: str, seed: int, samples: int, budget: Optional[float] = None) -> Dict:
+    """Benchmark one ticket volume on one storage backend (meant to run in its own process)."""
+    import matplotlib.pyplot as plt
+
+    rng = np.random.default_rng(seed)
+    operations = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        start = time.perf_counter()
+        write_csv(csv_path, rows, seed)
+        generate_seconds = time.perf_counter() - start
+
+        managers = []
+        # The SQLite backend imports the CSV when it is first opened.
+        operations['open'] = measure(lambda: managers.append(TicketManager(csv_path, backend=backend)),
+                                     [()], trace=False)
+        manager = managers[0]
+        operations['load_tickets_first'] = measure(manager.load_tickets, [()], trace=False)
+        operations['load_tickets'] = measure(manager.load_tickets)
+        operations['load_tickets_with_text'] = measure(lambda: manager.load_tickets(include_text=True))
+        operations['get_statistics_first'] = measure(manager.get_statistics, [()], trace=False)
+        operations['get_statistics'] = measure(manager.get_statistics)
+
+        ticket_ids = manager.load_tickets(['ticket_id'])['ticket_id'].astype(str).to_numpy()
+        sample_ids = [(ticket_id,) for ticket_id in rng.choice(ticket_ids, samples)]
+        operations['get_ticket_by_id'] = measure(manager.get_ticket_by_id, sample_ids, budget=budget)
+
+        dashboard = AnalyticsDashboard()
+        frame = manager.load_tickets()
+        cube = manager.load_rollup()
+        for chart in CHARTS:
+            render = getattr(dashboard, chart)
+            for source, data in (('rows', frame), ('rollup', cube)):
+                operations[f'{chart}[{source}]'] = measure(lambda df: plt.close(render(df)[0]), [(data,)] * 5)
+        del frame, cube
+
+        # Writes last: they invalidate the snapshot and caches the reads above use.
+        statuses = ['In Progress', 'Resolved', 'Escalated', 'Closed']
+        operations['update_ticket_status'] = measure(
+            manager.update_ticket_status,
+            [(ticket_id, statuses[i % len(statuses)]) for i, (ticket_id,) in enumerate(sample_ids)],
+            budget=budget
+        )
+        operations['save_ticket'] = measure(
+            manager.save_ticket, [(ticket,) for ticket in new_tickets(samples, seed + 1)], budget=budget
+        )
+
+        client = stub_groq_client(KnowledgeBase(os.path.join(tmp, "knowledge_base.json")))
+
+        def submit(ticket: Dict):
+            analysis = client.analyze_ticket(ticket['user_query'])
+            manager.save_ticket({**ticket, **{k: analysis[k] for k in ('category', 'urgency', 'department')}})
+
+        operations['analyze_and_save_ticket'] = measure(
+            submit, [(ticket,) for ticket in new_tickets(samples, seed + 2)], budget=budget
+        )
+
+    return {
+        'rows': rows,
+        'backend': backend,
+        'generate_seconds': round(generate_seconds, 3),
+        'max_rss_mb': max_rss_mb(),
+        'operations': operations,
+    }
+
+
+def run_knowledge_base(articles: int, seed: int, samples: int) -> Dict:
+    """Benchmark index build and lookups on a synthetic knowledge base."""
+    queries = generate_tickets(samples, seed=seed)
+    operations = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_path = os.path.join(tmp, "knowledge_base.json")
+        with open(kb_path, 'w') as f:
+            json.dump(generate_knowledge_base(articles, seed), f)
+        kbs = []
+        operations['build_index'] = measure(lambda: kbs.append(KnowledgeBase(kb_path)), [()], trace=False)
+        kb = kbs[0]
+        operations['search'] = measure(kb.search, [(query,) for query in queries['user_query']])
+        operations['search_in_category'] = measure(
+            lambda query, category: kb.search(query, k=3, category=category),
+            list(zip(queries['user_query'], queries['category']))
+        )
+        operations['get_articles_by_category'] = measure(
+            kb.get_articles_by_category, [(category,) for category in queries['category']]
+        )
+        client = stub_groq_client(kb)
+        operations['analyze_ticket'] = measure(client.analyze_ticket, [(query,) for query in queries['user_query']])
+    return {'articles': articles, 'operations': operations}
+
+
+def git_commit() -> str:
+    """Return the short commit hash (suffixed ``-dirty`` with local changes), or 'unknown'."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def flatten(results: Dict) -> Dict[str, Dict]:
+    """Return operation timings keyed 'backend/rows/operation' (and 'knowledge_base/operation')."""
+    flat = {}
+    for size in results.get('sizes', []):
+        for name, timing in size['operations'].items():
+            flat[f"{size['backend']}/{size['rows']}/{name}"] = timing
+    for name, timing in results.get('knowledge_base', {}).get('operations', {}).items():
+        flat[f"knowledge_base/{name}"] = timing
+    return flat
+
+
+def compare(old: Dict, new: Dict, tolerance: float) -> List[str]:
+    """Print changes in each operation's fastest run between two result files; return the keys that regressed."""
+    old_flat, new_flat = flatten(old), flatten(new)
+    regressions = []
+    print(f"\ncompared with {old['meta']['commit']} (fastest run, regression if > {tolerance:.0%} slower)")
+    for key in sorted(set(old_flat) & set(new_flat)):
+        before, after = old_flat[key]['min_ms'], new_flat[key]['min_ms']
+        if max(before, after) < NOISE_FLOOR_MS:
+            continue
+        ratio = after / before if before else float('inf')
+        if ratio > 1 + tolerance:
+            regressions.append(key)
+            flag = "SLOWER"
+        elif ratio < 1 / (1 + tolerance):
+            flag = "faster"
+        else:
+            continue
+        print(f"  {flag:<6} {key:<60} {before:10.2f} -> {after:10.2f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--backend", nargs="+", default=["csv"], choices=["csv", "sqlite"])
+    parser.add_argument("--samples", type=int, default=20, help="calls timed per single-ticket operation")
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="seconds after which a single-ticket operation stops sampling (at least 3 calls)")
+    parser.add_argument("--kb-articles", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'seed': args.seed,
+            'samples': args.samples,
+            'budget_seconds': args.budget,
+        },
+        'sizes': [],
+    }
+
+    for backend in args.backend:
+        for rows in args.sizes:
+            # A fresh process per size, so peak RSS and warm caches don't carry over.
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                size = pool.submit(run_size, rows, backend, args.seed, args.samples, args.budget).result()
+            results['sizes'].append(size)
+            ops = size['operations']
+            print(f"{backend:<6} {rows:>9,} rows  load {ops['load_tickets']['p50_ms']:9.1f} ms  "
+                  f"stats {ops['get_statistics']['p50_ms']:7.1f} ms  "
+                  f"by id {ops['get_ticket_by_id']['p50_ms']:7.1f} ms  "
+                  f"save {ops['save_ticket']['p50_ms']:7.1f} ms  "
+                  f"update {ops['update_ticket_status']['p50_ms']:8.1f} ms  peak RSS {size['max_rss_mb']} MB")
+
+    results['knowledge_base'] = run_knowledge_base(args.kb_articles, args.seed, args.samples)
+    kb_ops = results['knowledge_base']['operations']
+    print(f"knowledge base {args.kb_articles} articles  build {kb_ops['build_index']['p50_ms']:.1f} ms  "
+          f"search {kb_ops['search']['p50_ms']:.3f} ms  stub analyze {kb_ops['analyze_ticket']['p50_ms']:.2f} ms")
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare(previous, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
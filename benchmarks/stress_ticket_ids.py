@@ -0,0 +1,90 @@
+"""Stress test for concurrent ticket writes.
+
+Hammers ``TicketManager.save_ticket`` (and interleaved status updates)
+from a process pool with several threads per process, then checks that
+every saved row is present, that no ticket ID was issued twice and that
+the incrementally maintained aggregates still match the rows.
+
+Usage:
+    python benchmarks/stress_ticket_ids.py --backend csv --processes 8 --threads 4 --tickets 25
+"""
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.aggregates import TicketAggregates
+from utils.ticket_manager import TicketManager
+
+
+def _worker(csv_path: str, backend: str, threads: int, tickets: int, worker_id: int) -> list:
+    """Save tickets from several threads in one process and return their IDs."""
+    manager = TicketManager(csv_path, backend=backend)
+
+    def save(n: int) -> str:
+        ticket_id = manager.save_ticket({
+            'user_query': f"worker {worker_id} ticket {n}",
+            'confidence': 0.5
+        })
+        if n % 5 == 0:
+            manager.update_ticket_status(ticket_id, 'Escalated', 'Network Team')
+        return ticket_id
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(save, range(tickets)))
+
+
+def run(backend: str, processes: int, threads: int, tickets: int) -> bool:
+    """Run the stress test and report whether it passed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tickets.csv")
+        TicketManager(csv_path, backend=backend)
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_worker, csv_path, backend, threads, tickets, worker_id)
+                for worker_id in range(processes)
+            ]
+            issued = [ticket_id for future in futures for ticket_id in future.result()]
+
+        manager = TicketManager(csv_path, backend=backend)
+        df = manager.load_tickets()
+        rebuilt = TicketAggregates.from_frame(df)
+        maintained = manager.store.aggregates()
+        expected = processes * tickets
+        stored = set(df['ticket_id'])
+        escalated = int((df['status'] == 'Escalated').sum())
+
+        checks = {
+            'issued IDs are unique': len(set(issued)) == len(issued) == expected,
+            'no rows lost': len(df) == expected and stored == set(issued),
+            'no updates lost': escalated == processes * len(range(0, tickets, 5)),
+            'aggregates match rows': (
+                maintained.total == rebuilt.total and maintained.counts == rebuilt.counts
+            ),
+        }
+
+    print(f"backend={backend} processes={processes} threads={threads} tickets/process={tickets}")
+    for name, ok in checks.items():
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["csv", "sqlite", "all"], default="all")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--tickets", type=int, default=25, help="tickets saved per process")
+    args = parser.parse_args()
+
+    backends = ["csv", "sqlite"] if args.backend == "all" else [args.backend]
+    results = [run(backend, args.processes, args.threads, args.tickets) for backend in backends]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
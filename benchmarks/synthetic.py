@@ -0,0 +1,167 @@
+"""Synthetic ticket data for benchmarks.
+
+Usage:
+    python benchmarks/synthetic.py data/synthetic_tickets.csv --rows 1000000
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.storage import COLUMNS
+
+
+# (category, department, query, relative frequency, P(High, Medium, Low) urgency)
+ISSUES = [
+    ("Login/Access", "IT Security", "I forgot my password and can't log in", 14, (0.05, 0.35, 0.60)),
+    ("Login/Access", "IT Security", "My account is locked after too many attempts", 9, (0.10, 0.55, 0.35)),
+    ("Login/Access", "IT Security", "I don't have access to the shared finance folder", 5, (0.05, 0.45, 0.50)),
+    ("Login/Access", "IT Security", "I clicked a link in a suspicious phishing email", 2, (0.80, 0.20, 0.00)),
+    ("Software", "Software Team", "My application keeps crashing when I open large files", 9, (0.10, 0.60, 0.30)),
+    ("Software", "Software Team", "Outlook won't launch after the latest update", 8, (0.15, 0.60, 0.25)),
+    ("Software", "Software Team", "I need Adobe Acrobat installed on my machine", 5, (0.00, 0.15, 0.85)),
+    ("Software", "Software Team", "Excel freezes every time I save a workbook", 4, (0.05, 0.55, 0.40)),
+    ("Hardware", "Hardware Team", "The printer on my floor is not printing anything", 8, (0.05, 0.40, 0.55)),
+    ("Hardware", "Hardware Team", "My laptop screen flickers and shows weird colors", 6, (0.05, 0.55, 0.40)),
+    ("Hardware", "Hardware Team", "My computer won't turn on this morning", 4, (0.30, 0.60, 0.10)),
+    ("Hardware", "Hardware Team", "My keyboard has several keys that stopped working", 3, (0.00, 0.35, 0.65)),
+    ("Network", "Network Team", "I can't connect to the internet from my desk", 6, (0.20, 0.60, 0.20)),
+    ("Network", "Network Team", "VPN keeps disconnecting every few minutes", 6, (0.10, 0.60, 0.30)),
+    ("Network", "Network Team", "The shared drive is down for everyone in the office", 2, (0.90, 0.10, 0.00)),
+    ("Network", "Network Team", "The Wi-Fi is very slow in the meeting rooms", 3, (0.00, 0.40, 0.60)),
+    ("Other", "General Support", "I need a new monitor for my workstation", 4, (0.00, 0.10, 0.90)),
+    ("Other", "General Support", "How do I book a room with the projector?", 3, (0.00, 0.05, 0.95)),
+]
+# Wording around the core issue, so the text isn't nine strings repeated.
+OPENERS = ["", "", "Hi, ", "Hello team, ", "Urgent: ", "Since this morning ", "Not sure who to ask, but "]
+DETAILS = ["", "", " since the last update", " on my work laptop", " and I have a deadline today",
+           " even after restarting", " when working from home", " for the second time this week"]
+# Probability a ticket is escalated, by urgency.
+ESCALATION_RATE = {'High': 0.45, 'Medium': 0.2, 'Low': 0.08}
+SOLUTION = (
+    "- Restart the affected device and try again\n"
+    "- Check for pending updates and install them\n"
+    "- Clear the local cache and sign in again\n"
+    "- Contact {department} if the problem persists"
+)
+
+
+def generate_tickets(rows: int, seed: int = 0, start: datetime = datetime(2024, 1, 1), days: int = 365) -> pd.DataFrame:
+    """Return ``rows`` realistic-looking tickets spread over ``days`` days.
+
+    Issues follow a weighted helpdesk mix (access problems most common,
+    outages rare), urgency depends on the issue, urgent tickets are
+    escalated more often and with lower confidence, and about 5% are
+    routed to General Support. The same seed gives the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([i[3] for i in ISSUES], dtype=float)
+    issue = rng.choice(len(ISSUES), rows, p=weights / weights.sum())
+    offsets = np.sort(rng.integers(0, days * 86400, rows))
+    timestamps = pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s')
+
+    # Draw each ticket's urgency from its issue's distribution.
+    cumulative = np.cumsum(np.array([i[4] for i in ISSUES]), axis=1)[issue]
+    urgency = np.array(['High', 'Medium', 'Low'], dtype=object)[
+        np.minimum((rng.random(rows)[:, None] >= cumulative).sum(axis=1), 2)
+    ]
+    escalated = rng.random(rows) < pd.Series(urgency).map(ESCALATION_RATE).to_numpy()
+    confidence = np.where(escalated, rng.uniform(0.5, 0.85, rows), rng.uniform(0.75, 0.99, rows)).round(2)
+
+    categories = np.array([i[0] for i in ISSUES], dtype=object)
+    departments = np.array([i[1] for i in ISSUES], dtype=object)[issue]
+    departments[rng.random(rows) < 0.05] = 'General Support'
+    queries = np.array([i[2] for i in ISSUES], dtype=object)
+    # Mid-sentence after an opener: "Hi, my laptop..." but still "Hi, I can't...".
+    lowered = np.array([q if q.startswith(("I ", "I'")) else q[0].lower() + q[1:] for q in queries], dtype=object)
+    openers = np.array(OPENERS, dtype=object)[rng.integers(0, len(OPENERS), rows)]
+    details = np.array(DETAILS, dtype=object)[rng.integers(0, len(DETAILS), rows)]
+    solutions = np.array([SOLUTION.format(department=i[1]) for i in ISSUES], dtype=object)
+    days_str = pd.Series(timestamps.strftime('%Y%m%d'))
+    sequence = days_str.groupby(days_str).cumcount() + 1
+    return pd.DataFrame({
+        'ticket_id': "TKT-" + days_str + "-" + sequence.map("{:04d}".format),
+        'timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        'user_query': openers + np.where(openers == "", queries[issue], lowered[issue]) + details + " (ref "
+                      + pd.Series(rng.integers(0, 10**6, rows)).astype(str).values + ")",
+        'category': categories[issue],
+        'urgency': urgency,
+        'solution': solutions[issue],
+        'department': departments,
+        'status': np.where(escalated, 'Escalated', 'Resolved'),
+        'resolved_by': np.where(escalated, 'Escalated', 'AI'),
+        'confidence': confidence,
+        'source': rng.choice(['llm', 'cache', 'semantic_cache', 'fast_path'], rows, p=[0.6, 0.15, 0.1, 0.15]),
+    })[COLUMNS]
+
+
+# Knowledge base article vocabulary, per category.
+ARTICLE_SUBJECTS = {
+    "Software": ["Outlook", "Excel", "Teams", "Acrobat", "Browser", "ERP client", "Antivirus"],
+    "Hardware": ["Printer", "Laptop", "Monitor", "Docking station", "Keyboard", "Headset", "Scanner"],
+    "Network": ["VPN", "Wi-Fi", "Shared drive", "Proxy", "Ethernet port", "Remote desktop"],
+    "Login/Access": ["Password", "MFA token", "Account", "Folder permission", "Single sign-on"],
+    "Other": ["Room booking", "Equipment request", "Onboarding", "Desk phone"],
+}
+ARTICLE_PROBLEMS = ["Not Working", "Keeps Crashing", "Is Slow", "Won't Start", "Shows an Error",
+                    "Disconnects", "Access Denied", "Needs a Reset", "Setup Guide"]
+ARTICLE_STEPS = ["restart the device", "clear the local cache", "reinstall the application",
+                 "check the cables and power", "update the drivers", "reset your password in the portal",
+                 "reconnect to the VPN", "sign out and back in", "check the status page for outages",
+                 "run the network diagnostics", "ask your manager to approve access",
+                 "raise a request with the service desk"]
+
+
+def generate_knowledge_base(articles: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """Return a knowledge base (category -> articles, as in the JSON file) of ``articles`` articles."""
+    rng = np.random.default_rng(seed)
+    categories = list(ARTICLE_SUBJECTS)
+    kb = {category: [] for category in categories}
+    for _ in range(articles):
+        category = categories[rng.integers(len(categories))]
+        subject = ARTICLE_SUBJECTS[category][rng.integers(len(ARTICLE_SUBJECTS[category]))]
+        steps = rng.choice(ARTICLE_STEPS, rng.integers(2, 5), replace=False)
+        kb[category].append({
+            'title': f"{subject} {ARTICLE_PROBLEMS[rng.integers(len(ARTICLE_PROBLEMS))]}",
+            'solution': ", then ".join(steps).capitalize()
+        })
+    return kb
+
+
+def write_csv(path: str, rows: int, seed: int = 0, chunk_size: int = 200_000):
+    """Write a synthetic ticket CSV in chunks to keep memory bounded.
+
+    Each chunk covers its own range of days, so per-day ticket IDs stay unique.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    start = datetime(2024, 1, 1)
+    days_per_chunk = max(1, 365 * min(chunk_size, rows) // max(rows, 1))
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for number, offset in enumerate(range(0, rows, chunk_size)):
+            chunk = generate_tickets(
+                min(chunk_size, rows - offset),
+                seed=seed + number,
+                start=start + timedelta(days=number * days_per_chunk),
+                days=days_per_chunk
+            )
+            chunk.to_csv(f, index=False, header=offset == 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.path, args.rows, args.seed)
+    print(f"wrote {args.rows:,} tickets to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
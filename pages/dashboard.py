@@ -2,12 +2,14 @@
 import streamlit as st
 import sys
 import os
-import matplotlib.pyplot as plt
+import tempfile
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import TicketManager, AnalyticsDashboard
+from utils.analytics import get_shared_analytics
+from utils.export import EXPORT_FORMATS, available_formats
+from utils.resources import get_shared_ticket_manager
 
 st.set_page_config(
     page_title="Dashboard", 
@@ -18,10 +20,26 @@ st.set_page_config(
 
 # Initialize
 if 'ticket_manager' not in st.session_state:
-    st.session_state.ticket_manager = TicketManager()
+    st.session_state.ticket_manager = get_shared_ticket_manager()
 
 if 'analytics' not in st.session_state:
-    st.session_state.analytics = AnalyticsDashboard()
+    st.session_state.analytics = get_shared_analytics()
+
+
+def prepare_export(name, fmt, filters=None, start=None, end=None):
+    """Stream an export to a temp file, replacing this session's previous one."""
+    previous = st.session_state.pop('ticket_export', None)
+    if previous:
+        try:
+            os.remove(previous['path'])
+        except OSError:
+            pass
+    mime, extension = EXPORT_FORMATS[fmt]
+    with tempfile.NamedTemporaryFile(prefix='helpdesk-export-', suffix=extension, delete=False) as f:
+        for chunk in st.session_state.ticket_manager.export(fmt, filters, start, end):
+            f.write(chunk)
+    st.session_state.ticket_export = {'path': f.name, 'file_name': f"{name}{extension}", 'mime': mime}
+
 
 # Header
 st.title("📊 Helpdesk Dashboard")
@@ -38,10 +56,30 @@ with st.sidebar:
     st.metric("AI Resolved", stats['ai_resolved'])
     st.metric("Escalated", stats['escalated'])
     st.metric("Resolution Rate", f"{stats['resolution_rate']:.1f}%")
+    st.metric("Fast-Path Rate", f"{stats['fast_path_rate']:.1f}%",
+              help="Tickets answered by the local classifier without calling the LLM")
+
+# Charts and KPIs come from the per-day rollup, not the ticket rows
+data_version = st.session_state.ticket_manager.data_version()
+all_cube = st.session_state.ticket_manager.load_rollup()
+cube = all_cube
+days = cube['day'].dropna()
+
+if not days.empty:
+    first_day, last_day = days.min().date(), days.max().date()
+    date_range = st.date_input(
+        "📅 Date range",
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day
+    )
+    # While only the first day of a range is picked, show just that day
+    start_day, end_day = (tuple(date_range) * 2)[:2] if date_range else (first_day, last_day)
+    cube = cube[(cube['day'].dt.date >= start_day) & (cube['day'].dt.date <= end_day)]
+else:
+    start_day = end_day = None
 
-# Load data
-df = st.session_state.ticket_manager.load_tickets()
-stats = st.session_state.ticket_manager.get_statistics()
+stats = st.session_state.ticket_manager.rollup_statistics(cube)
 
 # KPI Metrics
 st.subheader("📈 Key Performance Indicators")
@@ -76,24 +114,22 @@ with col4:
         help="Average AI confidence score"
     )
 
-if not df.empty:
+if not all_cube.empty:
     st.markdown("---")
     
     # Charts Row 1
     st.subheader("📊 Visual Analytics")
+    # Charts only re-render when tickets or the date range change, not on filter reruns
+    chart_key = (data_version, start_day, end_day)
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("##### 🏷️ Category Distribution")
-        fig, ax = st.session_state.analytics.create_category_distribution(df)
-        st.pyplot(fig)
-        plt.close()
+        st.image(st.session_state.analytics.chart_png('category', cube, chart_key), use_column_width=True)
     
     with col2:
         st.markdown("##### ⚠️ Urgency Levels")
-        fig, ax = st.session_state.analytics.create_urgency_distribution(df)
-        st.pyplot(fig)
-        plt.close()
+        st.image(st.session_state.analytics.chart_png('urgency', cube, chart_key), use_column_width=True)
     
     st.markdown("---")
     
@@ -102,55 +138,66 @@ if not df.empty:
     
     with col1:
         st.markdown("##### 🏢 Department Workload")
-        fig, ax = st.session_state.analytics.create_department_workload(df)
-        st.pyplot(fig)
-        plt.close()
+        st.image(st.session_state.analytics.chart_png('department', cube, chart_key), use_column_width=True)
     
     with col2:
         st.markdown("##### 📈 Ticket Timeline")
-        fig, ax = st.session_state.analytics.create_resolution_timeline(df)
-        st.pyplot(fig)
-        plt.close()
+        st.image(st.session_state.analytics.chart_png('timeline', cube, chart_key), use_column_width=True)
     
     # Recent Tickets
     st.markdown("---")
     st.subheader("🎫 Recent Tickets")
     
-    # Filter options
-    col1, col2, col3 = st.columns(3)
+    # Filter options cover every value seen, so they don't change with the date range
+    categories = [c for c in all_cube['category'].unique().tolist() if c]
+    statuses = [s for s in all_cube['status'].unique().tolist() if s]
+    col1, col2, col3, col4 = st.columns([3, 3, 3, 1])
     
     with col1:
         category_filter = st.multiselect(
             "Filter by Category",
-            options=df['category'].unique().tolist(),
-            default=df['category'].unique().tolist()
+            options=categories,
+            default=categories
         )
     
     with col2:
         urgency_filter = st.multiselect(
             "Filter by Urgency",
             options=['High', 'Medium', 'Low'],
-            default=df['urgency'].unique().tolist()
+            default=['High', 'Medium', 'Low']
         )
     
     with col3:
         status_filter = st.multiselect(
             "Filter by Status",
-            options=df['status'].unique().tolist(),
-            default=df['status'].unique().tolist()
+            options=statuses,
+            default=statuses
         )
     
-    # Apply filters
-    filtered_df = df[
-        (df['category'].isin(category_filter)) &
-        (df['urgency'].isin(urgency_filter)) &
-        (df['status'].isin(status_filter))
-    ]
+    with col4:
+        page_size = st.selectbox("Per page", options=[10, 25, 50])
     
-    recent_df = filtered_df.tail(10).sort_values('timestamp', ascending=False)
+    filters = {'category': category_filter, 'urgency': urgency_filter, 'status': status_filter}
+    
+    # Cursors of the pages visited so far; changing the filters starts over
+    query_key = (repr(filters), start_day, end_day, page_size)
+    if st.session_state.get('ticket_query_key') != query_key:
+        st.session_state.ticket_query_key = query_key
+        st.session_state.ticket_cursors = [None]
+    cursors = st.session_state.ticket_cursors
+    
+    # Only one page is fetched, newest first, whatever the history size
+    recent_df, next_cursor = st.session_state.ticket_manager.query(
+        filters,
+        limit=page_size,
+        cursor=cursors[-1],
+        start=start_day,
+        end=end_day,
+        columns=['ticket_id', 'timestamp', 'category', 'urgency', 'status', 'user_query', 'department']
+    )
     
     st.dataframe(
-        recent_df[['ticket_id', 'timestamp', 'category', 'urgency', 'status', 'user_query', 'department']],
+        recent_df,
         use_container_width=True,
         hide_index=True,
         column_config={
@@ -164,29 +211,71 @@ if not df.empty:
         }
     )
     
-    # Export options
-    st.markdown("---")
-    col1, col2 = st.columns([1, 3])
+    # The rollup has all three filter columns, so the match count needs no scan
+    matching = int(cube[
+        cube['category'].isin(category_filter) &
+        cube['urgency'].isin(urgency_filter) &
+        cube['status'].isin(status_filter)
+    ]['count'].sum())
+    col1, col2, col3 = st.columns([1, 3, 1])
     
     with col1:
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download Filtered Data",
-            data=csv,
-            file_name="filtered_tickets.csv",
-            mime="text/csv",
+        st.button(
+            "◀ Newer",
+            disabled=len(cursors) == 1,
+            on_click=cursors.pop,
             use_container_width=True
         )
     
     with col2:
-        all_csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download All Tickets",
-            data=all_csv,
-            file_name="all_tickets.csv",
-            mime="text/csv",
+        pages = max(1, -(-matching // page_size))
+        st.caption(f"Page {len(cursors)} of {pages} · {matching:,} matching tickets")
+    
+    with col3:
+        st.button(
+            "Older ▶",
+            disabled=next_cursor is None,
+            on_click=cursors.append,
+            args=(next_cursor,),
             use_container_width=True
         )
+    
+    if not st.session_state.ticket_manager.indexed_queries:
+        st.caption(
+            "ℹ️ The CSV backend scans every ticket to build each page. "
+            "Set `HELPDESK_STORAGE=sqlite` for indexed paging on large histories."
+        )
+    
+    # Export options: nothing is serialized until an export is requested,
+    # and then it is streamed from the store in chunks to a temp file
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 2, 2])
+    
+    with col1:
+        export_format = st.selectbox("Export format", options=available_formats())
+    
+    with col2:
+        if st.button("📦 Prepare Filtered Export", use_container_width=True):
+            with st.spinner("Exporting filtered tickets..."):
+                prepare_export("filtered_tickets", export_format, filters, start_day, end_day)
+    
+    with col3:
+        if st.button("📦 Prepare Full Export", use_container_width=True):
+            with st.spinner("Exporting all tickets..."):
+                prepare_export("all_tickets", export_format)
+    
+    export = st.session_state.get('ticket_export')
+    if export and os.path.exists(export['path']):
+        # st.download_button (Streamlit 1.39) takes the file contents up front,
+        # so only a prepared export is ever held in memory
+        with open(export['path'], 'rb') as f:
+            st.download_button(
+                label=f"📥 Download {export['file_name']}",
+                data=f,
+                file_name=export['file_name'],
+                mime=export['mime'],
+                use_container_width=True
+            )
 
 else:
     st.info("📭 No tickets yet! Go to the main page to submit your first ticket.")
@@ -195,4 +284,12 @@ else:
 
 # Footer
 st.markdown("---")
-st.caption(f"📊 Dashboard last updated: {df['timestamp'].max() if not df.empty else 'No data'}")
+latest, _ = st.session_state.ticket_manager.query(limit=1, columns=['timestamp'])
+st.caption(f"📊 Dashboard last updated: {latest['timestamp'].iloc[0] if not latest.empty else 'No data'}")
+footprint = st.session_state.ticket_manager.memory_report(all_cube)
+st.caption(f"🧮 {footprint['rows']:,} rollup cells loaded · {footprint['total_bytes'] / 1e6:.1f} MB in memory")
+render_stats = st.session_state.analytics.render_stats()
+st.caption(
+    f"🖼️ Charts: {render_stats['renders']} rendered (avg {render_stats['avg_render_ms']:.0f} ms), "
+    f"{render_stats['hits']} served from cache ({render_stats['hit_rate']:.0%})"
+)
@@ -0,0 +1,315 @@
+"""Headless HTTP/JSON API for submitting and tracking helpdesk tickets.
+
+A plain ASGI application, so machine clients (monitoring, email
+gateways) can create tickets without the Streamlit UI. Run it with:
+
+    uvicorn service:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+    GET   /health              liveness check
+    POST  /tickets             {"user_query": ..., "priority"?: "interactive"|"batch"}
+                               -> 202 {"ticket_id", "analysis": "pending"}
+    GET   /tickets/<id>        the ticket plus the state of its analysis
+    PATCH /tickets/<id>        {"status": ..., "department": ..., ...}
+    POST  /analyze             {"user_query": ...} -> analysis, nothing stored
+    GET   /stats               ticket statistics, LLM metrics, scheduler and queue depth
+
+Every request shares one ``TicketManager`` and one ``GroqClient`` (with
+its connection pool and caches). Submitted tickets are stored as Open
+straight away and queued in the durable job queue (``utils.jobs``); a
+pool of background workers writes the analysis back onto the ticket,
+and jobs still queued at shutdown are picked up on the next start.
+"""
+import asyncio
+import json
+import os
+import re
+from typing import Dict, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils import GroqClient, TicketManager
+from utils.jobs import AnalysisWorkerPool, JobQueue, get_shared_job_queue
+from utils.resources import get_shared_groq_client, get_shared_ticket_manager
+from utils.scheduler import PRIORITY_LANES
+from utils.schema import CATEGORY_VALUES
+
+load_dotenv()
+
+# Fields a client may change with PATCH /tickets/<id>.
+UPDATABLE_FIELDS = ['status', 'department', 'resolved_by', 'category', 'urgency', 'solution']
+# Written onto API tickets along with their analysis.
+RESOLVED_FIELDS = {'status': 'Resolved', 'resolved_by': 'AI'}
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_QUERY_CHARS = 20_000
+
+
+class HTTPError(Exception):
+    """An error response with a status code and message."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        """Initialize the error with its status, message and extra headers."""
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _clean(record: Dict) -> Dict:
+    """Make a ticket row JSON-safe (NaN -> None, numpy scalars -> Python)."""
+    cleaned = {}
+    for key, value in record.items():
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            cleaned[key] = None
+        elif hasattr(value, 'item'):
+            cleaned[key] = value.item()
+        else:
+            cleaned[key] = value
+    return cleaned
+
+
+def _job_state(job: Optional[Dict]) -> Dict:
+    """Summarize a queue job for API responses."""
+    if job is None:
+        return {'state': 'unknown'}
+    state = {'job_id': job['job_id'], 'state': job['state'], 'attempts': job['attempts']}
+    if job['error'] and job['state'] != 'done':
+        state['error'] = job['error']
+    if job['result'] and job['result'].get('degraded'):
+        # The ticket holds a provisional answer given while the LLM was unavailable.
+        state['degraded'] = True
+    return state
+
+
+class HelpdeskService:
+    """ASGI app: routes requests and runs the background analysis workers.
+
+    ``ticket_manager``, ``groq_client`` and ``job_queue`` can be injected;
+    otherwise the process-wide ones (``utils.resources``, ``utils.jobs``)
+    are used. Worker count comes from ``HELPDESK_JOB_WORKERS`` and the
+    number of pending jobs accepted from ``HELPDESK_API_QUEUE_SIZE``.
+    """
+
+    ROUTES = [
+        ('GET', re.compile(r'^/health$'), 'health'),
+        ('POST', re.compile(r'^/tickets$'), 'submit_ticket'),
+        ('GET', re.compile(r'^/tickets/(?P<ticket_id>[\w-]+)$'), 'get_ticket'),
+        ('PATCH', re.compile(r'^/tickets/(?P<ticket_id>[\w-]+)$'), 'update_ticket'),
+        ('POST', re.compile(r'^/analyze$'), 'analyze'),
+        ('GET', re.compile(r'^/stats$'), 'stats'),
+    ]
+
+    def __init__(
+        self,
+        ticket_manager: Optional[TicketManager] = None,
+        groq_client: Optional[GroqClient] = None,
+        job_queue: Optional[JobQueue] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        """Initialize the service; shared objects and workers start with the app."""
+        self.ticket_manager = ticket_manager
+        self.groq_client = groq_client
+        self.job_queue = job_queue
+        self.workers = workers or int(os.getenv("HELPDESK_JOB_WORKERS", "2"))
+        self.queue_size = queue_size or int(os.getenv("HELPDESK_API_QUEUE_SIZE", "1000"))
+        self._pool = None
+        self._start_lock = asyncio.Lock()
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def startup(self):
+        """Build the shared objects and start the worker pool (idempotent)."""
+        async with self._start_lock:
+            if self._pool is not None:
+                return
+            if self.ticket_manager is None:
+                self.ticket_manager = get_shared_ticket_manager()
+            if self.groq_client is None:
+                self.groq_client = await asyncio.to_thread(get_shared_groq_client, self.ticket_manager)
+            if self.job_queue is None:
+                self.job_queue = get_shared_job_queue()
+            self._pool = AnalysisWorkerPool(
+                self.job_queue, self.groq_client, self.ticket_manager, workers=self.workers
+            ).start()
+
+    async def shutdown(self):
+        """Stop the workers; queued jobs stay in the queue for the next start."""
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.stop)
+            self._pool = None
+
+    # -- handlers -------------------------------------------------------
+
+    async def health(self, body, **params) -> Dict:
+        """GET /health: report that the service is up."""
+        return {'status': 'ok'}
+
+    async def submit_ticket(self, body, **params):
+        """POST /tickets: store a ticket and queue its analysis."""
+        user_query = self._user_query(body)
+        priority = body.get('priority', 'interactive')
+        if priority not in PRIORITY_LANES:
+            raise HTTPError(400, f"'priority' must be one of: {', '.join(PRIORITY_LANES)}")
+        counts = await asyncio.to_thread(self.job_queue.counts)
+        if counts['pending'] >= self.queue_size:
+            raise HTTPError(503, "Analysis queue is full, retry later", {'retry-after': '5'})
+        ticket_id = await asyncio.to_thread(self.ticket_manager.save_ticket, {
+            'user_query': user_query,
+            # Classification stays empty until the analysis lands.
+            'category': '',
+            'urgency': '',
+            'solution': '',
+            'department': '',
+            'status': 'Open',
+            'resolved_by': '',
+            'confidence': None,
+            'source': ''
+        })
+        await asyncio.to_thread(self.job_queue.enqueue, ticket_id, user_query, RESOLVED_FIELDS, priority)
+        return 202, {'ticket_id': ticket_id, 'status': 'Open', 'analysis': 'pending'}
+
+    async def get_ticket(self, body, ticket_id: str) -> Dict:
+        """GET /tickets/<id>: return a ticket and the state of its analysis."""
+        ticket = await asyncio.to_thread(self.ticket_manager.get_ticket_by_id, ticket_id)
+        if ticket is None:
+            raise HTTPError(404, f"Ticket {ticket_id} not found")
+        job = await asyncio.to_thread(self.job_queue.latest_for_ticket, ticket_id)
+        return {**_clean(ticket), 'analysis': _job_state(job)}
+
+    async def update_ticket(self, body, ticket_id: str) -> Dict:
+        """PATCH /tickets/<id>: change the updatable fields of a ticket."""
+        if not isinstance(body, dict) or not body:
+            raise HTTPError(400, "Expected a JSON object of fields to update")
+        unknown = sorted(set(body) - set(UPDATABLE_FIELDS))
+        if unknown:
+            raise HTTPError(400, f"Fields cannot be updated: {', '.join(unknown)}")
+        for field, value in body.items():
+            if field in CATEGORY_VALUES and value not in CATEGORY_VALUES[field]:
+                raise HTTPError(400, f"Invalid {field}: {value!r}")
+        if not await asyncio.to_thread(self.ticket_manager.update_ticket, ticket_id, body):
+            raise HTTPError(404, f"Ticket {ticket_id} not found")
+        return await self.get_ticket(None, ticket_id)
+
+    async def analyze(self, body, **params) -> Dict:
+        """POST /analyze: analyze a query synchronously without storing a ticket."""
+        user_query = self._user_query(body)
+        analysis = await asyncio.to_thread(self.groq_client.analyze_ticket, user_query)
+        if not analysis:
+            raise HTTPError(502, "Analysis failed")
+        return analysis
+
+    async def stats(self, body, **params) -> Dict:
+        """GET /stats: return ticket, LLM, cache, scheduler and queue statistics."""
+        statistics = await asyncio.to_thread(self.ticket_manager.get_statistics)
+        return {
+            'tickets': statistics,
+            'llm': self.groq_client.get_metrics(),
+            'cache': self.groq_client.get_cache_stats(),
+            'scheduler': self.groq_client.get_scheduler_stats(),
+            'breaker': self.groq_client.get_breaker_stats(),
+            'queue': {
+                **await asyncio.to_thread(self.job_queue.counts),
+                'capacity': self.queue_size,
+                'workers': self.workers
+            }
+        }
+
+    @staticmethod
+    def _user_query(body) -> str:
+        """Return the validated, stripped ``user_query`` of a request body."""
+        user_query = body.get('user_query') if isinstance(body, dict) else None
+        if not isinstance(user_query, str) or not user_query.strip():
+            raise HTTPError(400, "'user_query' must be a non-empty string")
+        if len(user_query) > MAX_QUERY_CHARS:
+            raise HTTPError(413, f"'user_query' is longer than {MAX_QUERY_CHARS} characters")
+        return user_query.strip()
+
+    # -- ASGI plumbing --------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        """Handle one ASGI connection."""
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        # Servers without lifespan support still get a working service.
+        await self.startup()
+        try:
+            handler, params = self._route(scope['method'], scope['path'])
+            body = await self._read_json(scope, receive)
+            result = await handler(body, **params)
+            status, payload = result if isinstance(result, tuple) else (200, result)
+            await self._send_json(send, status, payload)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {'error': e.message}, e.headers)
+        except Exception as e:
+            await self._send_json(send, 500, {'error': f"Internal error: {e}"})
+
+    async def _lifespan(self, receive, send):
+        """Start and stop the workers on ASGI lifespan events."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _route(self, method: str, path: str):
+        """Return the handler and path parameters for a request."""
+        allowed = []
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return getattr(self, name), match.groupdict()
+                allowed.append(route_method)
+        if allowed:
+            raise HTTPError(405, f"Method {method} not allowed", {'allow': ', '.join(allowed)})
+        raise HTTPError(404, f"No route for {path}")
+
+    @staticmethod
+    async def _read_json(scope, receive):
+        """Read and parse the JSON request body (None if there is none)."""
+        if scope['method'] in ('GET', 'HEAD'):
+            return None
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        raw = b''.join(chunks)
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+
+    @staticmethod
+    async def _send_json(send, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        """Send ``payload`` as a JSON response."""
+        body = json.dumps(payload, default=str).encode('utf-8')
+        raw_headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        raw_headers += [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+        await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = HelpdeskService()
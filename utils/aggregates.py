@@ -0,0 +1,114 @@
+"""Running aggregates over the ticket table."""
+import pandas as pd
+from typing import Dict, Optional
+
+
+AGGREGATE_FIELDS = ['resolved_by', 'category', 'urgency', 'department', 'status', 'source']
+
+
+class TicketAggregates:
+    """Counts per field value plus a running confidence sum.
+
+    ``source`` records how each ticket was analyzed (llm, cache,
+    semantic_cache, fast_path, or fallback/queued while the LLM was down).
+
+    Stores apply ``add``/``remove`` for every insert and update, so reading
+    statistics never touches the ticket rows themselves. Empty values (None,
+    NaN or '') are not counted: a CSV round trip turns '' into NaN, so a
+    row has to count the same way before and after it is read back.
+    """
+
+    # Stored with persisted aggregates; bump it when the counting rules change.
+    VERSION = 2
+
+    def __init__(
+        self,
+        total: int = 0,
+        confidence_sum: float = 0.0,
+        confidence_count: int = 0,
+        counts: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """Initialize aggregates, empty by default."""
+        self.total = total
+        self.confidence_sum = confidence_sum
+        self.confidence_count = confidence_count
+        self.counts = {field: dict((counts or {}).get(field, {})) for field in AGGREGATE_FIELDS}
+
+    @staticmethod
+    def _confidence(row: dict) -> Optional[float]:
+        """Return the row's confidence as a float, or None if missing."""
+        value = row.get('confidence')
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return None if pd.isna(value) else value
+
+    def add(self, row: dict, sign: int = 1):
+        """Count a ticket row (or un-count it with sign=-1)."""
+        self.total += sign
+        confidence = self._confidence(row)
+        if confidence is not None:
+            self.confidence_sum += sign * confidence
+            self.confidence_count += sign
+        for field in AGGREGATE_FIELDS:
+            value = row.get(field)
+            if value is None or value == '' or (not isinstance(value, str) and pd.isna(value)):
+                continue
+            bucket = self.counts[field]
+            bucket[str(value)] = bucket.get(str(value), 0) + sign
+            if bucket[str(value)] == 0:
+                del bucket[str(value)]
+
+    def remove(self, row: dict):
+        """Un-count a ticket row."""
+        self.add(row, sign=-1)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TicketAggregates':
+        """Build aggregates from a full ticket frame (used for rebuilds)."""
+        aggregates = cls()
+        if df.empty:
+            return aggregates
+        confidence = pd.to_numeric(df['confidence'], errors='coerce')
+        aggregates.total = len(df)
+        aggregates.confidence_sum = float(confidence.sum())
+        aggregates.confidence_count = int(confidence.notna().sum())
+        for field in AGGREGATE_FIELDS:
+            values = df[field].dropna().astype(str)
+            counts = values[values != ''].value_counts()
+            aggregates.counts[field] = {k: int(v) for k, v in counts.items()}
+        return aggregates
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-friendly dict."""
+        return {
+            'version': self.VERSION,
+            'total': self.total,
+            'confidence_sum': self.confidence_sum,
+            'confidence_count': self.confidence_count,
+            'counts': self.counts
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TicketAggregates':
+        """Deserialize from ``to_dict`` output."""
+        return cls(
+            total=data.get('total', 0),
+            confidence_sum=data.get('confidence_sum', 0.0),
+            confidence_count=data.get('confidence_count', 0),
+            counts=data.get('counts')
+        )
+
+    def summary(self) -> dict:
+        """Return raw totals in the shape of ``TicketStore.statistics``."""
+        resolved_by = self.counts['resolved_by']
+        return {
+            'total': self.total,
+            'ai_resolved': resolved_by.get('AI', 0),
+            'escalated': resolved_by.get('Escalated', 0),
+            'fast_path': self.counts['source'].get('fast_path', 0),
+            'confidence_mean': (
+                self.confidence_sum / self.confidence_count if self.confidence_count else 0.0
+            )
+        }
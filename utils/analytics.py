@@ -1,20 +1,132 @@
 """Analytics and visualization components."""
+import io
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Tuple
+
+
+# Chart name -> AnalyticsDashboard method, for chart_png.
+CHARTS = {
+    'category': 'create_category_distribution',
+    'urgency': 'create_urgency_distribution',
+    'department': 'create_department_workload',
+    'timeline': 'create_resolution_timeline',
+}
+
+# pyplot keeps global figure state, so figures are rendered one at a time.
+_render_lock = threading.Lock()
+
+_plot_modules = None
+
+
+def _plotting() -> Tuple:
+    """Return (pyplot, seaborn), importing and styling them on first use.
+
+    They take most of a second to import, so pages that never draw a
+    chart don't pay for them.
+    """
+    global _plot_modules
+    if _plot_modules is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set_style("whitegrid")
+        sns.set_palette("Set2")
+        _plot_modules = (plt, sns)
+    return _plot_modules
 
 
 class AnalyticsDashboard:
-    """Generate analytics visualizations for helpdesk tickets."""
+    """Generate analytics visualizations for helpdesk tickets.
+
+    Every chart accepts either raw ticket rows or a rollup frame from
+    ``TicketManager.load_rollup`` (one row per cell with a ``count``
+    column); the rollup is the cheap option for large ticket histories.
+
+    ``chart_png`` keeps rendered charts in a small LRU keyed on a data
+    version, so reruns that don't change the tickets reuse the PNG bytes.
+    """
     
-    def __init__(self):
+    def __init__(self, max_cached_charts: int = 64):
         """Initialize analytics dashboard."""
-        sns.set_style("whitegrid")
-        sns.set_palette("Set2")
+        self.max_cached_charts = max_cached_charts
+        self._pngs = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'renders': 0, 'hits': 0, 'render_seconds': 0.0}
+        self._last_render = {}
+
+    def chart_png(self, chart: str, df: pd.DataFrame, key: Hashable) -> bytes:
+        """Return a chart (a ``CHARTS`` name) as PNG bytes, rendering only on a miss.
+
+        ``key`` must change whenever the chart's data does, e.g. the store's
+        ``data_version`` plus the date range shown; ``df`` is only read when
+        the chart has to be rendered.
+        """
+        cache_key = (chart, key)
+        png = self._cached(cache_key)
+        if png is not None:
+            return png
+
+        with _render_lock:
+            # Another session may have rendered it while we waited.
+            png = self._cached(cache_key)
+            if png is not None:
+                return png
+            start = time.perf_counter()
+            fig, _ = getattr(self, CHARTS[chart])(df)
+            buffer = io.BytesIO()
+            # Same output options st.pyplot uses
+            fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+            _plotting()[0].close(fig)
+            elapsed = time.perf_counter() - start
+
+        png = buffer.getvalue()
+        with self._lock:
+            self._pngs[cache_key] = png
+            while len(self._pngs) > self.max_cached_charts:
+                self._pngs.popitem(last=False)
+            self._counters['renders'] += 1
+            self._counters['render_seconds'] += elapsed
+            self._last_render[chart] = elapsed
+        return png
+
+    def _cached(self, cache_key: Tuple) -> Optional[bytes]:
+        """Return cached PNG bytes (counting the hit), or None."""
+        with self._lock:
+            png = self._pngs.get(cache_key)
+            if png is not None:
+                self._pngs.move_to_end(cache_key)
+                self._counters['hits'] += 1
+            return png
+
+    def render_stats(self) -> Dict:
+        """Return chart cache counters and render times in milliseconds."""
+        with self._lock:
+            renders, hits = self._counters['renders'], self._counters['hits']
+            return {
+                'renders': renders,
+                'hits': hits,
+                'hit_rate': hits / (renders + hits) if renders + hits else 0.0,
+                'avg_render_ms': self._counters['render_seconds'] / renders * 1000 if renders else 0.0,
+                'last_render_ms': {chart: seconds * 1000 for chart, seconds in self._last_render.items()},
+                'cached': len(self._pngs)
+            }
+
+    @staticmethod
+    def _counts(df: pd.DataFrame, column: str) -> pd.Series:
+        """Return tickets per value of ``column``, largest first, without empty buckets."""
+        if 'count' in df.columns:
+            counts = df.groupby(column, observed=True)['count'].sum()
+        else:
+            counts = df[column].value_counts()
+        counts = counts[(counts > 0) & (counts.index.astype(str) != '')]
+        return counts.sort_values(ascending=False)
     
     def create_category_distribution(self, df: pd.DataFrame) -> Tuple:
         """Create pie chart for category distribution."""
+        plt, sns = _plotting()
         fig, ax = plt.subplots(figsize=(8, 6))
         
         if df.empty:
@@ -22,7 +134,7 @@ class AnalyticsDashboard:
                    ha='center', va='center', fontsize=14)
             return fig, ax
         
-        category_counts = df['category'].value_counts()
+        category_counts = self._counts(df, 'category')
         colors = sns.color_palette('Set2', len(category_counts))
         
         ax.pie(category_counts.values, labels=category_counts.index, 
@@ -33,6 +145,7 @@ class AnalyticsDashboard:
     
     def create_urgency_distribution(self, df: pd.DataFrame) -> Tuple:
         """Create bar chart for urgency levels."""
+        plt = _plotting()[0]
         fig, ax = plt.subplots(figsize=(8, 6))
         
         if df.empty:
@@ -40,7 +153,7 @@ class AnalyticsDashboard:
                    ha='center', va='center', fontsize=14)
             return fig, ax
         
-        urgency_counts = df['urgency'].value_counts().reindex(['High', 'Medium', 'Low'], fill_value=0)
+        urgency_counts = self._counts(df, 'urgency').reindex(['High', 'Medium', 'Low'], fill_value=0)
         colors = {'High': '#FF6B6B', 'Medium': '#FFA500', 'Low': '#4CAF50'}
         
         bars = ax.bar(urgency_counts.index, urgency_counts.values, 
@@ -60,6 +173,7 @@ class AnalyticsDashboard:
     
     def create_department_workload(self, df: pd.DataFrame) -> Tuple:
         """Create horizontal bar chart for department workload."""
+        plt, sns = _plotting()
         fig, ax = plt.subplots(figsize=(8, 6))
         
         if df.empty:
@@ -67,7 +181,7 @@ class AnalyticsDashboard:
                    ha='center', va='center', fontsize=14)
             return fig, ax
         
-        dept_counts = df['department'].value_counts()
+        dept_counts = self._counts(df, 'department')
         
         ax.barh(dept_counts.index, dept_counts.values, color=sns.color_palette('Set2', len(dept_counts)))
         ax.set_xlabel('Number of Tickets', fontsize=12, fontweight='bold')
@@ -82,6 +196,7 @@ class AnalyticsDashboard:
     
     def create_resolution_timeline(self, df: pd.DataFrame) -> Tuple:
         """Create line chart showing tickets over time."""
+        plt = _plotting()[0]
         fig, ax = plt.subplots(figsize=(10, 6))
         
         if df.empty:
@@ -89,8 +204,12 @@ class AnalyticsDashboard:
                    ha='center', va='center', fontsize=14)
             return fig, ax
         
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        daily_tickets = df.groupby(df['timestamp'].dt.date).size()
+        if 'count' in df.columns:
+            daily_tickets = df.groupby(df['day'].dt.date)['count'].sum()
+        else:
+            # Typed frames already hold datetime64; never write back to the caller's frame
+            timestamps = pd.to_datetime(df['timestamp'])
+            daily_tickets = timestamps.groupby(timestamps.dt.date).size()
         
         ax.plot(daily_tickets.index, daily_tickets.values, marker='o', 
                linewidth=2, markersize=8, color='#4CAF50')
@@ -103,3 +222,16 @@ class AnalyticsDashboard:
         plt.tight_layout()
         
         return fig, ax
+
+
+_shared_analytics = None
+_shared_analytics_lock = threading.Lock()
+
+
+def get_shared_analytics() -> AnalyticsDashboard:
+    """Return the process-wide dashboard renderer, so sessions share its chart cache."""
+    global _shared_analytics
+    with _shared_analytics_lock:
+        if _shared_analytics is None:
+            _shared_analytics = AnalyticsDashboard()
+        return _shared_analytics
@@ -0,0 +1,109 @@
+"""Circuit breaker that stops calling the LLM while it is failing."""
+import os
+import threading
+import time
+from typing import Dict
+
+
+class CircuitOpenError(RuntimeError):
+    """The breaker is open: the call was not attempted."""
+
+
+class CircuitBreaker:
+    """Trips after ``failure_threshold`` bad calls in a row.
+
+    A call is bad if it failed or took at least ``slow_call_seconds``
+    (0 disables the latency check), so a latency spike trips the breaker
+    as surely as an outage does. While ``open`` every call is refused at
+    once; after ``reset_seconds`` the breaker goes ``half_open`` and lets
+    one probe through per ``reset_seconds``. A good probe closes it, a bad
+    one opens it again.
+    """
+
+    STATES = ['closed', 'open', 'half_open']
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, slow_call_seconds: float = 0.0):
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.state = 'closed'
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probe_until = 0.0
+        self._lock = threading.Lock()
+        self._counters = {'failures': 0, 'slow_calls': 0, 'trips': 0, 'rejected': 0}
+
+    def allow(self) -> bool:
+        """Return whether a call may go ahead now."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            now = time.monotonic()
+            if self.state == 'open' and now >= self._opened_at + self.reset_seconds:
+                self.state = 'half_open'
+            # A probe that never reports back frees the slot after reset_seconds.
+            if self.state == 'half_open' and now >= self._probe_until:
+                self._probe_until = now + self.reset_seconds
+                return True
+            self._counters['rejected'] += 1
+            return False
+
+    def record(self, seconds: float, failed: bool = False):
+        """Report the outcome of an allowed call."""
+        slow = bool(self.slow_call_seconds) and seconds >= self.slow_call_seconds
+        with self._lock:
+            if not (failed or slow):
+                self._consecutive = 0
+                self.state = 'closed'
+                return
+            self._counters['failures' if failed else 'slow_calls'] += 1
+            self._consecutive += 1
+            if self.state == 'half_open' or self._consecutive >= self.failure_threshold:
+                if self.state != 'open':
+                    self._counters['trips'] += 1
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self._probe_until = 0.0
+
+    def retry_in(self) -> float:
+        """Return seconds until the next probe may go ahead (0 if calls are allowed)."""
+        with self._lock:
+            if self.state == 'closed':
+                return 0.0
+            now = time.monotonic()
+            return max(0.0, self._opened_at + self.reset_seconds - now, self._probe_until - now)
+
+    def stats(self) -> Dict:
+        """Return the state, consecutive bad calls and failure/slow/trip/rejection counters."""
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._consecutive,
+                'retry_in': round(retry_in, 2),
+                **self._counters
+            }
+
+
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+def get_shared_breaker() -> CircuitBreaker:
+    """Return the process-wide breaker guarding the Groq API.
+
+    It trips after ``HELPDESK_BREAKER_FAILURES`` (default 5) failed calls
+    or calls slower than ``HELPDESK_BREAKER_SLOW_SECONDS`` (default 10)
+    in a row, and probes again after ``HELPDESK_BREAKER_RESET`` seconds
+    (default 30).
+    """
+    global _shared_breaker
+    with _shared_breaker_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("HELPDESK_BREAKER_FAILURES", "5")),
+                reset_seconds=float(os.getenv("HELPDESK_BREAKER_RESET", "30")),
+                slow_call_seconds=float(os.getenv("HELPDESK_BREAKER_SLOW_SECONDS", "10"))
+            )
+        return _shared_breaker
@@ -0,0 +1,160 @@
+"""Bounded TTL/LRU cache for ticket analyses."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .text import normalize_query
+
+
+class AnalysisCache:
+    """Two-tier cache of analysis results keyed on the normalized query.
+
+    The in-memory tier is an LRU bounded by ``max_entries`` with a TTL per
+    entry. The optional disk tier (a small SQLite file at ``disk_path``)
+    survives restarts and is consulted on memory misses; its hits are
+    promoted back into memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 24 * 3600,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 100_000
+    ):
+        """Initialize cache tiers."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or '.', exist_ok=True)
+            self._disk().execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, value TEXT, created REAL)"
+            )
+            self._disk().execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_created ON analysis_cache(created)"
+            )
+
+    @staticmethod
+    def make_key(query: str, model: str, prompt_version: str) -> str:
+        """Build a cache key from the normalized query, model and prompt version."""
+        raw = f"{model}\x1f{prompt_version}\x1f{normalize_query(query)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _disk(self) -> sqlite3.Connection:
+        """Return this thread's connection to the disk tier."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached value, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return json.loads(value)
+                del self._entries[key]
+                self._counters['expired'] += 1
+
+        if self.disk_path:
+            row = self._disk().execute(
+                "SELECT value, created FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                with self._lock:
+                    self._counters['disk_hits'] += 1
+                    self._remember(key, row[1], row[0])
+                return json.loads(row[0])
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, key: str, value: Dict):
+        """Store a value in every tier."""
+        created = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            self._remember(key, created, payload)
+
+        if self.disk_path:
+            conn = self._disk()
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, created) VALUES (?, ?, ?)",
+                (key, payload, created)
+            )
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE created < ? OR key IN ("
+                "SELECT key FROM analysis_cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (created - self.ttl_seconds, self.max_disk_entries)
+            )
+
+    def _remember(self, key: str, created: float, payload: str):
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._entries[key] = (created, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            self._disk().execute("DELETE FROM analysis_cache")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the overall hit rate."""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters['memory_hits'] + counters['disk_hits']
+        lookups = hits + counters['misses']
+        return {
+            **counters,
+            'hits': hits,
+            'lookups': lookups,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'size': size
+        }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> AnalysisCache:
+    """Return the process-wide analysis cache shared by every session.
+
+    Configured with ``HELPDESK_CACHE_SIZE``, ``HELPDESK_CACHE_TTL`` (seconds)
+    and ``HELPDESK_CACHE_PATH`` (enables the on-disk tier).
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = AnalysisCache(
+                max_entries=int(os.getenv("HELPDESK_CACHE_SIZE", "1024")),
+                ttl_seconds=float(os.getenv("HELPDESK_CACHE_TTL", str(24 * 3600))),
+                disk_path=os.getenv("HELPDESK_CACHE_PATH") or None
+            )
+        return _shared_cache
@@ -0,0 +1,241 @@
+"""Local fast-path classifier that answers confident tickets without the LLM."""
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .text import normalize_query, tokenize
+
+
+# (phrases, category, department, urgency, knowledge base article title)
+KEYWORD_RULES = [
+    (("forgot password", "forgot my password", "reset password", "reset my password",
+      "password reset", "password expired"),
+     "Login/Access", "IT Security", "Low", "Forgot Password"),
+    (("account locked", "account is locked", "locked out"),
+     "Login/Access", "IT Security", "Medium", "Account Locked"),
+    (("printer",),
+     "Hardware", "Hardware Team", "Low", "Printer Not Working"),
+    (("won't turn on", "wont turn on", "doesn't turn on", "does not turn on", "not turning on"),
+     "Hardware", "Hardware Team", "Medium", "Computer Won't Turn On"),
+    (("no internet", "connect to the internet", "internet not working", "internet is not working"),
+     "Network", "Network Team", "Medium", "No Internet Connection"),
+    (("slow internet", "slow network", "network is slow", "internet is slow"),
+     "Network", "Network Team", "Low", "Slow Network Speed"),
+    (("keeps crashing", "app crashes", "application crashes", "won't launch", "wont launch", "won't open"),
+     "Software", "Software Team", "Medium", "Application Won't Launch"),
+    (("update failed", "update fails", "won't update", "software update"),
+     "Software", "Software Team", "Low", "Software Update Issues"),
+]
+
+# Anything that may be an outage or security incident always goes to the LLM.
+ESCALATION_PHRASES = (
+    "down", "outage", "breach", "hacked", "ransomware", "virus", "phishing",
+    "everyone", "all users", "whole office", "entire", "data loss", "urgent"
+)
+# Whole words only, so "download" or "shutdown" isn't an outage.
+_ESCALATION = re.compile(r"\b(?:" + "|".join(map(re.escape, ESCALATION_PHRASES)) + r")\b")
+
+TARGETS = ['category', 'urgency', 'department']
+
+# Where each category is routed when only a knowledge base article matched.
+CATEGORY_DEPARTMENTS = {
+    'Software': 'Software Team',
+    'Hardware': 'Hardware Team',
+    'Network': 'Network Team',
+    'Login/Access': 'IT Security',
+    'Other': 'General Support',
+}
+
+# Analyses that didn't come from the LLM; the models never learn from them.
+LOCAL_SOURCES = ('fast_path', 'fallback', 'queued')
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over word tokens for one target column."""
+
+    def __init__(self):
+        """Initialize an untrained model."""
+        self.class_counts = Counter()
+        self.token_counts = defaultdict(Counter)
+        self.class_totals = Counter()
+        self.vocabulary = set()
+
+    def fit(self, token_lists: List[List[str]], labels: List[str]) -> 'NaiveBayesModel':
+        """Count tokens per class."""
+        for tokens, label in zip(token_lists, labels):
+            self.class_counts[label] += 1
+            self.token_counts[label].update(tokens)
+            self.class_totals[label] += len(tokens)
+            self.vocabulary.update(tokens)
+        return self
+
+    def predict(self, tokens: List[str]):
+        """Return (label, posterior probability) for a token list."""
+        if not self.class_counts:
+            return None, 0.0
+        total = sum(self.class_counts.values())
+        vocab_size = len(self.vocabulary) + 1
+        scores = {}
+        for label, count in self.class_counts.items():
+            counts = self.token_counts[label]
+            denominator = self.class_totals[label] + vocab_size
+            scores[label] = math.log(count / total) + sum(
+                math.log((counts.get(token, 0) + 1) / denominator) for token in tokens
+            )
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / norm
+
+
+class FastPathClassifier:
+    """Keyword rules plus naive Bayes models trained on past tickets.
+
+    ``classify`` returns a full analysis (tagged ``source='fast_path'``)
+    when a rule matches unambiguously or when every model is at least
+    ``threshold`` confident, and None otherwise so the caller falls
+    through to the LLM. ``guess`` always tries to answer, for when the
+    LLM is unavailable.
+    """
+
+    def __init__(self, knowledge_base=None, threshold: float = 0.9, min_examples: int = 50):
+        """Initialize classifier with optional knowledge base for solutions."""
+        self.knowledge_base = knowledge_base
+        self.threshold = threshold
+        self.min_examples = min_examples
+        self.models = {}
+        self.trained_on = 0
+
+    def fit(self, df: pd.DataFrame) -> 'FastPathClassifier':
+        """Train per-target models on LLM-analyzed tickets."""
+        if df.empty:
+            return self
+        if 'source' in df.columns:
+            df = df[~df['source'].astype(str).isin(LOCAL_SOURCES)]
+        df = df.dropna(subset=['user_query'] + TARGETS)
+        token_lists = [tokenize(text) for text in df['user_query'].astype(str)]
+        self.models = {
+            target: NaiveBayesModel().fit(token_lists, df[target].astype(str).tolist())
+            for target in TARGETS
+        }
+        self.trained_on = len(df)
+        return self
+
+    def _match_rule(self, query: str):
+        """Return the single rule the query matches, or None if zero or conflicting."""
+        matched = [
+            rule for rule in KEYWORD_RULES
+            if any(phrase in query for phrase in rule[0])
+        ]
+        if not matched or len({rule[1] for rule in matched}) > 1:
+            return None
+        return matched[0]
+
+    def _articles(self, query: str, category: str, title: Optional[str] = None) -> List[Dict]:
+        """Return knowledge base articles to use as the solution."""
+        if self.knowledge_base is None:
+            return []
+        if title:
+            articles = self.knowledge_base.get_articles_by_category(category)
+            matched = [a for a in articles if a.get('title') == title]
+            if matched:
+                return matched
+        return self.knowledge_base.search(query, k=2, category=category) or (
+            self.knowledge_base.get_articles_by_category(category)[:2]
+        )
+
+    def classify(self, user_query: str) -> Optional[Dict]:
+        """Return a confident local analysis, or None to defer to the LLM."""
+        query = normalize_query(user_query)
+        if not query or _ESCALATION.search(query):
+            return None
+        return self._predict(query, self.threshold)
+
+    def guess(self, user_query: str) -> Optional[Dict]:
+        """Return a best-effort analysis for when the LLM can't be reached.
+
+        Unlike ``classify`` it accepts any confidence, falls back to the
+        best-matching knowledge base article, and marks possible incidents
+        High urgency instead of deferring them. None if nothing matches.
+        """
+        query = normalize_query(user_query)
+        if not query:
+            return None
+        analysis = self._predict(query, 0.0) or self._from_articles(query)
+        if analysis is not None and _ESCALATION.search(query):
+            analysis['urgency'] = 'High'
+        return analysis
+
+    def _predict(self, query: str, threshold: float) -> Optional[Dict]:
+        """Answer a normalized query from the rules or models, if ``threshold`` confident."""
+        rule = self._match_rule(query)
+        if rule is not None:
+            _, category, department, urgency, title = rule
+            confidence = 0.95
+        elif self.trained_on >= self.min_examples:
+            tokens = tokenize(query)
+            if not tokens:
+                return None
+            predictions = {target: model.predict(tokens) for target, model in self.models.items()}
+            confidence = min(probability for _, probability in predictions.values())
+            if confidence < threshold:
+                return None
+            category = predictions['category'][0]
+            urgency = predictions['urgency'][0]
+            department = predictions['department'][0]
+            title = None
+        else:
+            return None
+        return self._analysis(query, category, urgency, department, confidence, title)
+
+    def _from_articles(self, query: str) -> Optional[Dict]:
+        """Classify by the knowledge base article that best matches the query."""
+        articles = self.knowledge_base.search(query, k=1) if self.knowledge_base is not None else []
+        if not articles:
+            return None
+        category = articles[0]['category']
+        department = CATEGORY_DEPARTMENTS.get(category, 'General Support')
+        return self._analysis(query, category, 'Medium', department, 0.5, articles[0]['title'])
+
+    def _analysis(self, query: str, category: str, urgency: str, department: str,
+                  confidence: float, title: Optional[str]) -> Dict:
+        """Build a fast-path analysis with knowledge base articles as the solution."""
+        articles = self._articles(query, category, title)
+        solution = "\n".join(f"- {a['solution']}" for a in articles) or (
+            f"Your request has been routed to {department}."
+        )
+        return {
+            'category': category,
+            'urgency': urgency,
+            'solution': solution,
+            'department': department,
+            'knowledge_base_articles': [a['title'] for a in articles],
+            'confidence': round(confidence, 2),
+            'source': 'fast_path'
+        }
+
+
+_shared_classifier = None
+_shared_classifier_lock = threading.Lock()
+
+
+def get_shared_classifier(ticket_manager, knowledge_base=None) -> Optional[FastPathClassifier]:
+    """Return the process-wide fast-path classifier, trained on stored tickets once.
+
+    Disabled with ``HELPDESK_FAST_PATH=off``; the model confidence needed to
+    skip the LLM is ``HELPDESK_FAST_PATH_THRESHOLD`` (default 0.9).
+    """
+    global _shared_classifier
+    if os.getenv("HELPDESK_FAST_PATH", "on").lower() in ("0", "off", "false"):
+        return None
+    with _shared_classifier_lock:
+        if _shared_classifier is None:
+            _shared_classifier = FastPathClassifier(
+                knowledge_base,
+                threshold=float(os.getenv("HELPDESK_FAST_PATH_THRESHOLD", "0.9"))
+            ).fit(ticket_manager.load_tickets(['user_query', 'source'] + TARGETS))
+        return _shared_classifier
@@ -0,0 +1,128 @@
+"""Chunked ticket exports (CSV, gzip'd CSV, Parquet)."""
+import io
+import zlib
+from typing import Iterable, Iterator, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from .schema import TIMESTAMP_FORMAT
+
+
+# Format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'csv.gz': ('application/gzip', '.csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+
+def available_formats() -> list:
+    """Return the export formats usable here (Parquet needs pyarrow)."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pq is not None]
+
+
+def _or_empty(frames: Iterable[pd.DataFrame], columns: List[str]) -> Iterator[pd.DataFrame]:
+    """Pass frames through, or a single empty one if there are none."""
+    empty = True
+    for frame in frames:
+        empty = False
+        yield frame
+    if empty:
+        yield pd.DataFrame(columns=columns)
+
+
+def _csv_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+
+def _gzip_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for data in _csv_chunks(frames):
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file that hands its bytes back with ``drain``."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_table(frame: pd.DataFrame) -> 'pa.Table':
+    """Type a raw chunk with a fixed schema, so every row group matches."""
+    fields, arrays = [], []
+    for column in frame.columns:
+        series = frame[column]
+        if column == 'timestamp':
+            series = pd.to_datetime(series, format=TIMESTAMP_FORMAT, errors='coerce')
+            fields.append(pa.field(column, pa.timestamp('s')))
+        elif column == 'confidence':
+            series = pd.to_numeric(series, errors='coerce').astype('float32')
+            fields.append(pa.field(column, pa.float32()))
+        else:
+            series = series.astype(object).where(series.notna(), None)
+            fields.append(pa.field(column, pa.string()))
+        arrays.append(pa.array(series, type=fields[-1].type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _parquet_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    if pq is None:
+        raise ValueError("Parquet export requires pyarrow")
+    sink, writer = _ByteSink(), None
+    for frame in frames:
+        table = _parquet_table(frame)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        # One row group per chunk, flushed to the caller as it is written
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def iter_export(frames: Iterable[pd.DataFrame], fmt: str = 'csv', columns: List[str] = ()) -> Iterator[bytes]:
+    """Encode ticket frames as a stream of byte chunks in ``fmt``.
+
+    Frames are pulled one at a time, so memory is bounded by a single
+    chunk (plus, for Parquet, the row group being written). ``columns``
+    gives the header of an export with no rows.
+    """
+    frames = _or_empty(frames, list(columns))
+    if fmt == 'csv':
+        return _csv_chunks(frames)
+    if fmt == 'csv.gz':
+        return _gzip_chunks(frames)
+    if fmt == 'parquet':
+        return _parquet_chunks(frames)
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -1,27 +1,171 @@
 """Groq API client for AI-powered ticket analysis."""
+import asyncio
+import copy
 import json
 import os
-from typing import Dict, Optional
+import random
+import time
+from typing import Dict, Iterator, List, Optional
+
+from .breaker import CircuitBreaker, CircuitOpenError, get_shared_breaker
+from .cache import AnalysisCache, get_shared_cache
+from .classifier import FastPathClassifier
+from .json_stream import IncrementalJSONParser
+from .metrics import ClientMetrics, get_shared_metrics
+from .retrieval import ContextRetriever
+from .scheduler import LLMScheduler, estimate_tokens, get_shared_scheduler
+from .similarity import SemanticCache
+from .singleflight import SingleFlight
+
+
+SYSTEM_PROMPT = """You are an expert IT helpdesk AI assistant. Analyze the user's IT issue and provide a structured response.
+
+Response must be valid JSON with this exact structure and key order:
+{
+    "category": "one of: Software, Hardware, Network, Login/Access, Other",
+    "urgency": "one of: High, Medium, Low",
+    "department": "one of: Software Team, Hardware Team, Network Team, IT Security, General Support",
+    "confidence": 0.95,
+    "knowledge_base_articles": ["relevant article 1", "relevant article 2"],
+    "solution": "detailed troubleshooting steps in 3-5 bullet points"
+}
+
+Classification rules:
+- High urgency: System down, security breach, critical data loss, many users affected
+- Medium urgency: Single user unable to work, performance issues, software crashes
+- Low urgency: Enhancement requests, questions, minor inconveniences
+
+Provide practical, actionable solutions."""
+
+# Used with a ContextRetriever: the model cites retrieved articles by ID and
+# only writes the steps they don't already cover.
+GROUNDED_SYSTEM_PROMPT = """You are an expert IT helpdesk AI assistant. Classify the user's IT issue using the provided context.
+
+Respond with valid JSON with this exact structure and key order:
+{
+    "category": "one of: Software, Hardware, Network, Login/Access, Other",
+    "urgency": "one of: High, Medium, Low",
+    "department": "one of: Software Team, Hardware Team, Network Team, IT Security, General Support",
+    "confidence": 0.95,
+    "article_ids": ["IDs of the knowledge base articles that apply, e.g. network-1"],
+    "solution": "at most 2 short extra steps not covered by the cited articles, or empty"
+}
+
+Classification rules:
+- High urgency: System down, security breach, critical data loss, many users affected
+- Medium urgency: Single user unable to work, performance issues, software crashes
+- Low urgency: Enhancement requests, questions, minor inconveniences
+
+Only cite article IDs listed in the context. Do not repeat article text."""
+
+
+# Last resort while the LLM is unavailable and nothing local matched.
+QUEUED_ANALYSIS = {
+    'category': 'Other',
+    'urgency': 'Medium',
+    'department': 'General Support',
+    'confidence': 0.0,
+    'knowledge_base_articles': [],
+    'solution': "Automatic analysis is unavailable right now, so this ticket has been queued for "
+                "General Support. You don't need to resubmit it.",
+    'source': 'queued'
+}
+
+
+class _StreamAbandoned(RuntimeError):
+    """The session leading a streamed analysis stopped reading it."""
 
 
 class GroqClient:
-    """Client for interacting with Groq API using Llama 3.3 70B."""
-    
-    def __init__(self):
+    """Client for interacting with Groq API using Llama 3.3 70B.
+
+    ``client`` and ``async_client`` can be injected (e.g. stubs in tests);
+    otherwise SDK clients are built from ``GROQ_API_KEY`` (on ``http_client``
+    when given, to share a connection pool). The SDK honours
+    ``GROQ_BASE_URL``, so a local fake server can stand in for Groq.
+
+    With a ``retriever`` the prompt carries the top knowledge base articles
+    and similar tickets, and the model answers with article IDs plus a short
+    solution instead of regenerating everything.
+
+    Concurrent analyses of the same (normalized) query share one LLM call
+    through ``single_flight``; callers that join an in-flight call wait up
+    to ``HELPDESK_SINGLE_FLIGHT_TIMEOUT`` seconds (default 120) for it.
+
+    Every API call first gets a slot from ``scheduler`` (the process-wide
+    ``LLMScheduler`` by default) in its priority lane: ``interactive`` for
+    single analyses unless told otherwise, ``batch`` for batch runs.
+
+    Each call has ``timeout`` seconds (``HELPDESK_LLM_TIMEOUT``, default
+    20; 0 for the SDK default) from the first attempt until the response
+    starts, retries and scheduler waits included, and goes through
+    ``breaker`` (the process-wide ``CircuitBreaker``), which refuses calls
+    outright while the API keeps failing or crawling. With ``fallback`` on
+    (the default) a failed or refused analysis isn't None but a degraded
+    answer: the fast-path classifier's best guess (``source='fallback'``)
+    or, failing that, ``QUEUED_ANALYSIS`` (``source='queued'``), both
+    flagged ``degraded`` with the reason in ``fallback_reason`` and never
+    cached.
+    """
+
+    # Bump whenever the system prompt changes so cached analyses are not reused.
+    PROMPT_VERSION = "2"
+
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        client=None,
+        async_client=None,
+        max_retries: int = 4,
+        metrics: Optional[ClientMetrics] = None,
+        fast_path: Optional[FastPathClassifier] = None,
+        retriever: Optional[ContextRetriever] = None,
+        http_client=None,
+        single_flight: Optional[SingleFlight] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: Optional[float] = None,
+        fallback: bool = True
+    ):
         """Initialize Groq client with API key from environment or secrets."""
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.semantic_cache = semantic_cache
+        self.fast_path = fast_path
+        self.retriever = retriever
+        self.metrics = metrics if metrics is not None else get_shared_metrics()
+        self.scheduler = scheduler if scheduler is not None else get_shared_scheduler()
+        self.breaker = breaker if breaker is not None else get_shared_breaker()
+        self.timeout = timeout if timeout is not None else float(os.getenv("HELPDESK_LLM_TIMEOUT", "20"))
+        self.fallback = fallback
+        self.single_flight = single_flight or SingleFlight(
+            timeout=float(os.getenv("HELPDESK_SINGLE_FLIGHT_TIMEOUT", "120"))
+        )
+        self.model = "llama-3.3-70b-versatile"
+        self.max_retries = max_retries
+        self.backoff_base = 0.5
+        self.backoff_max = 30.0
+        self.async_client = async_client
+        self._api_key = None
+
+        if client is not None:
+            self.client = client
+            return
+
         api_key = self._get_api_key()
-        
+
         if not api_key:
             raise ValueError(
                 "GROQ_API_KEY not found. Please add it to:\n"
                 "- Streamlit Cloud: Settings → Secrets\n"
                 "- Local: .env file"
             )
-        
+
         try:
             from groq import Groq
-            self.client = Groq(api_key=api_key)
-            self.model = "llama-3.3-70b-versatile"
+            # Retries are handled here so rate limits back off consistently.
+            self.client = Groq(api_key=api_key, max_retries=0, http_client=http_client)
+            self._api_key = api_key
         except TypeError as e:
             if "proxies" in str(e):
                 raise ValueError(
@@ -33,7 +177,7 @@ class GroqClient:
             raise ValueError(f"Failed to initialize Groq client: {str(e)}")
         except Exception as e:
             raise ValueError(f"Failed to initialize Groq client: {str(e)}")
-    
+
     def _get_api_key(self) -> Optional[str]:
         """Get API key from Streamlit secrets or environment."""
         # Try Streamlit secrets first
@@ -45,62 +189,438 @@ class GroqClient:
                 pass
         except ImportError:
             pass
-        
+
         # Fall back to environment variable
         return os.getenv("GROQ_API_KEY")
-    
-    def analyze_ticket(self, user_query: str) -> Optional[Dict]:
+
+    @property
+    def prompt_version(self) -> str:
+        """Cache-key version of the prompt in use."""
+        return f"{self.PROMPT_VERSION}-grounded" if self.retriever is not None else self.PROMPT_VERSION
+
+    def _request(self, user_query: str) -> Dict:
+        """Build chat completion arguments for a query."""
+        system_prompt, user_content, max_tokens = SYSTEM_PROMPT, f"IT Issue: {user_query}", 1024
+        if self.retriever is not None:
+            context = self.retriever.format_context(self.retriever.retrieve(user_query))
+            system_prompt, max_tokens = GROUNDED_SYSTEM_PROMPT, 384
+            if context:
+                user_content = f"{user_content}\n\n{context}"
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "top_p": 0.9,
+            "response_format": {"type": "json_object"}
+        }
+
+    def _stream_request(self, user_query: str) -> Dict:
+        """Build streaming chat completion arguments for a query."""
+        request = self._request(user_query)
+        # JSON mode can't be combined with streaming; the prompt still asks for JSON.
+        del request["response_format"]
+        request["stream"] = True
+        return request
+
+    def _lookup(self, user_query: str):
+        """Return (cache key, local analysis or None) for a query.
+
+        Tries the exact cache, the semantic cache and then the fast-path
+        classifier; the analysis' ``source`` says which one answered.
+        """
+        cache_key = self.cache.make_key(user_query, self.model, self.prompt_version)
+        cached = self.cache.get(cache_key)
+        kind = 'exact' if cached is not None else None
+        if cached is None and self.semantic_cache is not None:
+            cached = self.semantic_cache.lookup(user_query)
+            kind = 'semantic' if cached is not None else None
+        if cached is None and self.fast_path is not None:
+            cached = self.fast_path.classify(user_query)
+            kind = 'fast_path' if cached is not None else None
+        self.metrics.record_cache(kind)
+        if cached is not None:
+            cached['source'] = {'exact': 'cache', 'semantic': 'semantic_cache'}.get(kind, kind)
+        return cache_key, cached
+
+    def _remember(self, cache_key: str, user_query: str, result: Dict):
+        """Ground, tag and cache a fresh LLM analysis."""
+        if self.retriever is not None:
+            self.retriever.resolve(result)
+        result['source'] = 'llm'
+        self.cache.set(cache_key, result)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(user_query, result)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return seconds to wait before retrying, or None if not retryable."""
+        if attempt >= self.max_retries or getattr(error, 'status_code', None) != 429:
+            return None
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+        try:
+            return min(float(retry_after), self.backoff_max)
+        except (TypeError, ValueError):
+            # Exponential backoff with full jitter
+            return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _is_outage(error: Exception) -> bool:
+        """Return whether an error says the API is unhealthy (not that the request was bad)."""
+        status = getattr(error, 'status_code', None)
+        return status is None or status >= 500 or status in (408, 429)
+
+    def _deadline(self, start: float) -> Optional[float]:
+        """Return the ``perf_counter`` time a call started at ``start`` must finish by."""
+        return start + self.timeout if self.timeout else None
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Dict:
+        """Return the SDK timeout option for what is left of ``deadline``."""
+        if deadline is None:
+            return {}
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError("LLM call deadline exceeded")
+        return {'timeout': remaining}
+
+    def _admit(self):
+        """Raise ``CircuitOpenError`` if the breaker is refusing calls."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Groq API circuit is open after repeated failures; retrying in {self.breaker.retry_in():.0f}s"
+            )
+
+    def _settle(self, request: Dict, response=None):
+        """Correct the scheduler's token reservation with the reported usage.
+
+        Without a response (the call failed) the reservation is returned.
+        """
+        used = ClientMetrics._usage(response).get('total_tokens') if response is not None else 0
+        self.scheduler.settle(estimate_tokens(request), used)
+
+    def _call_with_retry(self, request: Dict, start: float, priority: str = 'interactive'):
+        """Call the chat completion API, retrying on rate limits until the deadline.
+
+        Returns (response, retries); failures are recorded (in the metrics
+        and the breaker) before re-raising.
+        """
+        self._admit()
+        attempt = 0
+        tokens = estimate_tokens(request)
+        deadline = self._deadline(start)
+        while True:
+            wait = self._remaining(deadline).get('timeout')
+            self.scheduler.acquire(priority, tokens, retry=attempt > 0, timeout=wait)
+            sent = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(**request, **self._remaining(deadline))
+            except Exception as e:
+                self._settle(request)
+                delay = self._retry_delay(e, attempt)
+                if delay is None or (deadline is not None and time.perf_counter() + delay >= deadline):
+                    self.breaker.record(time.perf_counter() - sent, failed=self._is_outage(e))
+                    self.metrics.record_call(time.perf_counter() - start, retries=attempt, error=True)
+                    raise
+                attempt += 1
+                # Hold every caller, not just this one; retries go first once it lifts.
+                self.scheduler.pause(delay)
+                continue
+            self.breaker.record(time.perf_counter() - sent)
+            return response, attempt
+
+    def _create(self, request: Dict, priority: str = 'interactive'):
+        """Call the chat completion API and record the call."""
+        start = time.perf_counter()
+        response, retries = self._call_with_retry(request, start, priority)
+        self._settle(request, response)
+        self.metrics.record_call(time.perf_counter() - start, response, retries=retries)
+        return response
+
+    async def _create_async(self, request: Dict, async_client=None, priority: str = 'batch'):
+        """Async chat completion call, retrying on rate limits until the deadline.
+
+        Without an async client the sync client runs in a worker thread.
+        """
+        self._admit()
+        attempt = 0
+        tokens = estimate_tokens(request)
+        start = time.perf_counter()
+        deadline = self._deadline(start)
+        while True:
+            await asyncio.to_thread(
+                self.scheduler.acquire, priority, tokens, attempt > 0, self._remaining(deadline).get('timeout')
+            )
+            sent = time.perf_counter()
+            try:
+                if async_client is not None:
+                    response = await async_client.chat.completions.create(**request, **self._remaining(deadline))
+                else:
+                    response = await asyncio.to_thread(
+                        self.client.chat.completions.create, **request, **self._remaining(deadline)
+                    )
+            except Exception as e:
+                self._settle(request)
+                delay = self._retry_delay(e, attempt)
+                if delay is None or (deadline is not None and time.perf_counter() + delay >= deadline):
+                    self.breaker.record(time.perf_counter() - sent, failed=self._is_outage(e))
+                    self.metrics.record_call(time.perf_counter() - start, retries=attempt, error=True)
+                    raise
+                attempt += 1
+                self.scheduler.pause(delay)
+                continue
+            self.breaker.record(time.perf_counter() - sent)
+            self._settle(request, response)
+            self.metrics.record_call(time.perf_counter() - start, response, retries=attempt)
+            return response
+
+    @staticmethod
+    def _parse(response) -> Dict:
+        """Parse the JSON analysis out of a completion response."""
+        return json.loads(response.choices[0].message.content)
+
+    def analyze_ticket(self, user_query: str, priority: str = 'interactive') -> Optional[Dict]:
         """
         Analyze IT support ticket using Llama 3.3 70B.
-        
+
         Args:
             user_query: User's IT issue description
-            
+            priority: Scheduler lane for the API call ('interactive' or 'batch')
+
         Returns:
-            Dictionary containing category, urgency, solution, and routing info
+            Dictionary containing category, urgency, solution, and routing info;
+            a degraded local answer (or None with ``fallback`` off) if the
+            LLM call fails
         """
-        system_prompt = """You are an expert IT helpdesk AI assistant. Analyze the user's IT issue and provide a structured response.
+        cache_key, cached = self._lookup(user_query)
+        if cached is not None:
+            return cached
 
-Response must be valid JSON with this exact structure:
-{
-    "category": "one of: Software, Hardware, Network, Login/Access, Other",
-    "urgency": "one of: High, Medium, Low",
-    "solution": "detailed troubleshooting steps in 3-5 bullet points",
-    "department": "one of: Software Team, Hardware Team, Network Team, IT Security, General Support",
-    "knowledge_base_articles": ["relevant article 1", "relevant article 2"],
-    "confidence": 0.95
-}
+        try:
+            while True:
+                try:
+                    result, shared = self.single_flight.do(
+                        cache_key, lambda: self._analyze_uncached(cache_key, user_query, priority)
+                    )
+                    break
+                except _StreamAbandoned:
+                    continue  # Nobody finished that call; start (or join) another.
+            if shared:
+                self.metrics.record_coalesced()
+            # The published result is shared with every waiter; hand out copies.
+            return copy.deepcopy(result)
 
-Classification rules:
-- High urgency: System down, security breach, critical data loss, many users affected
-- Medium urgency: Single user unable to work, performance issues, software crashes
-- Low urgency: Enhancement requests, questions, minor inconveniences
+        except json.JSONDecodeError as e:
+            return self._failed(user_query, f"Failed to parse AI response: {e}")
+        except Exception as e:
+            return self._failed(user_query, f"Error analyzing ticket: {e}")
 
-Provide practical, actionable solutions."""
+    def _failed(self, user_query: str, message: str) -> Optional[Dict]:
+        """Return a degraded answer for a failed analysis, or report the error and return None."""
+        if self.fallback:
+            return self._fallback(user_query, message)
+        self._show_error(message)
+        return None
 
+    def _fallback(self, user_query: str, reason: str) -> Dict:
+        """Answer without the LLM: the classifier's best guess, else ``QUEUED_ANALYSIS``."""
+        analysis = self.fast_path.guess(user_query) if self.fast_path is not None else None
+        if analysis is not None:
+            analysis['source'] = 'fallback'
+        else:
+            analysis = copy.deepcopy(QUEUED_ANALYSIS)
+        analysis['degraded'] = True
+        analysis['fallback_reason'] = reason
+        self.metrics.record_fallback()
+        return analysis
+
+    def _analyze_uncached(self, cache_key: str, user_query: str, priority: str = 'interactive') -> Dict:
+        """Call the LLM for a query that missed every local lookup."""
+        # A call for the same query may have finished since our lookup.
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached['source'] = 'cache'
+            return cached
+        result = self._parse(self._create(self._request(user_query), priority))
+        self._remember(cache_key, user_query, result)
+        return result
+
+    def analyze_ticket_stream(self, user_query: str, priority: str = 'interactive') -> Iterator[Dict]:
+        """
+        Analyze a ticket, yielding results while the completion streams in.
+
+        Args:
+            user_query: User's IT issue description
+            priority: Scheduler lane for the API call ('interactive' or 'batch')
+
+        Yields:
+            ``{'type': 'field', 'name', 'value'}`` once a field is complete,
+            ``{'type': 'delta', 'name', 'text'}`` for partial string fields
+            (the solution streams this way), then a final
+            ``{'type': 'done', 'analysis'}`` or ``{'type': 'error', 'message'}``.
+            With ``fallback`` on a failure yields a degraded answer's
+            fields and ``done`` instead of ``error``.
+        """
+        cache_key, cached = self._lookup(user_query)
+        while cached is None:
+            call, leader = self.single_flight.begin(cache_key)
+            if leader:
+                for event in self._lead_stream(cache_key, user_query, call, priority):
+                    if event['type'] == 'error':
+                        cached = self._failed(user_query, event['message'])
+                        if cached is not None:
+                            break
+                    yield event
+                if cached is None:
+                    return
+                break
+            # Someone is already analyzing this query; wait for their result.
+            try:
+                cached = copy.deepcopy(self.single_flight.wait(call))
+            except _StreamAbandoned:
+                continue
+            except Exception as e:
+                cached = self._failed(user_query, f"Error analyzing ticket: {e}")
+                if cached is None:
+                    yield {'type': 'error', 'message': f"Error analyzing ticket: {e}"}
+                    return
+                break
+            self.metrics.record_coalesced()
+
+        for name, value in cached.items():
+            yield {'type': 'field', 'name': name, 'value': value}
+        yield {'type': 'done', 'analysis': cached}
+
+    def _lead_stream(self, cache_key: str, user_query: str, call, priority: str) -> Iterator[Dict]:
+        """Stream a fresh analysis, publishing its outcome to waiting callers."""
+        finished = False
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"IT Issue: {user_query}"}
-                ],
-                temperature=0.3,
-                max_tokens=1024,
-                top_p=0.9,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-            
-        except json.JSONDecodeError as e:
-            self._show_error(f"Failed to parse AI response: {e}")
-            return None
+            for event in self._stream_uncached(cache_key, user_query, priority):
+                if event['type'] == 'done':
+                    self.single_flight.finish(cache_key, call, copy.deepcopy(event['analysis']))
+                    finished = True
+                elif event['type'] == 'error':
+                    self.single_flight.finish(cache_key, call, error=RuntimeError(event['message']))
+                    finished = True
+                yield event
+        finally:
+            if not finished:
+                self.single_flight.finish(
+                    cache_key, call, error=_StreamAbandoned("Analysis stream was abandoned")
+                )
+
+    def _stream_uncached(self, cache_key: str, user_query: str, priority: str) -> Iterator[Dict]:
+        """Stream an analysis from the LLM (see ``analyze_ticket_stream``)."""
+        parser = IncrementalJSONParser()
+        content = []
+        usage = None
+        first_token = None
+        stream = None
+        result = None
+        retries = 0
+        start = time.perf_counter()
+        try:
+            request = self._stream_request(user_query)
+            stream, retries = self._call_with_retry(request, start, priority)
+            for chunk in stream:
+                x_groq = getattr(chunk, 'x_groq', None)
+                usage = getattr(chunk, 'usage', None) or getattr(x_groq, 'usage', None) or usage
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                text = chunk.choices[0].delta.content
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                content.append(text)
+                yield from parser.feed(text)
+            result = parser.fields if parser.done else json.loads("".join(content))
         except Exception as e:
-            self._show_error(f"Error analyzing ticket: {e}")
-            return None
-    
+            if stream is not None:
+                # Failed requests are recorded by _call_with_retry; this is a broken stream.
+                self.breaker.record(time.perf_counter() - start, failed=True)
+                self.metrics.record_call(
+                    time.perf_counter() - start, retries=retries, error=True, first_token=first_token
+                )
+            yield {'type': 'error', 'message': f"Error analyzing ticket: {e}"}
+            return
+        finally:
+            # A stream that broke or was abandoned (GeneratorExit) still holds
+            # its token reservation; _call_with_retry settles failed requests.
+            if stream is not None and result is None:
+                self._settle(request, {'usage': usage} if usage else None)
+
+        self.metrics.record_call(
+            time.perf_counter() - start, {'usage': usage}, retries=retries, first_token=first_token
+        )
+        self._settle(request, {'usage': usage})
+        self._remember(cache_key, user_query, result)
+        yield {'type': 'done', 'analysis': result}
+
+    async def _analyze_async(self, user_query: str, async_client=None) -> Dict:
+        """Analyze one ticket asynchronously, raising on failure."""
+        cache_key, cached = self._lookup(user_query)
+        if cached is not None:
+            return cached
+        response = await self._create_async(self._request(user_query), async_client)
+        result = self._parse(response)
+        self._remember(cache_key, user_query, result)
+        return result
+
+    def _open_async_client(self):
+        """Return (async client, whether we own it) for a batch run."""
+        if self.async_client is not None:
+            return self.async_client, False
+        if self._api_key is None:
+            return None, False
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=self._api_key, max_retries=0), True
+
+    async def analyze_tickets_batch_async(
+        self,
+        queries: List[str],
+        max_concurrency: int = 8
+    ) -> List[Optional[Dict]]:
+        """
+        Analyze many tickets concurrently.
+
+        Args:
+            queries: Ticket descriptions to analyze
+            max_concurrency: Maximum number of requests in flight
+
+        Returns:
+            Analyses in the same order as ``queries``; failed items are None
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async_client, owned = self._open_async_client()
+
+        async def run(query: str) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    return await self._analyze_async(query, async_client)
+                except Exception as e:
+                    failures.append(e)
+                    return None
+
+        failures = []
+        try:
+            results = await asyncio.gather(*(run(query) for query in queries))
+        finally:
+            if owned:
+                await async_client.close()
+
+        if failures:
+            self._show_error(
+                f"{len(failures)} of {len(queries)} tickets could not be analyzed "
+                f"(first error: {failures[0]})"
+            )
+        return list(results)
+
+    def analyze_tickets_batch(self, queries: List[str], max_concurrency: int = 8) -> List[Optional[Dict]]:
+        """Synchronous wrapper around ``analyze_tickets_batch_async``."""
+        return asyncio.run(self.analyze_tickets_batch_async(queries, max_concurrency))
+
     def _show_error(self, message: str):
         """Show error message using Streamlit if available."""
         try:
@@ -108,7 +628,26 @@ Provide practical, actionable solutions."""
             st.error(message)
         except ImportError:
             print(f"ERROR: {message}")
-    
+
+    def get_cache_stats(self) -> Dict:
+        """Get analysis cache hit/miss counters."""
+        stats = self.cache.stats()
+        if self.semantic_cache is not None:
+            stats['semantic'] = self.semantic_cache.stats()
+        return stats
+
     def get_token_usage(self) -> Dict:
-        """Get token usage statistics."""
-        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        """Get cumulative token usage reported by the API."""
+        return self.metrics.token_usage()
+
+    def get_metrics(self) -> Dict:
+        """Get call counts, token totals, retries, cache hits and latency percentiles."""
+        return self.metrics.snapshot()
+
+    def get_scheduler_stats(self) -> Dict:
+        """Get scheduler queue depth, throttling and wait times per priority lane."""
+        return self.scheduler.stats()
+
+    def get_breaker_stats(self) -> Dict:
+        """Get the circuit breaker's state and failure/trip counters."""
+        return self.breaker.stats()
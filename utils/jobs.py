@@ -0,0 +1,371 @@
+"""Durable background queue for ticket analysis."""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .scheduler import PRIORITY_LANES
+
+logger = logging.getLogger(__name__)
+
+# Fields copied from an analysis onto its ticket.
+ANALYSIS_FIELDS = ['category', 'urgency', 'solution', 'department', 'confidence', 'source']
+
+
+class JobQueue:
+    """SQLite-backed queue of ticket analysis jobs.
+
+    A job moves ``pending -> running -> done``. Claiming a job leases it
+    for ``lease_seconds``; a worker that dies mid-job lets the lease run
+    out and the job becomes claimable again, so nothing in flight is lost
+    across restarts. Failed jobs are retried with exponential backoff up
+    to ``max_attempts`` and then parked as ``dead`` (the dead-letter list)
+    until someone calls ``retry``. Ready jobs are claimed by priority
+    lane (``PRIORITY_LANES``) first, then oldest first. A job given only a
+    provisional answer is ``defer``red: it keeps that answer as its
+    result while it waits, ``pending``, to be tried again.
+    """
+
+    STATES = ['pending', 'running', 'done', 'dead']
+
+    def __init__(
+        self,
+        path: str = "data/jobs.db",
+        max_attempts: int = 3,
+        lease_seconds: float = 300.0,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0
+    ):
+        """Open (creating if needed) the queue database at ``path``."""
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Wakes this process's workers as soon as a job is enqueued.
+        self.wakeup = threading.Event()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "ticket_id TEXT NOT NULL, "
+                "user_query TEXT NOT NULL, "
+                "fields TEXT, "
+                "priority TEXT NOT NULL DEFAULT 'interactive', "
+                "lane INTEGER NOT NULL DEFAULT 0, "
+                "state TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "available_at REAL NOT NULL, "
+                "lease_until REAL, "
+                "error TEXT, "
+                "result TEXT, "
+                "created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'lane' not in existing:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority TEXT NOT NULL DEFAULT 'interactive'")
+                conn.execute("ALTER TABLE jobs ADD COLUMN lane INTEGER NOT NULL DEFAULT 0")
+            conn.execute("DROP INDEX IF EXISTS idx_jobs_claim")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(state, lane, available_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ticket ON jobs(ticket_id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a block inside BEGIN IMMEDIATE, rolling back on error."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        """Turn a jobs row into a dict with its JSON columns decoded."""
+        if row is None:
+            return None
+        job = dict(row)
+        job['fields'] = json.loads(job['fields']) if job['fields'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, ticket_id: str, user_query: str, fields: Optional[Dict] = None,
+                priority: str = 'interactive') -> int:
+        """Queue a ticket for analysis and return the job ID.
+
+        ``fields`` are written onto the ticket together with the analysis
+        (e.g. ``{'status': 'Resolved', 'resolved_by': 'AI'}``); ``priority``
+        is the lane the job and its LLM call are scheduled in.
+        """
+        if priority not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority lane: {priority}")
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (ticket_id, user_query, fields, priority, lane, state, available_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?)",
+                (ticket_id, user_query, json.dumps(fields) if fields else None,
+                 priority, PRIORITY_LANES[priority], now, now, now)
+            )
+        self.wakeup.set()
+        return cursor.lastrowid
+
+    def claim(self) -> Optional[Dict]:
+        """Lease the next ready job (highest lane, then oldest) to the caller, or return None."""
+        now = time.time()
+        with self._transaction() as conn:
+            # Jobs whose worker vanished become claimable again.
+            conn.execute(
+                "UPDATE jobs SET state = 'pending', lease_until = NULL, updated_at = ? "
+                "WHERE state = 'running' AND lease_until < ?",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE state = 'pending' AND available_at <= ? "
+                "ORDER BY lane, available_at, job_id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (now + self.lease_seconds, now, row['job_id'])
+            )
+            return self._job(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone())
+
+    def complete(self, job_id: int, result: Dict):
+        """Mark a job done and keep its analysis."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ?",
+                (json.dumps(result, default=str), time.time(), job_id)
+            )
+
+    def fail(self, job_id: int, error: str, retry: bool = True, result: Optional[Dict] = None):
+        """Record a failed attempt: back off and retry, or dead-letter the job.
+
+        A provisional ``result`` (a degraded analysis) is kept on the job.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            attempts = row['attempts']
+            if result is not None:
+                conn.execute("UPDATE jobs SET result = ? WHERE job_id = ?", (json.dumps(result, default=str), job_id))
+            if retry and attempts < self.max_attempts:
+                delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+                conn.execute(
+                    "UPDATE jobs SET state = 'pending', error = ?, available_at = ?, lease_until = NULL, "
+                    "updated_at = ? WHERE job_id = ?",
+                    (error, now + delay, now, job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET state = 'dead', error = ?, lease_until = NULL, updated_at = ? WHERE job_id = ?",
+                    (error, now, job_id)
+                )
+
+    def defer(self, job_id: int, result: Dict, reason: str, delay: Optional[float] = None):
+        """Keep a provisional result and run the job again after ``delay`` (default ``backoff_max``).
+
+        Unlike ``fail`` this doesn't use up an attempt: it is for outages,
+        not for problems with the job itself.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = MAX(attempts - 1, 0), result = ?, error = ?, "
+                "available_at = ?, lease_until = NULL, updated_at = ? WHERE job_id = ?",
+                (json.dumps(result, default=str), reason,
+                 now + (self.backoff_max if delay is None else delay), now, job_id)
+            )
+
+    def retry(self, job_id: int) -> bool:
+        """Put a dead-lettered job back in the queue. Returns False if it isn't dead."""
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, available_at = ?, updated_at = ? "
+                "WHERE job_id = ? AND state = 'dead'",
+                (now, now, job_id)
+            ).rowcount
+        if updated:
+            self.wakeup.set()
+        return bool(updated)
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """Return a job by ID."""
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def latest_for_ticket(self, ticket_id: str) -> Optional[Dict]:
+        """Return the most recent job for a ticket."""
+        row = self._connection().execute(
+            "SELECT * FROM jobs WHERE ticket_id = ? ORDER BY job_id DESC LIMIT 1", (ticket_id,)
+        ).fetchone()
+        return self._job(row)
+
+    def dead_letters(self, limit: int = 50) -> List[Dict]:
+        """Return the most recently dead-lettered jobs."""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE state = 'dead' ORDER BY updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        counts = dict.fromkeys(self.STATES, 0)
+        for row in self._connection().execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row['state']] = row['n']
+        return counts
+
+
+class AnalysisWorkerPool:
+    """Threads that pull jobs from a ``JobQueue`` and analyze them.
+
+    ``analyzer`` is anything with ``analyze_ticket(query, priority=...) ->
+    dict | None`` (a ``GroqClient``). Results are written back onto the ticket through
+    ``ticket_manager.update_ticket``; a failed analysis is retried by the
+    queue, and a ticket that no longer exists dead-letters its job. A
+    ``degraded`` analysis (the LLM was unavailable) is written without the
+    job's own fields, so nothing is resolved on a guess. While the
+    analyzer's ``breaker`` is open the job is deferred until it lets calls
+    through again; otherwise the attempt counts as a failure.
+    """
+
+    def __init__(self, queue: JobQueue, analyzer, ticket_manager, workers: int = 2, poll_interval: float = 1.0):
+        """Initialize the pool; call ``start`` to launch the threads."""
+        self.queue = queue
+        self.analyzer = analyzer
+        self.ticket_manager = ticket_manager
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> 'AnalysisWorkerPool':
+        """Launch the worker threads (no-op if already running)."""
+        if not self._threads:
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"analysis-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Ask the workers to exit and wait for them; a job in progress is finished first."""
+        self._stop.set()
+        self.queue.wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        """Claim and process jobs until the pool is stopped."""
+        while not self._stop.is_set():
+            # A failure anywhere in an iteration (a locked database, a write-back
+            # error, a failing fail()) must not kill the worker: log it and back
+            # off. A job left running is retried once its lease expires.
+            try:
+                job = self.queue.claim()
+                if job is not None:
+                    self.process(job)
+                    continue
+            except Exception:
+                logger.exception("Analysis worker iteration failed")
+            self.queue.wakeup.wait(self.poll_interval)
+            self.queue.wakeup.clear()
+
+    def process(self, job: Dict):
+        """Analyze one claimed job and record the outcome."""
+        try:
+            analysis = self.analyzer.analyze_ticket(job['user_query'], priority=job['priority'])
+            if not analysis:
+                raise RuntimeError("Analysis failed")
+            fields = {key: analysis[key] for key in ANALYSIS_FIELDS if key in analysis}
+            if not analysis.get('degraded'):
+                fields.update(job['fields'])
+            if not self.ticket_manager.update_ticket(job['ticket_id'], fields):
+                self.queue.fail(job['job_id'], f"Ticket {job['ticket_id']} not found", retry=False)
+                return
+            if analysis.get('degraded'):
+                reason = analysis.get('fallback_reason') or "LLM unavailable"
+                retry_in = self._retry_in()
+                if retry_in:
+                    self.queue.defer(job['job_id'], analysis, reason, retry_in)
+                else:
+                    self.queue.fail(job['job_id'], reason, result=analysis)
+                return
+            self.queue.complete(job['job_id'], analysis)
+        except Exception as e:
+            self.queue.fail(job['job_id'], str(e))
+
+    def _retry_in(self) -> float:
+        """Seconds until the analyzer's breaker lets calls through (0 if closed or absent)."""
+        breaker = getattr(self.analyzer, 'breaker', None)
+        return breaker.retry_in() if breaker is not None and breaker.state != 'closed' else 0.0
+
+
+_shared_queue = None
+_shared_pool = None
+_shared_jobs_lock = threading.Lock()
+
+
+def get_shared_job_queue() -> JobQueue:
+    """Return the process-wide job queue.
+
+    Stored at ``HELPDESK_JOBS_PATH`` (default ``data/jobs.db``); jobs are
+    dead-lettered after ``HELPDESK_JOB_MAX_ATTEMPTS`` (default 3) attempts.
+    """
+    global _shared_queue
+    with _shared_jobs_lock:
+        if _shared_queue is None:
+            _shared_queue = JobQueue(
+                os.getenv("HELPDESK_JOBS_PATH", "data/jobs.db"),
+                max_attempts=int(os.getenv("HELPDESK_JOB_MAX_ATTEMPTS", "3"))
+            )
+        return _shared_queue
+
+
+def get_shared_worker_pool(ticket_manager, analyzer) -> AnalysisWorkerPool:
+    """Return the process-wide worker pool, started on first use.
+
+    The first caller's ``ticket_manager`` and ``analyzer`` are used; the
+    pool size is ``HELPDESK_JOB_WORKERS`` (default 2).
+    """
+    global _shared_pool
+    queue = get_shared_job_queue()
+    with _shared_jobs_lock:
+        if _shared_pool is None:
+            _shared_pool = AnalysisWorkerPool(
+                queue, analyzer, ticket_manager,
+                workers=int(os.getenv("HELPDESK_JOB_WORKERS", "2"))
+            ).start()
+        return _shared_pool
@@ -0,0 +1,189 @@
+"""Incremental parser for a streamed JSON object."""
+import json
+from typing import Dict, List
+
+
+WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """Parses a single top-level JSON object as it arrives in chunks.
+
+    ``feed`` returns events as soon as they can be known:
+
+    - ``{'type': 'delta', 'name': key, 'text': ...}`` for each decoded
+      piece of a top-level string value while it is still streaming
+    - ``{'type': 'field', 'name': key, 'value': ...}`` once a top-level
+      value is complete
+
+    Text before the opening brace (e.g. a code fence) is ignored.
+    """
+
+    def __init__(self):
+        """Initialize parser state."""
+        self.fields = {}
+        self._buf = ""
+        self._pos = 0
+        self._state = 'start'
+        self._key = None
+        self._key_chars = []
+        self._value_chars = []
+        self._raw_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the object has been read."""
+        return self._state == 'done'
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk of text and return the events it completes."""
+        self._buf += chunk
+        events = []
+        while self._pos < len(self._buf) and self._state != 'done':
+            progressed = getattr(self, f"_state_{self._state}")(events)
+            if not progressed:
+                break
+        # Drop consumed text so long streams don't grow the buffer forever.
+        if self._state != 'raw_value' and self._pos > 4096:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        return events
+
+    def _skip_whitespace(self) -> bool:
+        while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self._buf)
+
+    def _state_start(self, events) -> bool:
+        index = self._buf.find('{', self._pos)
+        if index < 0:
+            self._pos = len(self._buf)
+            return False
+        self._pos = index + 1
+        self._state = 'key_or_end'
+        return True
+
+    def _state_key_or_end(self, events) -> bool:
+        if not self._skip_whitespace():
+            return False
+        char = self._buf[self._pos]
+        self._pos += 1
+        if char == '}':
+            self._state = 'done'
+        elif char == '"':
+            self._key_chars = []
+            self._state = 'key'
+        elif char != ',':
+            raise ValueError(f"Unexpected character {char!r} in JSON object")
+        return True
+
+    def _read_string(self, out: List[str]):
+        """Decode string characters into ``out``; return True at the closing quote."""
+        buf = self._buf
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if char == '"':
+                self._pos += 1
+                return True
+            if char != '\\':
+                end = self._pos
+                while end < len(buf) and buf[end] not in '"\\':
+                    end += 1
+                out.append(buf[self._pos:end])
+                self._pos = end
+                continue
+            escape = self._complete_escape()
+            if escape is None:
+                return None
+            out.append(json.loads(f'"{escape}"'))
+            self._pos += len(escape)
+        return None
+
+    def _complete_escape(self):
+        """Return the full escape sequence at the cursor, or None if incomplete."""
+        buf, pos = self._buf, self._pos
+        if pos + 1 >= len(buf):
+            return None
+        if buf[pos + 1] != 'u':
+            return buf[pos:pos + 2]
+        if pos + 6 > len(buf):
+            return None
+        code = int(buf[pos + 2:pos + 6], 16)
+        if 0xD800 <= code <= 0xDBFF:
+            if pos + 12 > len(buf):
+                return None
+            return buf[pos:pos + 12]
+        return buf[pos:pos + 6]
+
+    def _state_key(self, events) -> bool:
+        if not self._read_string(self._key_chars):
+            return False
+        self._key = "".join(self._key_chars)
+        self._state = 'colon'
+        return True
+
+    def _state_colon(self, events) -> bool:
+        if not self._skip_whitespace():
+            return False
+        if self._buf[self._pos] != ':':
+            raise ValueError("Expected ':' after object key")
+        self._pos += 1
+        self._state = 'value'
+        return True
+
+    def _state_value(self, events) -> bool:
+        if not self._skip_whitespace():
+            return False
+        if self._buf[self._pos] == '"':
+            self._pos += 1
+            self._value_chars = []
+            self._state = 'string_value'
+        else:
+            self._raw_start = self._pos
+            self._depth = 0
+            self._in_string = False
+            self._escaped = False
+            self._state = 'raw_value'
+        return True
+
+    def _state_string_value(self, events) -> bool:
+        before = len(self._value_chars)
+        finished = self._read_string(self._value_chars)
+        text = "".join(self._value_chars[before:])
+        if text:
+            events.append({'type': 'delta', 'name': self._key, 'text': text})
+        if not finished:
+            return False
+        self._complete("".join(self._value_chars), events)
+        return True
+
+    def _state_raw_value(self, events) -> bool:
+        buf = self._buf
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '[{':
+                self._depth += 1
+            elif char in ']}' and self._depth > 0:
+                self._depth -= 1
+            elif self._depth == 0 and (char in ',}' or char in WHITESPACE):
+                self._complete(json.loads(buf[self._raw_start:self._pos]), events)
+                return True
+            self._pos += 1
+        return False
+
+    def _complete(self, value, events):
+        self.fields[self._key] = value
+        events.append({'type': 'field', 'name': self._key, 'value': value})
+        self._state = 'key_or_end'
@@ -1,15 +1,49 @@
 """Knowledge base management for common IT issues."""
 import json
+import math
 import os
+import re
+import threading
+from collections import Counter, namedtuple
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .text import tokenize
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+# Everything built from one version of the file, swapped in as a unit.
+_Index = namedtuple('_Index', 'articles by_id by_category categories postings')
 
 
 class KnowledgeBase:
-    """Manages knowledge base articles for IT support."""
-    
+    """Manages knowledge base articles for IT support.
+
+    The JSON file is parsed once into memory along with a BM25 inverted
+    index over article titles and solutions. It is re-read only when its
+    mtime changes, so lookups never touch the disk.
+
+    BM25 term weights don't depend on the query, so each posting list stores
+    (article numbers, weights) arrays and a search is a few vector adds.
+    """
+
+    # BM25 parameters; title terms count ``TITLE_WEIGHT`` times.
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2
+
     def __init__(self, kb_path: str = "data/knowledge_base.json"):
         """Initialize knowledge base."""
         self.kb_path = kb_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._index = self._build_index({})
         self._ensure_knowledge_base()
+        self._refresh()
     
     def _ensure_knowledge_base(self):
         """Create default knowledge base if it doesn't exist."""
@@ -62,11 +96,101 @@ class KnowledgeBase:
             with open(self.kb_path, 'w') as f:
                 json.dump(default_kb, f, indent=2)
     
-    def get_articles_by_category(self, category: str) -> list:
-        """Retrieve knowledge base articles for a category."""
+    def _refresh(self):
+        """Rebuild the in-memory index if the file changed since the last load."""
         try:
-            with open(self.kb_path, 'r') as f:
-                kb = json.load(f)
-            return kb.get(category, [])
-        except Exception:
+            mtime = os.stat(self.kb_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.kb_path, 'r') as f:
+                    kb = json.load(f)
+            except (OSError, ValueError):
+                # Keep serving the last good copy while the file is rewritten.
+                if self._mtime is not None:
+                    return
+                kb = {}
+            self._index = self._build_index(kb)
+            self._mtime = mtime
+
+    def _build_index(self, kb: Dict[str, List[Dict]]) -> _Index:
+        """Assign article IDs and build the inverted index."""
+        articles, by_category, term_counts, lengths = [], {}, {}, []
+        for category, entries in kb.items():
+            for number, entry in enumerate(entries, start=1):
+                article = {
+                    'id': str(entry.get('id') or f"{_slug(category)}-{number}"),
+                    'category': category,
+                    **{k: v for k, v in entry.items() if k != 'id'}
+                }
+                doc = len(articles)
+                articles.append(article)
+                by_category.setdefault(category, []).append(article)
+                terms = Counter(tokenize(article.get('title', '')) * self.TITLE_WEIGHT)
+                terms.update(tokenize(article.get('solution', '')))
+                for term, tf in terms.items():
+                    term_counts.setdefault(term, []).append((doc, tf))
+                lengths.append(sum(terms.values()))
+
+        lengths = np.array(lengths, dtype=np.float64)
+        norms = self.K1 * (1 - self.B + self.B * lengths / lengths.mean()) if len(lengths) else lengths
+        postings = {}
+        for term, matches in term_counts.items():
+            docs = np.array([doc for doc, _ in matches], dtype=np.int64)
+            tfs = np.array([tf for _, tf in matches], dtype=np.float64)
+            idf = math.log(1 + (len(articles) - len(matches) + 0.5) / (len(matches) + 0.5))
+            postings[term] = (docs, idf * tfs * (self.K1 + 1) / (tfs + norms[docs]))
+
+        return _Index(
+            articles,
+            {article['id']: article for article in articles},
+            by_category,
+            np.array([article['category'] for article in articles], dtype=object),
+            postings
+        )
+
+    def search(self, query: str, k: int = 5, category: Optional[str] = None) -> List[Dict]:
+        """
+        Rank articles against a free-text query with BM25.
+
+        Args:
+            query: Ticket description or search terms
+            k: Maximum number of articles to return
+            category: Only return articles from this category
+
+        Returns:
+            Best matches first, each with ``id``, ``category``, ``title``,
+            ``solution`` and ``score``
+        """
+        self._refresh()
+        index = self._index
+        matches = [index.postings[term] for term in set(tokenize(query)) if term in index.postings]
+        if not matches or k <= 0:
             return []
+        scores = np.zeros(len(index.articles))
+        for docs, weights in matches:
+            scores[docs] += weights
+        if category is not None:
+            scores[index.categories != category] = 0.0
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        # Highest score first; ties keep file order.
+        ranked = sorted(candidates, key=lambda doc: (-scores[doc], doc))
+        return [{**index.articles[doc], 'score': round(float(scores[doc]), 4)} for doc in ranked]
+
+    def get_article(self, article_id: str) -> Optional[Dict]:
+        """Return one article by ID, or None."""
+        self._refresh()
+        article = self._index.by_id.get(article_id)
+        return dict(article) if article is not None else None
+
+    def get_articles_by_category(self, category: str) -> list:
+        """Retrieve knowledge base articles for a category."""
+        self._refresh()
+        return [dict(article) for article in self._index.by_category.get(category, [])]
@@ -0,0 +1,112 @@
+"""Inter-process and inter-thread file locking."""
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+class _LockState:
+    """Per-path lock state shared by every FileLock in this process."""
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_states = {}
+_states_guard = threading.Lock()
+
+
+def _state_for(path: str) -> _LockState:
+    """Return the shared lock state for a lock file path."""
+    key = os.path.abspath(path)
+    with _states_guard:
+        if key not in _states:
+            _states[key] = _LockState()
+        return _states[key]
+
+
+class FileLock:
+    """Exclusive lock held across threads and processes via a lock file.
+
+    Threads in one process serialize on a shared re-entrant lock; the OS
+    file lock is only taken by the outermost holder, so nested ``with``
+    blocks in the same thread don't deadlock.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, poll_interval: float = 0.005):
+        """Initialize lock for the given lock file path."""
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._state = _state_for(path)
+
+    def acquire(self):
+        """Acquire the lock, raising TimeoutError if it can't be taken in time."""
+        state = self._state
+        if not state.thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out waiting for lock {self.path}")
+        if state.depth > 0:
+            state.depth += 1
+            return
+
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    self._lock_fd(fd)
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                    time.sleep(self.poll_interval)
+        except BaseException:
+            state.thread_lock.release()
+            raise
+
+        state.fd = fd
+        state.depth = 1
+
+    def release(self):
+        """Release one level of the lock."""
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0:
+            fd, state.fd = state.fd, None
+            try:
+                self._unlock_fd(fd)
+            finally:
+                os.close(fd)
+        state.thread_lock.release()
+
+    @staticmethod
+    def _lock_fd(fd: int):
+        """Take a non-blocking exclusive OS lock on fd."""
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    @staticmethod
+    def _unlock_fd(fd: int):
+        """Release the OS lock on fd."""
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:  # pragma: no cover - Windows
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,183 @@
+"""Token, latency and cache instrumentation for LLM calls."""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of a sequence (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class ClientMetrics:
+    """Cumulative totals plus a rolling latency window for LLM calls.
+
+    Set ``HELPDESK_METRICS_PATH`` to have the shared instance export itself
+    (JSON, or Prometheus text for ``.prom``/``.txt`` paths) at most every
+    ``export_interval`` seconds.
+    """
+
+    def __init__(self, window: int = 1000, export_path: Optional[str] = None, export_interval: float = 10.0):
+        """Initialize empty metrics."""
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self._latencies = deque(maxlen=window)
+        self._first_token = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+        self._counters = {
+            'calls': 0,
+            'errors': 0,
+            'retries': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'total_tokens': 0,
+            'cache_hits': 0,
+            'semantic_cache_hits': 0,
+            'fast_path_hits': 0,
+            'cache_misses': 0,
+            'coalesced': 0,
+            'fallbacks': 0,
+        }
+
+    @staticmethod
+    def _usage(response) -> Dict[str, int]:
+        """Extract token usage from a completion response (object or dict)."""
+        usage = getattr(response, 'usage', None)
+        if usage is None and isinstance(response, dict):
+            usage = response.get('usage')
+        if usage is None:
+            return {}
+        get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+        return {key: int(get(key) or 0) for key in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+
+    def record_call(
+        self,
+        latency: float,
+        response=None,
+        retries: int = 0,
+        error: bool = False,
+        first_token: Optional[float] = None
+    ):
+        """Record one API call (including its retries).
+
+        ``first_token`` is the time to the first streamed content, if streaming.
+        """
+        usage = self._usage(response) if response is not None else {}
+        with self._lock:
+            self._counters['calls'] += 1
+            self._counters['errors'] += int(error)
+            self._counters['retries'] += retries
+            for key, value in usage.items():
+                self._counters[key] += value
+            self._latencies.append(latency)
+            if first_token is not None:
+                self._first_token.append(first_token)
+        self.maybe_export()
+
+    def record_cache(self, kind: Optional[str]):
+        """Record a local lookup: 'exact', 'semantic', 'fast_path' or None for a miss."""
+        key = {
+            'exact': 'cache_hits',
+            'semantic': 'semantic_cache_hits',
+            'fast_path': 'fast_path_hits'
+        }.get(kind, 'cache_misses')
+        with self._lock:
+            self._counters[key] += 1
+
+    def record_coalesced(self):
+        """Record an analysis served by another caller's identical in-flight call."""
+        with self._lock:
+            self._counters['coalesced'] += 1
+
+    def record_fallback(self):
+        """Record a degraded local answer given because the LLM call failed or was refused."""
+        with self._lock:
+            self._counters['fallbacks'] += 1
+
+    def token_usage(self) -> Dict[str, int]:
+        """Return cumulative token totals."""
+        with self._lock:
+            return {key: self._counters[key] for key in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+
+    def snapshot(self) -> Dict:
+        """Return counters and latency percentiles (seconds)."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = list(self._latencies)
+            first_token = list(self._first_token)
+        hits = counters['cache_hits'] + counters['semantic_cache_hits']
+        lookups = hits + counters['fast_path_hits'] + counters['cache_misses']
+        return {
+            **counters,
+            'cache_hit_rate': hits / lookups if lookups else 0.0,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+            'latency_window': len(latencies),
+            'first_token_p50': percentile(first_token, 50),
+            'first_token_p95': percentile(first_token, 95),
+        }
+
+    def to_prometheus(self, prefix: str = "helpdesk_llm") -> str:
+        """Render the snapshot in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        for key in ('calls', 'errors', 'retries', 'prompt_tokens', 'completion_tokens',
+                    'total_tokens', 'cache_hits', 'semantic_cache_hits', 'fast_path_hits',
+                    'cache_misses', 'coalesced', 'fallbacks'):
+            lines.append(f"# TYPE {prefix}_{key}_total counter")
+            lines.append(f"{prefix}_{key}_total {snap[key]}")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for q in (50, 95, 99):
+            lines.append(f'{prefix}_latency_seconds{{quantile="{q / 100}"}} {snap[f"latency_p{q}"]:.6f}')
+        lines.append(f"# TYPE {prefix}_first_token_seconds summary")
+        for q in (50, 95):
+            lines.append(f'{prefix}_first_token_seconds{{quantile="{q / 100}"}} {snap[f"first_token_p{q}"]:.6f}')
+        lines.append(f"# TYPE {prefix}_cache_hit_ratio gauge")
+        lines.append(f"{prefix}_cache_hit_ratio {snap['cache_hit_rate']:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """Write metrics to a file, as Prometheus text for .prom/.txt, else JSON."""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def maybe_export(self):
+        """Export to ``export_path`` if the export interval has elapsed."""
+        if not self.export_path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < self.export_interval:
+                return
+            self._last_export = now
+        self.export(self.export_path)
+
+
+_shared_metrics = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_shared_metrics() -> ClientMetrics:
+    """Return the process-wide LLM metrics."""
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            _shared_metrics = ClientMetrics(export_path=os.getenv("HELPDESK_METRICS_PATH") or None)
+        return _shared_metrics
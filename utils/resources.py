@@ -0,0 +1,90 @@
+"""Process-wide shared objects for the Streamlit pages and the API service.
+
+Streamlit reruns page scripts for every interaction and every browser
+session, so anything built in ``st.session_state`` is built once per
+user. These getters build each object once per process instead; all of
+them are safe to share between sessions' threads.
+"""
+import os
+import threading
+from typing import Optional
+
+import httpx
+
+from .classifier import get_shared_classifier
+from .groq_client import GroqClient
+from .knowledge_base import KnowledgeBase
+from .retrieval import get_retriever
+from .similarity import get_shared_semantic_cache
+from .ticket_manager import TicketManager
+
+_shared_http_client = None
+_shared_ticket_manager = None
+_shared_knowledge_base = None
+_shared_groq_client = None
+_shared_resources_lock = threading.RLock()
+
+
+def get_shared_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client used for Groq calls.
+
+    ``HELPDESK_HTTP_MAX_CONNECTIONS`` (default 20) caps open connections;
+    idle ones are kept alive for reuse.
+    """
+    global _shared_http_client
+    with _shared_resources_lock:
+        if _shared_http_client is None:
+            max_connections = int(os.getenv("HELPDESK_HTTP_MAX_CONNECTIONS", "20"))
+            _shared_http_client = httpx.Client(
+                # Same timeouts the Groq SDK uses for its own client
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                ),
+                follow_redirects=True
+            )
+        return _shared_http_client
+
+
+def get_shared_ticket_manager() -> TicketManager:
+    """Return the process-wide ticket manager."""
+    global _shared_ticket_manager
+    with _shared_resources_lock:
+        if _shared_ticket_manager is None:
+            # Append-only: status changes and queued analyses written back to a
+            # CSV add a row version instead of rewriting the whole file.
+            _shared_ticket_manager = TicketManager(append_only=True)
+        return _shared_ticket_manager
+
+
+def get_shared_knowledge_base() -> KnowledgeBase:
+    """Return the process-wide knowledge base (it reloads itself when the file changes)."""
+    global _shared_knowledge_base
+    with _shared_resources_lock:
+        if _shared_knowledge_base is None:
+            _shared_knowledge_base = KnowledgeBase()
+        return _shared_knowledge_base
+
+
+def get_shared_groq_client(
+    ticket_manager: Optional[TicketManager] = None,
+    knowledge_base: Optional[KnowledgeBase] = None
+) -> GroqClient:
+    """Return the process-wide Groq client with its caches, fast path and retriever.
+
+    Raises ValueError (and builds nothing) if no API key is configured.
+    """
+    global _shared_groq_client
+    with _shared_resources_lock:
+        if _shared_groq_client is None:
+            ticket_manager = ticket_manager or get_shared_ticket_manager()
+            knowledge_base = knowledge_base or get_shared_knowledge_base()
+            semantic_cache = get_shared_semantic_cache(ticket_manager)
+            _shared_groq_client = GroqClient(
+                semantic_cache=semantic_cache,
+                fast_path=get_shared_classifier(ticket_manager, knowledge_base),
+                retriever=get_retriever(knowledge_base, semantic_cache),
+                http_client=get_shared_http_client()
+            )
+        return _shared_groq_client
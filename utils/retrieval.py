@@ -0,0 +1,90 @@
+"""Local retrieval of grounding context for LLM ticket analysis."""
+import os
+from typing import Dict, List, Optional
+
+from .knowledge_base import KnowledgeBase
+from .similarity import SemanticCache
+
+
+class ContextRetriever:
+    """Finds knowledge base articles and similar past tickets for a query.
+
+    ``format_context`` renders them compactly for the prompt, and
+    ``resolve`` turns the article IDs the model cites back into real
+    titles and solution text, so the model never has to regenerate them.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        semantic_cache: Optional[SemanticCache] = None,
+        k_articles: int = 3,
+        k_tickets: int = 2,
+        min_similarity: float = 0.3,
+        max_solution_chars: int = 240
+    ):
+        """Initialize retriever over a knowledge base and optional ticket index."""
+        self.knowledge_base = knowledge_base
+        self.semantic_cache = semantic_cache
+        self.k_articles = k_articles
+        self.k_tickets = k_tickets
+        self.min_similarity = min_similarity
+        self.max_solution_chars = max_solution_chars
+
+    def retrieve(self, user_query: str) -> Dict[str, List[Dict]]:
+        """Return ``{'articles': [...], 'tickets': [...]}`` relevant to a query."""
+        articles = self.knowledge_base.search(user_query, k=self.k_articles)
+        tickets = []
+        if self.semantic_cache is not None and self.k_tickets > 0:
+            tickets = self.semantic_cache.nearest(user_query, self.k_tickets, self.min_similarity)
+        return {'articles': articles, 'tickets': tickets}
+
+    def format_context(self, context: Dict[str, List[Dict]]) -> str:
+        """Render retrieved context as a few compact prompt lines."""
+        lines = []
+        if context['articles']:
+            lines.append("Knowledge base articles:")
+            for article in context['articles']:
+                solution = str(article.get('solution', ''))[:self.max_solution_chars]
+                lines.append(f"[{article['id']}] {article.get('title', '')}: {solution}")
+        if context['tickets']:
+            lines.append("Similar past tickets (category/urgency/department):")
+            for ticket in context['tickets']:
+                lines.append(
+                    f"- {ticket.get('category')}/{ticket.get('urgency')}/{ticket.get('department')}"
+                )
+        return "\n".join(lines)
+
+    def resolve(self, result: Dict) -> Dict:
+        """Replace cited article IDs with real articles, in place.
+
+        Unknown IDs are dropped. The cited articles' solutions come first,
+        followed by any extra steps the model added.
+        """
+        articles = []
+        for article_id in result.pop('article_ids', None) or []:
+            article = self.knowledge_base.get_article(str(article_id))
+            if article is not None and article not in articles:
+                articles.append(article)
+        steps = [f"- {article['solution']}" for article in articles]
+        extra = str(result.get('solution') or '').strip()
+        if extra:
+            steps.append(extra)
+        result['solution'] = "\n".join(steps)
+        result['knowledge_base_articles'] = [article['title'] for article in articles]
+        return result
+
+
+def get_retriever(knowledge_base: KnowledgeBase, semantic_cache: Optional[SemanticCache] = None):
+    """Return a retriever for the app, or None with ``HELPDESK_RAG=off``.
+
+    ``HELPDESK_RAG_ARTICLES`` sets how many articles go into each prompt
+    (default 3).
+    """
+    if os.getenv("HELPDESK_RAG", "on").lower() in ("0", "off", "false"):
+        return None
+    return ContextRetriever(
+        knowledge_base,
+        semantic_cache,
+        k_articles=int(os.getenv("HELPDESK_RAG_ARTICLES", "3"))
+    )
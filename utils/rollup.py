@@ -0,0 +1,127 @@
+"""Day-bucketed rollup of ticket counts for the dashboard."""
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from .aggregates import TicketAggregates
+
+
+ROLLUP_DIMENSIONS = ['day', 'category', 'urgency', 'department', 'status', 'resolved_by']
+ROLLUP_MEASURES = ['count', 'confidence_sum', 'confidence_count']
+
+# Ticket columns a rollup is built from.
+ROLLUP_SOURCE_COLUMNS = ['timestamp'] + ROLLUP_DIMENSIONS[1:] + ['confidence']
+
+
+def _text(value) -> str:
+    """Return a dimension value as text, '' when missing."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value)
+
+
+def day_of(timestamp) -> str:
+    """Return the ``YYYY-MM-DD`` bucket of a stored timestamp ('' if missing)."""
+    if isinstance(timestamp, str):
+        return timestamp[:10]
+    if timestamp is None or pd.isna(timestamp):
+        return ''
+    return pd.Timestamp(timestamp).strftime('%Y-%m-%d')
+
+
+class TicketRollup:
+    """Ticket counts per day x category x urgency x department x status x resolved_by.
+
+    Each cell also carries the confidence sum and count, so KPI tiles can
+    be computed for any date range. Like ``TicketAggregates`` it is kept
+    current with ``add``/``remove`` on every insert and update; the
+    dashboard slices it by day instead of scanning the ticket rows.
+    Missing dimension values are bucketed under ''.
+    """
+
+    def __init__(self, cells: Optional[Dict[Tuple, List]] = None):
+        """Initialize the rollup, empty by default."""
+        self.cells = {key: list(value) for key, value in (cells or {}).items()}
+
+    @staticmethod
+    def key(row: dict) -> Tuple:
+        """Return the cell a ticket row is counted in."""
+        return (day_of(row.get('timestamp')),) + tuple(_text(row.get(d)) for d in ROLLUP_DIMENSIONS[1:])
+
+    @classmethod
+    def change(cls, row: dict, sign: int = 1) -> List:
+        """Return what counting a ticket row (or un-counting it with sign=-1) adds, as a ``to_dict`` cell."""
+        confidence = TicketAggregates._confidence(row)
+        if confidence is None:
+            return list(cls.key(row)) + [sign, 0.0, 0]
+        return list(cls.key(row)) + [sign, sign * confidence, sign]
+
+    def apply(self, changes: List[List]):
+        """Add cells in ``to_dict`` form (e.g. from ``change``) to the rollup."""
+        width = len(ROLLUP_DIMENSIONS)
+        for change in changes:
+            key = tuple(change[:width])
+            cell = self.cells.setdefault(key, [0, 0.0, 0])
+            for i, value in enumerate(change[width:]):
+                cell[i] += value
+            if cell[0] == 0:
+                del self.cells[key]
+
+    def add(self, row: dict, sign: int = 1):
+        """Count a ticket row (or un-count it with sign=-1)."""
+        self.apply([self.change(row, sign)])
+
+    def remove(self, row: dict):
+        """Un-count a ticket row."""
+        self.add(row, sign=-1)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TicketRollup':
+        """Build a rollup from a ticket frame (used for rebuilds)."""
+        if df.empty:
+            return cls()
+        timestamps = df['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(timestamps):
+            days = timestamps.dt.strftime('%Y-%m-%d')
+        else:
+            days = timestamps.astype(object).where(timestamps.notna()).str[:10]
+        keys = pd.DataFrame({'day': days.fillna('')})
+        for dimension in ROLLUP_DIMENSIONS[1:]:
+            keys[dimension] = df[dimension].astype(object).where(df[dimension].notna()).fillna('').astype(str)
+        keys['confidence'] = pd.to_numeric(df['confidence'], errors='coerce')
+        grouped = keys.groupby(ROLLUP_DIMENSIONS, sort=False)['confidence'].agg(['size', 'sum', 'count'])
+        return cls({
+            key: [int(size), float(total), int(count)]
+            for key, size, total, count in zip(grouped.index, grouped['size'], grouped['sum'], grouped['count'])
+        })
+
+    def frame(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Return the cells with ``start <= day <= end`` (inclusive ISO dates) as a frame."""
+        rows = [
+            key + tuple(value) for key, value in self.cells.items()
+            if (start is None or key[0] >= start) and (end is None or key[0] <= end)
+        ]
+        return pd.DataFrame(rows, columns=ROLLUP_DIMENSIONS + ROLLUP_MEASURES)
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-friendly dict."""
+        return {'cells': [list(key) + value for key, value in self.cells.items()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TicketRollup':
+        """Deserialize from ``to_dict`` output."""
+        width = len(ROLLUP_DIMENSIONS)
+        return cls({tuple(cell[:width]): cell[width:] for cell in data.get('cells', [])})
+
+
+def summarize(cube: pd.DataFrame) -> dict:
+    """Return KPI totals for a rollup frame, in the shape of ``TicketAggregates.summary``."""
+    resolved_by = cube.groupby('resolved_by', observed=True)['count'].sum() if not cube.empty else {}
+    confidence_count = int(cube['confidence_count'].sum()) if not cube.empty else 0
+    return {
+        'total': int(cube['count'].sum()) if not cube.empty else 0,
+        'ai_resolved': int(resolved_by.get('AI', 0)),
+        'escalated': int(resolved_by.get('Escalated', 0)),
+        'confidence_mean': (
+            float(cube['confidence_sum'].sum()) / confidence_count if confidence_count else 0.0
+        )
+    }
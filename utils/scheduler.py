@@ -0,0 +1,197 @@
+"""Rate-limit aware admission of LLM calls, shared by every session."""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from .metrics import percentile
+
+# Lane -> rank; lower ranks are served first.
+PRIORITY_LANES = {'interactive': 0, 'batch': 1}
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute, holding ``burst_seconds`` worth.
+
+    A rate of 0 means unlimited. The level may go negative when a call
+    turns out to cost more than was reserved; later callers then wait
+    for the debt to refill.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 60.0):
+        """Initialize a full bucket."""
+        self.rate_per_minute = rate_per_minute
+        self.capacity = rate_per_minute * burst_seconds / 60
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.rate_per_minute:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.rate_per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Return seconds until ``amount`` can be taken (0 if it can be now)."""
+        if not self.rate_per_minute:
+            return 0.0
+        self._refill(now)
+        # A request bigger than the bucket only has to wait for a full one.
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed * 60 / self.rate_per_minute)
+
+    def take(self, amount: float, now: float):
+        """Remove ``amount`` (may leave the bucket in debt)."""
+        if self.rate_per_minute:
+            self._refill(now)
+            self.level -= amount
+
+    def give(self, amount: float, now: float):
+        """Return ``amount`` that was reserved but not used."""
+        if self.rate_per_minute:
+            self._refill(now)
+            self.level = min(self.capacity, self.level + amount)
+
+
+class LLMScheduler:
+    """Orders LLM calls by priority lane and paces them under rate limits.
+
+    Every call ``acquire``s a slot first: one request from the
+    requests-per-minute bucket and an estimate of its tokens from the
+    tokens-per-minute bucket. Waiting callers are served strictly by
+    lane (``PRIORITY_LANES``), then retries before fresh calls, then
+    arrival order, so interactive users never queue behind a backlog
+    import. ``settle`` corrects the token estimate once the real usage is
+    known, and ``pause`` holds every lane after a 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        burst_seconds: float = 60.0,
+        window: int = 1000
+    ):
+        """Initialize; a limit of 0 disables that bucket.
+
+        ``burst_seconds`` is how much unused capacity may be saved up;
+        ``window`` is how many recent waits the percentiles cover.
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self._paused_until = 0.0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._waits = {lane: deque(maxlen=window) for lane in PRIORITY_LANES}
+        self._counters = {f'{lane}_{key}': 0 for lane in PRIORITY_LANES for key in ('calls', 'throttled')}
+        self._counters['pauses'] = 0
+
+    def acquire(self, lane: str = 'interactive', tokens: int = 0, retry: bool = False,
+                timeout: Optional[float] = None) -> float:
+        """Block until the call may go ahead; returns the seconds waited.
+
+        Raises ValueError for an unknown lane and TimeoutError if no slot
+        frees up within ``timeout`` seconds.
+        """
+        if lane not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority lane: {lane}")
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        entry = (PRIORITY_LANES[lane], 0 if retry else 1, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = None
+                    if self._waiting[0] == entry:
+                        delay = max(
+                            self._paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now)
+                        )
+                        if delay <= 0:
+                            self.requests.take(1, now)
+                            self.tokens.take(tokens, now)
+                            break
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise TimeoutError(f"No LLM capacity within {timeout:.0f}s")
+                        delay = min(delay, deadline - now) if delay is not None else deadline - now
+                    # Woken early whenever the queue head changes.
+                    self._condition.wait(delay)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self._waits[lane].append(waited)
+            self._counters[f'{lane}_calls'] += 1
+            if waited > 0.001:
+                self._counters[f'{lane}_throttled'] += 1
+        return waited
+
+    def settle(self, reserved: int, used: Optional[int]):
+        """Charge the difference between the tokens reserved and actually used."""
+        if used is None or used == reserved:
+            return
+        with self._condition:
+            now = time.monotonic()
+            if used < reserved:
+                self.tokens.give(reserved - used, now)
+            else:
+                self.tokens.take(used - reserved, now)
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold every lane for ``seconds`` (the API said we are over a limit)."""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._counters['pauses'] += 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Return queue depth per lane, call counts and wait-time percentiles (seconds)."""
+        with self._condition:
+            depth = {lane: 0 for lane in PRIORITY_LANES}
+            ranks = {rank: lane for lane, rank in PRIORITY_LANES.items()}
+            for rank, _, _ in self._waiting:
+                depth[ranks[rank]] += 1
+            waits = {lane: list(values) for lane, values in self._waits.items()}
+            stats = dict(self._counters)
+        for lane in PRIORITY_LANES:
+            stats[f'{lane}_queued'] = depth[lane]
+            stats[f'{lane}_wait_p50'] = percentile(waits[lane], 50)
+            stats[f'{lane}_wait_p95'] = percentile(waits[lane], 95)
+        stats['queued'] = sum(depth.values())
+        return stats
+
+
+def estimate_tokens(request: Dict) -> int:
+    """Rough token cost of a chat request: ~4 characters per prompt token plus max_tokens."""
+    prompt = sum(len(message.get('content') or '') for message in request.get('messages', []))
+    return prompt // 4 + int(request.get('max_tokens') or 0)
+
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_shared_scheduler() -> LLMScheduler:
+    """Return the process-wide LLM scheduler.
+
+    Limits come from ``HELPDESK_LLM_RPM`` and ``HELPDESK_LLM_TPM``
+    (requests and tokens per minute; 0, the default, means unlimited).
+    """
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = LLMScheduler(
+                requests_per_minute=float(os.getenv("HELPDESK_LLM_RPM", "0")),
+                tokens_per_minute=float(os.getenv("HELPDESK_LLM_TPM", "0"))
+            )
+        return _shared_scheduler
@@ -0,0 +1,70 @@
+"""Typed in-memory schema for ticket frames."""
+from typing import Dict, Iterable
+
+import pandas as pd
+
+
+# Known values of each low-cardinality column. Values outside these sets are
+# kept (appended as extra categories) rather than turned into NaN.
+CATEGORY_VALUES = {
+    'category': ['Software', 'Hardware', 'Network', 'Login/Access', 'Other'],
+    'urgency': ['High', 'Medium', 'Low'],
+    'department': ['Software Team', 'Hardware Team', 'Network Team', 'IT Security', 'General Support'],
+    'status': ['Open', 'In Progress', 'Resolved', 'Escalated', 'Closed'],
+    'resolved_by': ['AI', 'Escalated', 'Human'],
+    'source': ['llm', 'cache', 'semantic_cache', 'fast_path', 'fallback', 'queued'],
+}
+
+# Long free text; only loaded when asked for.
+TEXT_COLUMNS = ['user_query', 'solution']
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def category_dtype(column: str, observed: Iterable = ()) -> pd.CategoricalDtype:
+    """Return the categorical dtype for a column, extended with unknown observed values."""
+    known = CATEGORY_VALUES[column]
+    extras = sorted({v for v in observed if not pd.isna(v)} - set(known), key=str)
+    return pd.CategoricalDtype(known + extras)
+
+
+def _as_category(series: pd.Series, column: str) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        dtype = category_dtype(column, series.cat.categories)
+        return series.cat.set_categories(dtype.categories)
+    return series.astype(category_dtype(column, series.unique()))
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a typed copy of a ticket frame.
+
+    Low-cardinality columns become categoricals over ``CATEGORY_VALUES``,
+    ``timestamp`` becomes ``datetime64`` and ``confidence`` ``float32``;
+    other columns are left alone. Only columns present are converted.
+    """
+    typed = {}
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORY_VALUES:
+            series = _as_category(series, column)
+        elif column == 'timestamp' and not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, format=TIMESTAMP_FORMAT, errors='coerce')
+        elif column == 'confidence':
+            series = pd.to_numeric(series, errors='coerce').astype('float32')
+        typed[column] = series
+    return pd.DataFrame(typed, index=df.index)
+
+
+def memory_report(df: pd.DataFrame) -> Dict:
+    """Return per-column and total memory use (bytes, including string data)."""
+    usage = df.memory_usage(deep=True, index=False)
+    total = int(usage.sum())
+    return {
+        'rows': len(df),
+        'total_bytes': total,
+        'bytes_per_row': total / len(df) if len(df) else 0.0,
+        'columns': {
+            column: {'dtype': str(df[column].dtype), 'bytes': int(usage[column])}
+            for column in df.columns
+        }
+    }
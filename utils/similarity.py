@@ -0,0 +1,296 @@
+"""Offline text vectors and near-duplicate search for ticket analyses."""
+import os
+import threading
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from .classifier import LOCAL_SOURCES
+from .text import normalize_query, tokenize
+
+
+ANALYSIS_FIELDS = ['category', 'urgency', 'solution', 'department', 'confidence']
+
+# (bucket indices, weights) of one hashed text vector.
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+
+class HashedTfidfVectorizer:
+    """TF-IDF over hashed word and character-trigram features.
+
+    Features are hashed into ``n_features`` signed buckets with CRC32, so no
+    vocabulary has to be stored and vectors are stable across processes.
+    The default 2**16 buckets keep unrelated features from sharing a bucket,
+    so vectors are returned sparse: one ``(bucket indices, weights)`` pair
+    per text. IDF weights are learned by ``fit_transform`` and frozen
+    afterwards.
+    """
+
+    def __init__(self, n_features: int = 2 ** 16):
+        """Initialize vectorizer with the hashed feature dimension."""
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self._buckets = {}
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        """Return word and word-boundary character trigram features."""
+        words = tokenize(text)
+        features = list(words)
+        for word in words:
+            padded = f" {word} "
+            features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def _hashed_counts(self, text: str) -> SparseVector:
+        """Return (bucket indices, signed counts) for a text."""
+        buckets = {}
+        for feature in self._features(text):
+            bucket = self._buckets.get(feature)
+            if bucket is None:
+                h = zlib.crc32(feature.encode('utf-8'))
+                bucket = (h % self.n_features, 1.0 if (h >> 31) & 1 == 0 else -1.0)
+                if len(self._buckets) < 500_000:
+                    self._buckets[feature] = bucket
+            index, sign = bucket
+            buckets[index] = buckets.get(index, 0.0) + sign
+        return (
+            np.fromiter(buckets.keys(), dtype=np.int32, count=len(buckets)),
+            np.fromiter(buckets.values(), dtype=np.float32, count=len(buckets))
+        )
+
+    def fit_transform(self, texts: List[str]) -> List[SparseVector]:
+        """Learn smoothed IDF weights from a corpus and return its vectors."""
+        hashed = [self._hashed_counts(text) for text in texts]
+        doc_freq = np.zeros(self.n_features, dtype=np.float64)
+        for indices, _ in hashed:
+            doc_freq[indices] += 1
+        self.idf = (np.log((1 + len(texts)) / (1 + doc_freq)) + 1).astype(np.float32)
+        return self._weight(hashed)
+
+    def transform(self, texts: List[str]) -> List[SparseVector]:
+        """Return L2-normalized sparse TF-IDF vectors, one per text."""
+        return self._weight([self._hashed_counts(text) for text in texts])
+
+    def similarity(self, a: str, b: str) -> float:
+        """Return the cosine similarity of two texts under the current IDF weights."""
+        (a_indices, a_weights), (b_indices, b_weights) = self.transform([a, b])
+        dense = np.zeros(self.n_features, dtype=np.float32)
+        dense[a_indices] = a_weights
+        return float(dense[b_indices] @ b_weights)
+
+    def _weight(self, hashed: List[SparseVector]) -> List[SparseVector]:
+        """Apply sublinear TF, IDF and L2 normalization to hashed counts."""
+        if not hashed:
+            return []
+        lengths = np.array([len(indices) for indices, _ in hashed], dtype=np.int64)
+        indices = np.concatenate([indices for indices, _ in hashed])
+        counts = np.concatenate([counts for _, counts in hashed])
+        weights = np.sign(counts) * np.log1p(np.abs(counts)) * self.idf[indices]
+        rows = np.repeat(np.arange(len(hashed)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights.astype(np.float64) ** 2, minlength=len(hashed)))
+        np.divide(weights, norms[rows], out=weights, where=norms[rows] > 0)
+        ends = np.cumsum(lengths)[:-1]
+        return list(zip(np.split(indices, ends), np.split(weights.astype(np.float32), ends)))
+
+
+class SemanticCache:
+    """Reuses past analyses for paraphrased queries.
+
+    Query vectors are kept in an inverted index: for every hashed bucket,
+    the rows that use it and their weights. A lookup only reads the
+    posting lists of the query's own buckets (a few dozen), so its cost
+    follows how many stored queries share words with it, not the index
+    size. Rows ``add``ed later are scored directly and folded into the
+    index once they reach an eighth of it.
+    """
+
+    def __init__(self, threshold: float = 0.85, n_features: int = 2 ** 16):
+        """Initialize an empty index."""
+        self.threshold = threshold
+        self.vectorizer = HashedTfidfVectorizer(n_features)
+        self._size = 0
+        self._analyses = []
+        self._ticket_ids = []
+        # Indexed rows, column-major: the postings of bucket b are [ptr[b], ptr[b + 1]).
+        self._indexed = 0
+        self._postings_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        self._postings_rows = np.empty(0, dtype=np.int32)
+        self._postings_weights = np.empty(0, dtype=np.float32)
+        # Rows added since the postings were built.
+        self._pending = []
+        self._pending_flat = None
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def from_tickets(cls, df: pd.DataFrame, **kwargs) -> 'SemanticCache':
+        """Build an index from stored tickets that have an LLM analysis."""
+        cache = cls(**kwargs)
+        if df.empty:
+            return cache
+        # Only reuse LLM analyses: not fast-path or fallback answers, and not
+        # placeholders a queued (or dead) analysis job never filled in.
+        answered = df['user_query'].notna()
+        for field in ('category', 'solution'):
+            answered &= df[field].notna() & (df[field].astype(str).str.strip() != '')
+        if 'source' in df.columns:
+            answered &= ~df['source'].astype(str).isin(LOCAL_SOURCES)
+        df = df[answered]
+        df = df.assign(
+            _key=df['user_query'].astype(str).map(normalize_query),
+            # float32 in typed frames; keep stored analyses at their written precision
+            confidence=pd.to_numeric(df['confidence'], errors='coerce').astype('float64').round(4)
+        )
+        df = df.drop_duplicates('_key', keep='last')
+        vectors = cache.vectorizer.fit_transform(df['user_query'].astype(str).tolist())
+        with cache._lock:
+            cache._pending = vectors
+            cache._size = len(vectors)
+            cache._build_postings()
+            cache._analyses = [
+                {field: row[field] for field in ANALYSIS_FIELDS}
+                for row in df[ANALYSIS_FIELDS].astype(object).to_dict('records')
+            ]
+            cache._ticket_ids = df['ticket_id'].tolist()
+        return cache
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build_postings(self):
+        """Fold the pending rows into the posting lists. Caller holds the lock."""
+        new_rows, new_buckets, new_weights = self._pending_arrays()
+        old_buckets = np.repeat(
+            np.arange(self.vectorizer.n_features, dtype=np.int32), np.diff(self._postings_ptr)
+        )
+        buckets = np.concatenate([old_buckets, new_buckets])
+        # Stable, so each posting list stays in row order.
+        order = np.argsort(buckets, kind='stable')
+        self._postings_rows = np.concatenate([self._postings_rows, new_rows])[order]
+        self._postings_weights = np.concatenate([self._postings_weights, new_weights])[order]
+        self._postings_ptr[1:] = np.cumsum(np.bincount(buckets, minlength=self.vectorizer.n_features))
+        self._indexed = self._size
+        self._pending = []
+        self._pending_flat = None
+
+    def _scores(self, vector: SparseVector) -> np.ndarray:
+        """Return the cosine similarity of a query vector with every row. Caller holds the lock."""
+        indices, weights = vector
+        scores = np.zeros(self._size, dtype=np.float32)
+        ptr = self._postings_ptr
+        for index, weight in zip(indices, weights):
+            start, end = ptr[index], ptr[index + 1]
+            # A row appears at most once per posting list, so this never double-counts.
+            scores[self._postings_rows[start:end]] += weight * self._postings_weights[start:end]
+        if self._pending:
+            rows, buckets, row_weights = self._pending_arrays()
+            query = np.zeros(self.vectorizer.n_features, dtype=np.float32)
+            query[indices] = weights
+            scores[self._indexed:] = np.bincount(
+                rows - self._indexed, query[buckets] * row_weights, minlength=self._size - self._indexed
+            )
+        return scores
+
+    def _pending_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (row, bucket, weight) of every pending entry. Caller holds the lock."""
+        if self._pending_flat is None:
+            lengths = np.array([len(indices) for indices, _ in self._pending], dtype=np.int64)
+            self._pending_flat = (
+                np.repeat(np.arange(self._indexed, self._size, dtype=np.int32), lengths),
+                np.concatenate([indices for indices, _ in self._pending] + [np.empty(0, np.int32)]),
+                np.concatenate([weights for _, weights in self._pending] + [np.empty(0, np.float32)])
+            )
+        return self._pending_flat
+
+    def add(self, query: str, analysis: Dict, ticket_id: Optional[str] = None):
+        """Index a new query and its analysis."""
+        vector = self.vectorizer.transform([query])[0]
+        with self._lock:
+            self._pending.append(vector)
+            self._pending_flat = None
+            self._size += 1
+            self._analyses.append({field: analysis.get(field) for field in ANALYSIS_FIELDS})
+            self._ticket_ids.append(ticket_id)
+            if len(self._pending) >= max(64, self._indexed // 8):
+                self._build_postings()
+
+    def lookup(self, query: str) -> Optional[Dict]:
+        """Return the closest stored analysis if it clears the threshold.
+
+        The result is a copy of the stored analysis plus ``similarity`` and
+        ``matched_ticket_id``.
+        """
+        vector = self.vectorizer.transform([query])[0]
+        with self._lock:
+            if self._size == 0 or not len(vector[0]):
+                self._counters['misses'] += 1
+                return None
+            scores = self._scores(vector)
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            analysis = dict(self._analyses[best])
+            ticket_id = self._ticket_ids[best]
+
+        analysis['knowledge_base_articles'] = []
+        analysis['similarity'] = similarity
+        analysis['matched_ticket_id'] = ticket_id
+        return analysis
+
+    def nearest(self, query: str, k: int = 3, min_similarity: float = 0.3) -> List[Dict]:
+        """Return up to ``k`` stored analyses closest to a query, best first.
+
+        Unlike ``lookup`` this doesn't count as a cache hit or miss; each
+        result is a copy of the analysis plus ``similarity`` and ``ticket_id``.
+        """
+        vector = self.vectorizer.transform([query])[0]
+        with self._lock:
+            if self._size == 0 or k <= 0 or not len(vector[0]):
+                return []
+            scores = self._scores(vector)
+            top = np.argsort(-scores)[:k] if self._size <= k else np.argpartition(-scores, k - 1)[:k]
+            return [
+                {**self._analyses[i], 'similarity': float(scores[i]), 'ticket_id': self._ticket_ids[i]}
+                for i in sorted(top, key=lambda i: -scores[i])
+                if scores[i] >= min_similarity
+            ]
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and index size."""
+        with self._lock:
+            hits, misses = self._counters['hits'], self._counters['misses']
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'size': self._size
+        }
+
+
+_shared_semantic_cache = None
+_shared_semantic_lock = threading.Lock()
+
+
+def get_shared_semantic_cache(ticket_manager) -> Optional[SemanticCache]:
+    """Return the process-wide semantic cache, building it from stored tickets once.
+
+    Disabled with ``HELPDESK_SEMANTIC_CACHE=off``; the match threshold is
+    ``HELPDESK_SEMANTIC_THRESHOLD`` (cosine similarity, default 0.85; see
+    ``benchmarks/check_semantic_threshold.py`` before lowering it).
+    """
+    global _shared_semantic_cache
+    if os.getenv("HELPDESK_SEMANTIC_CACHE", "on").lower() in ("0", "off", "false"):
+        return None
+    with _shared_semantic_lock:
+        if _shared_semantic_cache is None:
+            _shared_semantic_cache = SemanticCache.from_tickets(
+                ticket_manager.load_tickets(['ticket_id', 'user_query', 'source'] + ANALYSIS_FIELDS),
+                threshold=float(os.getenv("HELPDESK_SEMANTIC_THRESHOLD", "0.85"))
+            )
+        return _shared_semantic_cache
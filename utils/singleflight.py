@@ -0,0 +1,93 @@
+"""Coalescing of concurrent identical calls."""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """One in-flight call that other callers can wait on."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run a function once per key among concurrent callers.
+
+    The first caller for a key (the leader) does the work; callers that
+    arrive while it is running wait for its outcome instead of repeating
+    it. The key is dropped as soon as the leader finishes, so nothing is
+    remembered afterwards (that is the cache's job) and a failure only
+    reaches the callers already waiting: the next call starts afresh.
+    Waiters give up with ``TimeoutError`` after ``timeout`` seconds.
+    """
+
+    def __init__(self, timeout: Optional[float] = 120.0):
+        """Initialize with no calls in flight."""
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._counters = {'leaders': 0, 'coalesced': 0, 'errors': 0, 'timeouts': 0}
+
+    def begin(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Join or start the call for ``key``; returns (call, whether we lead it).
+
+        A leader must call ``finish`` exactly once, even on failure.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._counters['coalesced'] += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self._counters['leaders'] += 1
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's outcome to its waiters and forget the key."""
+        call.result, call.error = result, error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if error is not None:
+                self._counters['errors'] += 1
+        call.done.set()
+
+    def wait(self, call: _Call, timeout: Optional[float] = None) -> Any:
+        """Wait for a call led by someone else and return (or raise) its outcome."""
+        timeout = self.timeout if timeout is None else timeout
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise TimeoutError(f"Identical request still running after {timeout:.0f}s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Return (``fn()``'s result, whether it came from another caller's run)."""
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call, timeout), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result, False
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being worked on."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """Return leader/coalesced/error/timeout counters and the in-flight count."""
+        with self._lock:
+            return {**self._counters, 'in_flight': len(self._calls)}
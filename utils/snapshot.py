@@ -0,0 +1,109 @@
+"""Columnar Parquet snapshots of the CSV ticket log."""
+import io
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+_META_KEY = b'helpdesk_snapshot'
+
+
+class TicketSnapshot:
+    """Parquet copy of a CSV ticket file up to a byte offset.
+
+    Between full rewrites the CSV only grows, so a snapshot covering the
+    first ``offset`` bytes stays valid as long as the file is the same one
+    (same inode); rows after the offset form a small delta that is parsed
+    on every read. Rewrites go through ``os.replace`` and change the inode,
+    which invalidates the snapshot. The inode and offset are stored in the
+    Parquet footer, so the snapshot is replaced with a single atomic rename.
+    """
+
+    def __init__(self, csv_path: str, columns: List[str], dtypes: Optional[Dict] = None):
+        """Initialize snapshot metadata for a CSV file (nothing is read yet)."""
+        self.path = f"{csv_path}.parquet"
+        self.columns = columns
+        self.dtypes = dtypes or {}
+        self._meta_cache = (None, None)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """True if pyarrow is installed."""
+        return pq is not None
+
+    def meta(self) -> Optional[dict]:
+        """Return ``{'inode', 'offset', 'rows', 'columns'}`` or None without a snapshot."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            cached_key, cached = self._meta_cache
+            if cached_key == key:
+                return cached
+        try:
+            metadata = pq.read_schema(self.path).metadata or {}
+            meta = json.loads(metadata[_META_KEY])
+        except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+            return None
+        with self._lock:
+            self._meta_cache = (key, meta)
+        return meta
+
+    def covers(self, inode: int, size: int) -> Optional[dict]:
+        """Return the snapshot metadata if it is a valid prefix of the given file."""
+        meta = self.meta()
+        if meta is None or meta.get('inode') != inode or meta.get('offset', 0) > size:
+            return None
+        if meta.get('columns') != self.columns:
+            return None
+        return meta
+
+    def read(self, columns: Optional[List[str]] = None, categorical: Iterable[str] = ()) -> pd.DataFrame:
+        """Read the snapshot rows, only materializing ``columns``.
+
+        ``categorical`` columns are decoded straight from their Parquet
+        dictionaries into pandas categoricals, without building one Python
+        string per row.
+        """
+        columns = columns or self.columns
+        table = pq.read_table(
+            self.path,
+            columns=columns,
+            read_dictionary=[column for column in columns if column in set(categorical)]
+        )
+        return table.to_pandas()
+
+    def write(self, df: pd.DataFrame, inode: int, offset: int):
+        """Atomically replace the snapshot with ``df`` covering ``offset`` CSV bytes."""
+        table = pa.Table.from_pandas(df.reindex(columns=self.columns), preserve_index=False)
+        meta = {'inode': inode, 'offset': offset, 'rows': len(df), 'columns': self.columns}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _META_KEY: json.dumps(meta).encode('utf-8')
+        })
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def read_tail(self, handle, offset: int, size: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Parse CSV bytes ``[offset, size)`` of an open binary file."""
+        if size <= offset:
+            return pd.DataFrame(columns=columns or self.columns)
+        handle.seek(offset)
+        data = io.BytesIO(handle.read(size - offset))
+        # Fixed dtypes, so a delta of numeric-looking text still parses as strings.
+        if offset == 0:
+            return pd.read_csv(data, usecols=columns, dtype=self.dtypes)
+        return pd.read_csv(data, header=None, names=self.columns, usecols=columns, dtype=self.dtypes)
@@ -0,0 +1,1127 @@
+"""Storage backends for ticket persistence."""
+import base64
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import pandas as pd
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .aggregates import AGGREGATE_FIELDS, TicketAggregates
+from .locking import FileLock
+from .rollup import ROLLUP_DIMENSIONS, ROLLUP_MEASURES, ROLLUP_SOURCE_COLUMNS, TicketRollup
+from .schema import CATEGORY_VALUES
+from .snapshot import TicketSnapshot
+
+
+COLUMNS = [
+    'ticket_id', 'timestamp', 'user_query', 'category',
+    'urgency', 'solution', 'department', 'status',
+    'resolved_by', 'confidence', 'source'
+]
+
+# Everything but confidence is text, whatever a CSV chunk happens to look like.
+CSV_DTYPES = {column: str for column in COLUMNS if column != 'confidence'}
+
+
+def empty_frame(columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Return an empty ticket frame with the standard (or given) columns."""
+    return pd.DataFrame(columns=columns or COLUMNS)
+
+
+def _concat_rows(head: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate row batches, keeping categoricals and typing all-empty columns."""
+    for column in tail.columns:
+        if tail[column].dtype == head[column].dtype:
+            continue
+        if isinstance(head[column].dtype, pd.CategoricalDtype):
+            categories = head[column].cat.categories.union(tail[column].dropna().unique())
+            head[column] = head[column].cat.set_categories(categories)
+            tail[column] = tail[column].astype(head[column].dtype)
+        elif tail[column].isna().all():
+            tail[column] = tail[column].astype(head[column].dtype)
+        elif head[column].isna().all():
+            head[column] = head[column].astype(tail[column].dtype)
+    return pd.concat([head, tail], ignore_index=True)
+
+
+def _check_columns(columns: Optional[List[str]]) -> List[str]:
+    """Validate a column projection, defaulting to every column."""
+    if columns is None:
+        return list(COLUMNS)
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown ticket columns: {', '.join(unknown)}")
+    return list(columns)
+
+
+def encode_cursor(timestamp: str, ticket_id: str) -> str:
+    """Return an opaque cursor for the position after the given row."""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, ticket_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Return the ``(timestamp, ticket_id)`` a cursor points after."""
+    try:
+        timestamp, ticket_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return str(timestamp), str(ticket_id)
+
+
+def _check_query(filters: Optional[Dict[str, List]], sort: str) -> Tuple[Dict[str, List], bool]:
+    """Validate query filters and sort order; returns (filters, descending)."""
+    if sort not in ('desc', 'asc'):
+        raise ValueError(f"Unknown sort order: {sort}")
+    filters = {column: list(values) for column, values in (filters or {}).items() if values is not None}
+    _check_columns(list(filters))
+    return filters, sort == 'desc'
+
+
+def _day_after(day: str) -> str:
+    """Return the ISO date following ``day`` (exclusive upper timestamp bound)."""
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def _match_rows(
+    df: pd.DataFrame,
+    filters: Dict[str, List],
+    start: Optional[str],
+    end: Optional[str],
+    timestamps: Optional[pd.Series] = None
+) -> pd.Series:
+    """Return the mask of rows passing the query filters and day bounds."""
+    if timestamps is None:
+        timestamps = df['timestamp'].astype(object).fillna('')
+    mask = pd.Series(True, index=df.index)
+    for column, values in filters.items():
+        mask &= df[column].isin(values)
+    if start is not None:
+        mask &= timestamps >= start
+    if end is not None:
+        mask &= timestamps < _day_after(end)
+    return mask
+
+
+class _PrefixReader(io.RawIOBase):
+    """Read-only view of the first ``size`` bytes of an open binary file."""
+
+    def __init__(self, handle, size: int):
+        self._handle = handle
+        self._left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self._handle.readinto(memoryview(buffer)[:min(len(buffer), self._left)])
+        self._left -= count
+        return count
+
+
+class TicketStore:
+    """Interface implemented by every ticket storage backend."""
+
+    # Whether ``query`` seeks to a page through an index instead of scanning.
+    INDEXED_QUERIES = False
+
+    def next_sequence(self, prefix: str) -> int:
+        """Atomically reserve the next sequence number for an ID prefix."""
+        raise NotImplementedError
+
+    def append(self, row: dict):
+        """Persist a new ticket row."""
+        raise NotImplementedError
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load all tickets as a DataFrame, reading only ``columns`` if given.
+
+        Low-cardinality columns may come back as categoricals.
+        """
+        raise NotImplementedError
+
+    def get(self, ticket_id: str) -> Optional[dict]:
+        """Return a single ticket, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def get_many(self, ticket_ids: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return the given tickets (in any order), reading only ``columns``."""
+        columns = _check_columns(columns)
+        read_columns = columns if 'ticket_id' in columns else ['ticket_id'] + columns
+        df = self.load(read_columns)
+        return df[df['ticket_id'].isin(list(ticket_ids))][columns].reset_index(drop=True)
+
+    def query(
+        self,
+        filters: Optional[Dict[str, List]] = None,
+        sort: str = 'desc',
+        limit: Optional[int] = 10,
+        cursor: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """Return one page of matching tickets and the cursor of the next page.
+
+        ``filters`` maps a column to its allowed values (an empty list
+        matches nothing); ``start``/``end`` are inclusive ISO days. Rows are
+        ordered by ``(timestamp, ticket_id)``, newest first for ``'desc'``,
+        and paged by keyset: passing the returned cursor continues after
+        the last row. The cursor is None on the last page; ``limit=None``
+        returns every match at once.
+
+        This generic version filters a projected ``load``, so every page
+        (the first as much as the hundredth) costs a scan of the whole
+        history; on the CSV backend that is the snapshot plus the delta.
+        Stores with ``INDEXED_QUERIES`` override it to seek straight to
+        the page, so large histories should use the SQLite backend.
+        """
+        columns = _check_columns(columns)
+        filters, descending = _check_query(filters, sort)
+        read_columns = list(dict.fromkeys(['timestamp', 'ticket_id'] + list(filters) + columns))
+        df = self.load(read_columns)
+
+        # Missing keys sort as '' (oldest) instead of breaking the comparisons.
+        keys = pd.DataFrame({
+            'timestamp': df['timestamp'].astype(object).fillna(''),
+            'ticket_id': df['ticket_id'].astype(object).fillna('')
+        })
+        timestamps, ticket_ids = keys['timestamp'], keys['ticket_id']
+        mask = _match_rows(df, filters, start, end, timestamps)
+        if cursor is not None:
+            after_timestamp, after_id = decode_cursor(cursor)
+            if descending:
+                mask &= (timestamps < after_timestamp) | ((timestamps == after_timestamp) & (ticket_ids < after_id))
+            else:
+                mask &= (timestamps > after_timestamp) | ((timestamps == after_timestamp) & (ticket_ids > after_id))
+
+        order = keys[mask].sort_values(['timestamp', 'ticket_id'], ascending=not descending).index
+        if limit is None or len(order) <= limit:
+            return df.loc[order, columns].reset_index(drop=True), None
+        order = order[:limit]
+        last = keys.loc[order[-1]]
+        return df.loc[order, columns].reset_index(drop=True), encode_cursor(last['timestamp'], last['ticket_id'])
+
+    def iter_chunks(
+        self,
+        filters: Optional[Dict[str, List]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        chunk_size: int = 50_000,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yield every matching ticket in frames of at most ``chunk_size`` rows.
+
+        Memory stays bounded by the chunk size however many tickets match;
+        the order is oldest first, as stored.
+        """
+        cursor = None
+        while True:
+            page, cursor = self.query(filters, 'asc', chunk_size, cursor, start, end, columns)
+            if not page.empty:
+                yield page
+            if cursor is None:
+                return
+
+    def update(self, ticket_id: str, fields: Dict) -> bool:
+        """Update fields of an existing ticket. Returns False if not found."""
+        raise NotImplementedError
+
+    def version(self) -> str:
+        """Return a token that changes whenever any ticket is added or updated."""
+        raise NotImplementedError
+
+    def aggregates(self) -> TicketAggregates:
+        """Return running counts per field value and the confidence sum."""
+        return TicketAggregates.from_frame(self.load())
+
+    def statistics(self) -> dict:
+        """Return raw totals: total, ai_resolved, escalated, fast_path, confidence_mean."""
+        return self.aggregates().summary()
+
+    def rollup(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Return the day-bucketed rollup between two ISO dates (inclusive)."""
+        return TicketRollup.from_frame(self.load(ROLLUP_SOURCE_COLUMNS)).frame(start, end)
+
+
+class CSVTicketStore(TicketStore):
+    """CSV-backed store with single-row appends and a persisted counter.
+
+    Every write happens under a ``FileLock`` on ``<csv_path>.lock``, so
+    several threads, Streamlit sessions or processes can share one file
+    without duplicating IDs or losing rows. With ``append_only=True``
+    updates are appended as new versions of the ticket row instead of
+    rewriting the file; readers keep the latest version of each ticket.
+    ``get`` (and so an append-only ``update``) reads just the ticket's
+    latest row through an in-memory map of ticket IDs to byte offsets,
+    which is extended incrementally as the file grows.
+
+    Running aggregates live in ``<csv_path>.stats.json`` together with the
+    CSV size they describe. The per-day rollup is held in memory: each
+    write appends just its change to ``<csv_path>.rollup.log``, and the
+    log is folded into ``<csv_path>.rollup.json`` once it outgrows
+    ``ROLLUP_LOG_BYTES``. Other processes replay the log lines they
+    haven't seen. If the recorded CSV size disagrees with the file (e.g.
+    it was edited by hand) the stats or rollup are rebuilt from the rows
+    once.
+
+    Reads are served from a Parquet snapshot (``<csv_path>.parquet``) plus
+    the rows appended since it was taken, so ``load(columns=...)`` only
+    parses the requested columns of the history. The snapshot is compacted
+    once the delta exceeds ``compact_bytes``; set ``HELPDESK_SNAPSHOT=off``
+    (or run without pyarrow) to always parse the CSV.
+
+    There is no row index, so ``query`` loads the filter and page columns
+    of every ticket for each page; keyset paging that stays flat as the
+    history grows needs ``SQLiteTicketStore``.
+    """
+
+    ROLLUP_LOG_BYTES = 1024 * 1024
+
+    def __init__(
+        self,
+        csv_path: str = "data/tickets.csv",
+        append_only: bool = False,
+        snapshot: Optional[bool] = None,
+        compact_bytes: int = 4 * 1024 * 1024
+    ):
+        """Initialize CSV store, creating the file with headers if needed."""
+        self.csv_path = csv_path
+        self.counter_path = f"{csv_path}.seq"
+        self.stats_path = f"{csv_path}.stats.json"
+        self.rollup_path = f"{csv_path}.rollup.json"
+        self.rollup_log_path = f"{csv_path}.rollup.log"
+        self._rollup_state = None
+        self._offset_index = None
+        self.append_only = append_only
+        if snapshot is None:
+            snapshot = os.getenv("HELPDESK_SNAPSHOT", "on").lower() not in ("0", "off", "false")
+        self.snapshot = (
+            TicketSnapshot(csv_path, COLUMNS, CSV_DTYPES) if snapshot and TicketSnapshot.available() else None
+        )
+        self.compact_bytes = compact_bytes
+        self._state_cache = {}
+        self.lock = FileLock(f"{csv_path}.lock")
+        os.makedirs(os.path.dirname(self.csv_path) or '.', exist_ok=True)
+        with self.lock:
+            if not os.path.exists(self.csv_path):
+                empty_frame().to_csv(self.csv_path, index=False)
+                self._write_aggregates(TicketAggregates())
+                self._write_rollup(TicketRollup())
+            else:
+                self._upgrade_header()
+
+    def _upgrade_header(self):
+        """Rewrite a CSV written with an older column set once. Caller holds the lock."""
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), None)
+        if header is None or header == COLUMNS:
+            return
+        df = pd.read_csv(self.csv_path)
+        self._replace_csv(df.reindex(columns=COLUMNS))
+
+    def _read_counter(self, prefix: str) -> int:
+        """Return the last number issued for an ID prefix.
+
+        The counter file holds the last ``(prefix, value)`` issued, so a new
+        day's prefix starts from 0 without reading the CSV. The CSV is only
+        scanned if the file is missing or corrupt, or the prefix went
+        backwards (e.g. the clock was set back).
+        """
+        try:
+            with open(self.counter_path, 'r') as f:
+                counter = json.load(f)
+            value = int(counter['value'])
+            if counter['prefix'] == prefix:
+                return value
+            if isinstance(counter['prefix'], str) and counter['prefix'] < prefix:
+                return 0
+        except (FileNotFoundError, ValueError, TypeError, KeyError, AttributeError):
+            pass
+        return self._max_sequence(prefix)
+
+    def _max_sequence(self, prefix: str) -> int:
+        """Return the highest sequence number already used with this prefix."""
+        try:
+            ids = self.load(['ticket_id'])['ticket_id'].dropna().astype(str)
+        except (FileNotFoundError, pd.errors.EmptyDataError, ValueError):
+            return 0
+        suffixes = ids[ids.str.startswith(prefix)].str[len(prefix):]
+        numbers = pd.to_numeric(suffixes, errors='coerce').dropna()
+        return int(numbers.max()) if not numbers.empty else 0
+
+    def _write_counter(self, prefix: str, value: int):
+        """Durably replace the persisted counter."""
+        tmp_path = f"{self.counter_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'prefix': prefix, 'value': value}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.counter_path)
+
+    @staticmethod
+    def _collapse_versions(df: pd.DataFrame) -> pd.DataFrame:
+        """Keep the latest version of each ticket, in first-seen order."""
+        if df.empty or not df['ticket_id'].duplicated().any():
+            return df
+        latest = df.drop_duplicates('ticket_id', keep='last').set_index('ticket_id')
+        order = df['ticket_id'].drop_duplicates(keep='first')
+        return latest.loc[order].reset_index()[list(df.columns)]
+
+    def next_sequence(self, prefix: str) -> int:
+        """Atomically reserve the next sequence number for an ID prefix."""
+        with self.lock:
+            count = self._read_counter(prefix) + 1
+            self._write_counter(prefix, count)
+        return count
+
+    def _append_row(self, row: dict):
+        """Append a single row to the CSV and fsync it. Caller holds the lock."""
+        values = [row.get(col, '') for col in COLUMNS]
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator='\n').writerow(['' if pd.isna(v) else v for v in values])
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, row: dict):
+        """Append a new ticket and fold it into the running aggregates."""
+        with self.lock:
+            aggregates = self._current_aggregates()
+            rollup = self._current_rollup()
+            self._append_row(row)
+            if aggregates is not None:
+                aggregates.add(row)
+            self._write_aggregates(aggregates)
+            self._log_rollup(rollup, [TicketRollup.change(row)])
+
+    def _read_state(self, path: str, fields: List[str]) -> Optional[dict]:
+        """Read a persisted JSON state file if it still describes the CSV, else None."""
+        try:
+            stat = os.stat(path)
+            csv_size = os.path.getsize(self.csv_path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size, csv_size)
+        cached_key, cached = self._state_cache.get(path, (None, None))
+        if cached_key == key:
+            return cached
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except ValueError:
+            return None
+        if data.get('csv_size') != csv_size or data.get('fields') != fields:
+            return None
+        self._state_cache[path] = (key, data)
+        return data
+
+    def _write_state(self, path: str, data: dict, fields: List[str]):
+        """Atomically persist a JSON state file for the current CSV size."""
+        data = {**data, 'fields': fields, 'csv_size': os.path.getsize(self.csv_path)}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            # dumps() uses the C encoder; dump() streams through the Python one
+            f.write(json.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _current_aggregates(self) -> Optional[TicketAggregates]:
+        """Read persisted aggregates if they still describe the CSV, else None."""
+        data = self._read_state(self.stats_path, AGGREGATE_FIELDS)
+        if data is None or data.get('version') != TicketAggregates.VERSION:
+            return None
+        return TicketAggregates.from_dict(data)
+
+    def _write_aggregates(self, aggregates: Optional[TicketAggregates]):
+        """Persist aggregates for the current CSV, rebuilding them if unknown."""
+        if aggregates is None:
+            aggregates = TicketAggregates.from_frame(self.load())
+        self._write_state(self.stats_path, aggregates.to_dict(), AGGREGATE_FIELDS)
+
+    def _current_rollup(self) -> Optional[TicketRollup]:
+        """Return the in-memory rollup if it still describes the CSV, else None. Caller holds the lock."""
+        state = self._refresh_rollup()
+        if state is None or state['csv_size'] != os.path.getsize(self.csv_path):
+            return None
+        return state['rollup']
+
+    def _refresh_rollup(self) -> Optional[dict]:
+        """Reload rollup.json if it was replaced and replay unseen log lines. Caller holds the lock."""
+        try:
+            stat = os.stat(self.rollup_path)
+        except FileNotFoundError:
+            self._rollup_state = None
+            return None
+        base = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        state = self._rollup_state
+        if state is None or state['base'] != base:
+            try:
+                with open(self.rollup_path, 'r') as f:
+                    data = json.load(f)
+            except ValueError:
+                data = {}
+            if data.get('fields') != ROLLUP_DIMENSIONS or 'generation' not in data:
+                self._rollup_state = None
+                return None
+            state = self._rollup_state = {
+                'base': base,
+                'generation': data['generation'],
+                'rollup': TicketRollup.from_dict(data),
+                'csv_size': data['csv_size'],
+                'log_offset': 0
+            }
+
+        try:
+            with open(self.rollup_log_path, 'rb') as f:
+                f.seek(state['log_offset'])
+                for line in f:
+                    entry = json.loads(line)
+                    state['log_offset'] += len(line)
+                    # Lines from before the last compaction are already in rollup.json.
+                    if entry['generation'] == state['generation']:
+                        state['rollup'].apply(entry['cells'])
+                        state['csv_size'] = entry['csv_size']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError):
+            # A torn line from a crashed writer: rebuild rather than guess.
+            self._rollup_state = None
+            return None
+        return state
+
+    def _log_rollup(self, rollup: Optional[TicketRollup], changes: List[List]):
+        """Apply a write's rollup changes and log them, rebuilding if unknown. Caller holds the lock."""
+        if rollup is None:
+            self._write_rollup(None)
+            return
+        state = self._rollup_state
+        rollup.apply(changes)
+        state['csv_size'] = os.path.getsize(self.csv_path)
+        line = json.dumps({'generation': state['generation'], 'csv_size': state['csv_size'], 'cells': changes})
+        # No fsync: a lost line leaves the log behind the CSV size, which forces a rebuild.
+        with open(self.rollup_log_path, 'ab') as f:
+            f.write(line.encode('utf-8') + b'\n')
+        state['log_offset'] += len(line) + 1
+        if state['log_offset'] > self.ROLLUP_LOG_BYTES:
+            self._write_rollup(rollup)
+
+    def _write_rollup(self, rollup: Optional[TicketRollup]):
+        """Persist the whole rollup and empty the log, rebuilding it if unknown. Caller holds the lock."""
+        if rollup is None:
+            rollup = TicketRollup.from_frame(self.load(ROLLUP_SOURCE_COLUMNS))
+        generation = uuid.uuid4().hex
+        self._write_state(self.rollup_path, {**rollup.to_dict(), 'generation': generation}, ROLLUP_DIMENSIONS)
+        open(self.rollup_log_path, 'wb').close()
+        stat = os.stat(self.rollup_path)
+        self._rollup_state = {
+            'base': (stat.st_ino, stat.st_mtime_ns, stat.st_size),
+            'generation': generation,
+            'rollup': rollup,
+            'csv_size': os.path.getsize(self.csv_path),
+            'log_offset': 0
+        }
+
+    def aggregates(self) -> TicketAggregates:
+        """Return persisted aggregates, rebuilding them once if stale."""
+        aggregates = self._current_aggregates()
+        if aggregates is not None:
+            return aggregates
+        with self.lock:
+            aggregates = self._current_aggregates()
+            if aggregates is None:
+                self._write_aggregates(None)
+                aggregates = self._current_aggregates()
+        return aggregates
+
+    def rollup(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Slice the in-memory rollup, catching up on the log and rebuilding it once if stale."""
+        with self.lock:
+            rollup = self._current_rollup()
+            if rollup is None:
+                self._write_rollup(None)
+                rollup = self._rollup_state['rollup']
+            return rollup.frame(start, end)
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load tickets from the snapshot and CSV delta, only reading ``columns``."""
+        columns = _check_columns(columns)
+        # ticket_id is needed to collapse append-only versions of a ticket.
+        read_columns = columns if 'ticket_id' in columns else ['ticket_id'] + columns
+        try:
+            df = self._read_rows(read_columns)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return empty_frame(columns)
+        return self._collapse_versions(df.reset_index(drop=True))[columns]
+
+    def _read_rows(self, columns: List[str]) -> pd.DataFrame:
+        """Read every stored row version, compacting the snapshot when due."""
+        if self.snapshot is None:
+            return pd.read_csv(self.csv_path, usecols=columns, dtype=CSV_DTYPES)[columns]
+
+        # Pin the file and its size under the lock so a concurrent append can't
+        # leave a half-written row in the range we parse.
+        with self.lock:
+            handle = open(self.csv_path, 'rb')
+            stat = os.fstat(handle.fileno())
+        with handle:
+            meta = self.snapshot.covers(stat.st_ino, stat.st_size)
+            offset = meta['offset'] if meta else 0
+            if meta is not None and stat.st_size - offset <= self.compact_bytes:
+                df = self.snapshot.read(columns, categorical=CATEGORY_VALUES)
+                if stat.st_size > offset:
+                    tail = self.snapshot.read_tail(handle, offset, stat.st_size, columns)
+                    df = _concat_rows(df, tail)
+                return df[columns]
+
+            # Compact: fold the delta (or the whole file) into a new snapshot.
+            rows = self.snapshot.read_tail(handle, offset, stat.st_size)
+            if meta is not None:
+                rows = _concat_rows(self.snapshot.read(categorical=CATEGORY_VALUES), rows)
+            # Older append-only versions never win again, so don't carry them.
+            rows = self._collapse_versions(rows.reset_index(drop=True))
+            self.snapshot.write(rows, stat.st_ino, stat.st_size)
+            return rows[columns]
+
+    def version(self) -> str:
+        """Identify the CSV contents by inode, size and mtime.
+
+        Appends grow the file and rewrites replace it (new inode), so any
+        change to the tickets changes the token.
+        """
+        stat = os.stat(self.csv_path)
+        return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _row_offsets(self) -> Dict[str, int]:
+        """Map ticket IDs to the byte offset of their latest row. Caller holds the lock.
+
+        Only the bytes appended since the last call are scanned; a rewritten
+        file (new inode) is scanned from the start. Quotes are counted so a
+        newline inside a quoted field doesn't end the row.
+        """
+        stat = os.stat(self.csv_path)
+        index = self._offset_index
+        if index is None or index['inode'] != stat.st_ino or index['size'] > stat.st_size:
+            index = self._offset_index = {'inode': stat.st_ino, 'size': 0, 'offsets': {}}
+        if index['size'] == stat.st_size:
+            return index['offsets']
+
+        offsets = index['offsets']
+        with open(self.csv_path, 'rb') as f:
+            f.seek(index['size'])
+            start = position = index['size']
+            head, quotes = None, 0
+            for line in f:
+                head = head or line
+                position += len(line)
+                quotes += line.count(b'"')
+                if quotes % 2:
+                    continue
+                if start > 0:  # offset 0 is the header
+                    ticket_id = head.split(b',', 1)[0].decode('utf-8')
+                    if ticket_id.startswith('"'):
+                        ticket_id = next(csv.reader([head.decode('utf-8')]))[0]
+                    offsets[ticket_id] = start
+                start, head, quotes = position, None, 0
+        # A torn last row (odd quotes at EOF) is picked up once it is complete.
+        index['size'] = start
+        return offsets
+
+    def get(self, ticket_id: str) -> Optional[dict]:
+        """Retrieve a ticket by ID, reading only its latest row."""
+        with self.lock:
+            offset = self._row_offsets().get(ticket_id)
+            if offset is None:
+                return None
+            with open(self.csv_path, 'rb') as f:
+                f.seek(offset)
+                record = f.readline()
+                while record.count(b'"') % 2:
+                    line = f.readline()
+                    if not line:
+                        break
+                    record += line
+        row = pd.read_csv(io.BytesIO(record), names=COLUMNS, header=None, dtype=CSV_DTYPES)
+        return row.iloc[0].to_dict()
+
+    def iter_chunks(
+        self,
+        filters: Optional[Dict[str, List]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        chunk_size: int = 50_000,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Stream matching tickets straight from the CSV in file order.
+
+        The file is pinned at its current size, so rows appended during the
+        export are left out rather than read half-written. In append-only
+        mode a first pass over ``ticket_id`` finds each ticket's latest
+        version; only that column is held for the whole history.
+        """
+        columns = _check_columns(columns)
+        filters, _ = _check_query(filters, 'asc')
+        read_columns = [c for c in COLUMNS if c in set(columns) | set(filters) | {'timestamp', 'ticket_id'}]
+        with self.lock:
+            handle = open(self.csv_path, 'rb')
+            size = os.fstat(handle.fileno()).st_size
+        with handle:
+            latest = None
+            if self.append_only:
+                ids = pd.read_csv(io.BufferedReader(_PrefixReader(handle, size)), usecols=['ticket_id'], dtype=str)
+                latest = ~ids['ticket_id'].duplicated(keep='last').to_numpy()
+                del ids
+                handle.seek(0)
+            reader = pd.read_csv(
+                io.BufferedReader(_PrefixReader(handle, size)),
+                usecols=read_columns,
+                dtype=CSV_DTYPES,
+                chunksize=chunk_size
+            )
+            position = 0
+            for chunk in reader:
+                mask = _match_rows(chunk, filters, start, end)
+                if latest is not None:
+                    mask &= latest[position:position + len(chunk)]
+                position += len(chunk)
+                if mask.any():
+                    yield chunk.loc[mask, columns].reset_index(drop=True)
+
+    def update(self, ticket_id: str, fields: Dict) -> bool:
+        """Update a ticket, appending a new version in append-only mode."""
+        with self.lock:
+            aggregates = self._current_aggregates()
+            rollup = self._current_rollup()
+            if self.append_only:
+                old = self.get(ticket_id)
+                if old is None:
+                    return False
+                new = {**old, **fields}
+                self._append_row(new)
+            else:
+                df = self.load()
+                mask = df['ticket_id'] == ticket_id
+                if not mask.any():
+                    return False
+                old = df[mask].iloc[0].to_dict()
+                new = {**old, **fields}
+                for key, value in fields.items():
+                    if isinstance(df[key].dtype, pd.CategoricalDtype):
+                        df[key] = df[key].astype(object)
+                    df.loc[mask, key] = value
+                self._replace_csv(df)
+
+            if aggregates is not None:
+                aggregates.remove(old)
+                aggregates.add(new)
+            self._write_aggregates(aggregates)
+            self._log_rollup(rollup, [TicketRollup.change(old, -1), TicketRollup.change(new)])
+        return True
+
+    def _replace_csv(self, df: pd.DataFrame):
+        """Atomically replace the CSV so readers never see a partial file.
+
+        The snapshot is rewritten from the same frame, since the new file
+        invalidates the old one anyway.
+        """
+        tmp_path = f"{self.csv_path}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.csv_path)
+        if self.snapshot is not None and self.snapshot.meta() is not None:
+            stat = os.stat(self.csv_path)
+            self.snapshot.write(df, stat.st_ino, stat.st_size)
+
+
+class SQLiteTicketStore(TicketStore):
+    """SQLite-backed store using WAL mode and indexed lookups."""
+
+    INDEXED_COLUMNS = ['timestamp', 'category', 'status', 'department']
+    INDEXED_QUERIES = True
+    # Stored in meta; a change forces the aggregate tables to be rebuilt.
+    AGGREGATES_VERSION = (
+        f"{TicketAggregates.VERSION};" + ",".join(AGGREGATE_FIELDS) + ";" + ",".join(ROLLUP_DIMENSIONS)
+    )
+
+    def __init__(self, db_path: str = "data/tickets.db", migrate_from: Optional[str] = None):
+        """Initialize SQLite store and optionally import an existing CSV once."""
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._initialize_schema()
+        if migrate_from:
+            self.migrate_from_csv(migrate_from)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a block inside BEGIN IMMEDIATE, rolling back on error."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _initialize_schema(self):
+        """Create tables and indexes if they don't exist."""
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tickets (
+                ticket_id TEXT PRIMARY KEY,
+                timestamp TEXT,
+                user_query TEXT,
+                category TEXT,
+                urgency TEXT,
+                solution TEXT,
+                department TEXT,
+                status TEXT,
+                resolved_by TEXT,
+                confidence REAL,
+                source TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS aggregate_counts (
+                field TEXT,
+                value TEXT,
+                count INTEGER,
+                PRIMARY KEY (field, value)
+            );
+            CREATE TABLE IF NOT EXISTS aggregate_totals (
+                name TEXT PRIMARY KEY,
+                value REAL
+            );
+            CREATE TABLE IF NOT EXISTS aggregate_rollup (
+                day TEXT,
+                category TEXT,
+                urgency TEXT,
+                department TEXT,
+                status TEXT,
+                resolved_by TEXT,
+                count INTEGER,
+                confidence_sum REAL,
+                confidence_count INTEGER,
+                PRIMARY KEY (day, category, urgency, department, status, resolved_by)
+            ) WITHOUT ROWID;
+        """)
+        for column in self.INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tickets_{column} ON tickets({column})")
+        # Keyset pagination walks this index in (timestamp, ticket_id) order.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_page ON tickets(timestamp, ticket_id)")
+        with self._transaction() as conn:
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(tickets)")}
+            for column in COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE tickets ADD COLUMN {column} TEXT")
+            ready = conn.execute("SELECT value FROM meta WHERE key = 'aggregates_ready'").fetchone()
+            if ready is None or ready[0] != self.AGGREGATES_VERSION:
+                self._rebuild_aggregates(conn)
+
+    def _rebuild_aggregates(self, conn: sqlite3.Connection):
+        """Recompute the aggregate tables from the ticket rows."""
+        conn.execute("DELETE FROM aggregate_counts")
+        conn.execute("DELETE FROM aggregate_totals")
+        conn.execute("DELETE FROM aggregate_rollup")
+        for field in AGGREGATE_FIELDS:
+            conn.execute(
+                f"INSERT INTO aggregate_counts (field, value, count) "
+                f"SELECT ?, {field}, COUNT(*) FROM tickets WHERE {field} IS NOT NULL AND {field} != '' "
+                f"GROUP BY {field}",
+                (field,)
+            )
+        conn.execute("""
+            INSERT INTO aggregate_totals (name, value)
+            SELECT 'total', COUNT(*) FROM tickets
+            UNION ALL SELECT 'confidence_sum', COALESCE(SUM(confidence), 0.0) FROM tickets
+            UNION ALL SELECT 'confidence_count', COUNT(confidence) FROM tickets
+        """)
+        dimensions = ", ".join(f"COALESCE({d}, '')" for d in ROLLUP_DIMENSIONS[1:])
+        conn.execute(f"""
+            INSERT INTO aggregate_rollup
+            SELECT COALESCE(substr(timestamp, 1, 10), ''), {dimensions},
+                   COUNT(*), COALESCE(SUM(confidence), 0.0), COUNT(confidence)
+            FROM tickets GROUP BY 1, 2, 3, 4, 5, 6
+        """)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregates_ready', ?)",
+            (self.AGGREGATES_VERSION,)
+        )
+
+    def _apply_aggregates(self, conn: sqlite3.Connection, row: dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) one row from the aggregate tables."""
+        delta = TicketAggregates()
+        delta.add(row, sign)
+        for name in ('total', 'confidence_sum', 'confidence_count'):
+            conn.execute(
+                "INSERT INTO aggregate_totals (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, getattr(delta, name))
+            )
+        for field, values in delta.counts.items():
+            for value, count in values.items():
+                conn.execute(
+                    "INSERT INTO aggregate_counts (field, value, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT(field, value) DO UPDATE SET count = count + excluded.count",
+                    (field, value, count)
+                )
+        conn.execute("DELETE FROM aggregate_counts WHERE count = 0")
+
+        rollup = TicketRollup()
+        rollup.add(row, sign)
+        (key, cell), = rollup.cells.items()
+        conn.execute(
+            "INSERT INTO aggregate_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET count = count + excluded.count, "
+            "confidence_sum = confidence_sum + excluded.confidence_sum, "
+            "confidence_count = confidence_count + excluded.confidence_count",
+            (*key, *cell)
+        )
+        conn.execute(
+            f"DELETE FROM aggregate_rollup WHERE count = 0 AND "
+            f"{' AND '.join(f'{d} = ?' for d in ROLLUP_DIMENSIONS)}",
+            key
+        )
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        """Advance the data version inside the writing transaction."""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('data_version', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def version(self) -> str:
+        """Return the data version counter, bumped by every committed write."""
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return str(row[0]) if row else "0"
+
+    def migrate_from_csv(self, csv_path: str) -> int:
+        """Import tickets from a CSV file once. Returns the number of rows imported."""
+        conn = self._connection()
+        if not os.path.exists(csv_path):
+            return 0
+
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_csv'").fetchone():
+                return 0
+            df = CSVTicketStore(csv_path).load()
+            rows = [
+                tuple(None if pd.isna(row[col]) else row[col] for col in COLUMNS)
+                for row in df.to_dict('records')
+            ]
+            conn.executemany(
+                f"INSERT OR IGNORE INTO tickets ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_csv', ?)", (csv_path,))
+            self._rebuild_aggregates(conn)
+            self._bump_version(conn)
+        return len(rows)
+
+    def next_sequence(self, prefix: str) -> int:
+        """Atomically reserve the next sequence number for an ID prefix.
+
+        The counter row is seeded from the highest existing ticket ID with
+        the prefix (a primary key range scan), so IDs imported from CSV or
+        issued by an older counter are never reused.
+        """
+        key = f"sequence:{prefix}"
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                seed = conn.execute(
+                    "SELECT MAX(CAST(substr(ticket_id, ?) AS INTEGER)) FROM tickets "
+                    "WHERE ticket_id >= ? AND ticket_id < ?",
+                    (len(prefix) + 1, prefix, prefix + "\uffff")
+                ).fetchone()[0]
+                value = (seed or 0) + 1
+            else:
+                value = int(row[0]) + 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        return value
+
+    def append(self, row: dict):
+        """Insert a new ticket row and update the aggregates in one transaction."""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._transaction() as conn:
+            conn.execute(
+                f"INSERT INTO tickets ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                tuple(row.get(col) for col in COLUMNS)
+            )
+            self._apply_aggregates(conn, row, 1)
+            self._bump_version(conn)
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load all tickets in insertion order, selecting only ``columns``."""
+        columns = _check_columns(columns)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM tickets ORDER BY rowid",
+            self._connection()
+        )
+        return df if not df.empty else empty_frame(columns)
+
+    def get(self, ticket_id: str) -> Optional[dict]:
+        """Retrieve specific ticket by ID using the primary key index."""
+        row = self._connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM tickets WHERE ticket_id = ?", (ticket_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_many(self, ticket_ids: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return the given tickets by primary key, selecting only ``columns``."""
+        columns = _check_columns(columns)
+        ticket_ids = list(ticket_ids)
+        frames = []
+        # Stay well under SQLite's bound-parameter limit.
+        for start in range(0, len(ticket_ids), 500):
+            batch = ticket_ids[start:start + 500]
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM tickets "
+                f"WHERE ticket_id IN ({', '.join('?' for _ in batch)})",
+                self._connection(),
+                params=batch
+            ))
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else empty_frame(columns)
+
+    def query(
+        self,
+        filters: Optional[Dict[str, List]] = None,
+        sort: str = 'desc',
+        limit: Optional[int] = 10,
+        cursor: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """Return one page of matching tickets, walking the (timestamp, ticket_id) index.
+
+        Each page reads at most ``limit + 1`` rows past the cursor (plus the
+        rows the filters skip), however long the history is. When a filter
+        on an indexed column matches only a sliver of the table (per the
+        aggregate counts), its matches are read through that index and
+        sorted instead of skipping through the whole history.
+        """
+        columns = _check_columns(columns)
+        filters, descending = _check_query(filters, sort)
+        where, params = [], []
+        for column, values in filters.items():
+            if not values:
+                return empty_frame(columns), None
+            where.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(_day_after(end))
+        if cursor is not None:
+            where.append(f"(timestamp, ticket_id) {'<' if descending else '>'} (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        order = 'DESC' if descending else 'ASC'
+        read_columns = list(dict.fromkeys(columns + ['timestamp', 'ticket_id']))
+        sql = (
+            f"SELECT {', '.join(read_columns)} FROM tickets INDEXED BY {self._page_index(filters)}"
+            f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+            f" ORDER BY timestamp {order}, ticket_id {order}"
+        )
+        if limit is not None:
+            # One extra row tells whether there is a next page.
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        df = pd.read_sql_query(sql, self._connection(), params=params)
+        if df.empty:
+            return empty_frame(columns), None
+        if limit is None or len(df) <= limit:
+            return df[columns], None
+        last = df.iloc[limit - 1]
+        return df.iloc[:limit][columns], encode_cursor(last['timestamp'], last['ticket_id'])
+
+    def _page_index(self, filters: Dict[str, List], selective: float = 0.02) -> str:
+        """Pick the index a page query should use."""
+        candidates = [c for c in filters if c in self.INDEXED_COLUMNS and c in AGGREGATE_FIELDS]
+        if not candidates:
+            return "idx_tickets_page"
+        aggregates = self.aggregates()
+        matches = {
+            column: sum(aggregates.counts[column].get(str(value), 0) for value in filters[column])
+            for column in candidates
+        }
+        column = min(matches, key=matches.get)
+        if matches[column] < selective * aggregates.total:
+            return f"idx_tickets_{column}"
+        return "idx_tickets_page"
+
+    def update(self, ticket_id: str, fields: Dict) -> bool:
+        """Update fields of a ticket by primary key, adjusting the aggregates."""
+        fields = {k: v for k, v in fields.items() if k in COLUMNS and k != 'ticket_id'}
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM tickets WHERE ticket_id = ?", (ticket_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            if not fields:
+                return True
+            old = dict(row)
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            conn.execute(
+                f"UPDATE tickets SET {assignments} WHERE ticket_id = ?",
+                (*fields.values(), ticket_id)
+            )
+            self._apply_aggregates(conn, old, -1)
+            self._apply_aggregates(conn, {**old, **fields}, 1)
+            self._bump_version(conn)
+        return True
+
+    def aggregates(self) -> TicketAggregates:
+        """Read the maintained aggregate tables."""
+        conn = self._connection()
+        totals = dict(conn.execute("SELECT name, value FROM aggregate_totals").fetchall())
+        counts = {}
+        for field, value, count in conn.execute("SELECT field, value, count FROM aggregate_counts"):
+            counts.setdefault(field, {})[value] = count
+        return TicketAggregates(
+            total=int(totals.get('total', 0)),
+            confidence_sum=totals.get('confidence_sum', 0.0),
+            confidence_count=int(totals.get('confidence_count', 0)),
+            counts=counts
+        )
+
+    def rollup(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Read the maintained rollup table, using its primary key for the day range."""
+        query = f"SELECT {', '.join(ROLLUP_DIMENSIONS + ROLLUP_MEASURES)} FROM aggregate_rollup WHERE 1 = 1"
+        params = []
+        if start is not None:
+            query += " AND day >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND day <= ?"
+            params.append(end)
+        return pd.read_sql_query(query, self._connection(), params=params)
@@ -0,0 +1,73 @@
+"""Text normalization helpers shared by caching and retrieval."""
+import re
+
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a user query for exact-match lookups.
+
+    Lowercases, collapses whitespace and drops trailing punctuation, so
+    "I forgot my password!" and "i forgot  my password" share a key.
+    """
+    text = _WHITESPACE.sub(" ", (text or "").strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could do does for from has have i i'm
+im in into is it its me my of on or our so that the their them then there
+this to was we were what when which will with would you your
+keep keeps working work issue problem please help get got
+""".split())
+
+# Kept as a "not_" marker on the word they negate, so "VPN is not
+# connecting" and "VPN is connecting" don't tokenize alike.
+NEGATIONS = frozenset("""
+no not never cant cannot unable wont dont doesnt didnt isnt arent wasnt
+""".split())
+
+# Spellings folded into one word before tokenizing ("log in" -> "login").
+_COMPOUNDS = [
+    (re.compile(r"\b(?:log|sign)[\s-]?(?:in|on)\b"), "login"),
+    (re.compile(r"\bwi[\s-]?fi\b"), "wifi"),
+    (re.compile(r"\be-mail\b"), "email"),
+]
+
+_SUFFIXES = ('ing', 'ed', 'es', 's')
+
+
+def stem(word: str) -> str:
+    """Strip a common English suffix ("crashing", "crashes" -> "crash")."""
+    if word.endswith('ss'):
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Split text into stemmed lowercase word tokens, dropping stopwords.
+
+    A negation is folded into the word it negates ("can't log in" ->
+    ``['not_login']``); with nothing after it, it negates the word before
+    it ("login not working").
+    """
+    text = (text or "").lower()
+    for pattern, replacement in _COMPOUNDS:
+        text = pattern.sub(replacement, text)
+    tokens, negated = [], False
+    for word in _WORD.findall(text.replace("'", "")):
+        if word in NEGATIONS:
+            negated = True
+        elif word not in STOPWORDS:
+            tokens.append(f"not_{stem(word)}" if negated else stem(word))
+            negated = False
+    if negated and tokens and not tokens[-1].startswith("not_"):
+        tokens[-1] = f"not_{tokens[-1]}"
+    return tokens
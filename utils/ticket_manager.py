@@ -1,42 +1,62 @@
-"""Ticket management and CSV persistence."""
-import pandas as pd
+"""Ticket management on top of a pluggable storage backend."""
 import os
-from datetime import datetime
-from typing import Optional
+import pandas as pd
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .export import iter_export
+from .rollup import summarize
+from .schema import TEXT_COLUMNS, apply_schema, memory_report
+from .storage import COLUMNS, CSVTicketStore, SQLiteTicketStore, TicketStore
 
 
 class TicketManager:
-    """Manages ticket data with CSV persistence."""
-    
-    def __init__(self, csv_path: str = "data/tickets.csv"):
-        """Initialize ticket manager with CSV file path."""
+    """Manages ticket data through a CSV or SQLite storage backend.
+
+    The backend is chosen with ``backend`` ('csv', 'sqlite' or a
+    ``TicketStore`` instance), falling back to the ``HELPDESK_STORAGE``
+    environment variable and then to CSV. The SQLite backend imports the
+    existing CSV the first time it is opened.
+
+    Loaded frames are typed (see ``utils.schema``): categoricals for the
+    low-cardinality columns, ``datetime64`` timestamps and ``float32``
+    confidence. The long text columns are left out unless asked for and
+    can be fetched for just the rows being shown with ``load_text``.
+    """
+
+    def __init__(
+        self,
+        csv_path: str = "data/tickets.csv",
+        append_only: bool = False,
+        backend: Union[str, TicketStore, None] = None,
+        db_path: Optional[str] = None
+    ):
+        """Initialize ticket manager with its storage backend."""
         self.csv_path = csv_path
-        self._ensure_data_directory()
-        self._initialize_csv()
-    
-    def _ensure_data_directory(self):
-        """Create data directory if it doesn't exist."""
-        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
-    
-    def _initialize_csv(self):
-        """Create CSV with headers if it doesn't exist."""
-        if not os.path.exists(self.csv_path):
-            df = pd.DataFrame(columns=[
-                'ticket_id', 'timestamp', 'user_query', 'category', 
-                'urgency', 'solution', 'department', 'status', 
-                'resolved_by', 'confidence'
-            ])
-            df.to_csv(self.csv_path, index=False)
-    
-    def generate_ticket_id(self) -> str:
-        """Generate unique ticket ID."""
-        df = self.load_tickets()
-        count = len(df) + 1
-        return f"TKT-{datetime.now().strftime('%Y%m%d')}-{count:04d}"
+        self.store = self._create_store(backend, append_only, db_path)
+
+    def _create_store(self, backend, append_only: bool, db_path: Optional[str]) -> TicketStore:
+        """Build the configured storage backend."""
+        if isinstance(backend, TicketStore):
+            return backend
+
+        backend = (backend or os.getenv("HELPDESK_STORAGE", "csv")).lower()
+        if backend == "csv":
+            return CSVTicketStore(self.csv_path, append_only=append_only)
+        if backend == "sqlite":
+            db_path = db_path or f"{os.path.splitext(self.csv_path)[0]}.db"
+            return SQLiteTicketStore(db_path, migrate_from=self.csv_path)
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    def generate_ticket_id(self, now: Optional[datetime] = None) -> str:
+        """Reserve and return the next unique ticket ID for the day."""
+        prefix = f"TKT-{(now or datetime.now()).strftime('%Y%m%d')}-"
+        count = self.store.next_sequence(prefix)
+        return f"{prefix}{count:04d}"
     
     def save_ticket(self, ticket_data: dict) -> str:
         """
-        Save new ticket to CSV.
+        Save new ticket to the storage backend.
         
         Args:
             ticket_data: Dictionary containing ticket information
@@ -44,11 +64,12 @@ class TicketManager:
         Returns:
             Generated ticket ID
         """
-        ticket_id = self.generate_ticket_id()
+        now = datetime.now()
+        ticket_id = self.generate_ticket_id(now)
         
         new_ticket = {
             'ticket_id': ticket_id,
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': now.strftime('%Y-%m-%d %H:%M:%S'),
             'user_query': ticket_data.get('user_query', ''),
             'category': ticket_data.get('category', 'Other'),
             'urgency': ticket_data.get('urgency', 'Low'),
@@ -56,63 +77,196 @@ class TicketManager:
             'department': ticket_data.get('department', 'General Support'),
             'status': ticket_data.get('status', 'Resolved'),
             'resolved_by': ticket_data.get('resolved_by', 'AI'),
-            'confidence': ticket_data.get('confidence', 0.0)
+            'confidence': ticket_data.get('confidence', 0.0),
+            'source': ticket_data.get('source', 'llm')
         }
         
-        df = self.load_tickets()
-        df = pd.concat([df, pd.DataFrame([new_ticket])], ignore_index=True)
-        df.to_csv(self.csv_path, index=False)
+        self.store.append(new_ticket)
         
         return ticket_id
     
-    def load_tickets(self) -> pd.DataFrame:
-        """Load all tickets from CSV."""
-        try:
-            return pd.read_csv(self.csv_path)
-        except (FileNotFoundError, pd.errors.EmptyDataError):
-            return pd.DataFrame(columns=[
-                'ticket_id', 'timestamp', 'user_query', 'category', 
-                'urgency', 'solution', 'department', 'status', 
-                'resolved_by', 'confidence'
-            ])
+    def load_tickets(self, columns: Optional[List[str]] = None, include_text: bool = False) -> pd.DataFrame:
+        """
+        Load all tickets as a typed frame.
+
+        Args:
+            columns: Columns to read; defaults to every non-text column
+            include_text: Also read ``user_query`` and ``solution`` when
+                ``columns`` isn't given
+
+        Returns:
+            DataFrame with one row per ticket
+        """
+        if columns is None:
+            columns = [c for c in COLUMNS if include_text or c not in TEXT_COLUMNS]
+        return apply_schema(self.store.load(columns))
+
+    @property
+    def indexed_queries(self) -> bool:
+        """Whether pages come from an index rather than a scan of every ticket."""
+        return self.store.INDEXED_QUERIES
+
+    def query(
+        self,
+        filters: Optional[Dict[str, List]] = None,
+        sort: str = 'desc',
+        limit: Optional[int] = 10,
+        cursor: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Return one page of tickets, newest first by default.
+
+        Args:
+            filters: Column -> allowed values (an empty list matches nothing)
+            sort: 'desc' (newest first) or 'asc', by timestamp then ticket ID
+            limit: Page size; None returns every match
+            cursor: Cursor returned with the previous page
+            start: First day to include (inclusive)
+            end: Last day to include (inclusive)
+            columns: Columns to return; defaults to every non-text column
+
+        Returns:
+            Tuple of the typed page and the cursor of the next page (None on
+            the last page)
+        """
+        if columns is None:
+            columns = [c for c in COLUMNS if c not in TEXT_COLUMNS]
+        page, next_cursor = self.store.query(
+            filters=filters,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None,
+            columns=columns
+        )
+        return apply_schema(page), next_cursor
+
+    def export(
+        self,
+        fmt: str = 'csv',
+        filters: Optional[Dict[str, List]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        chunk_size: int = 50_000
+    ) -> Iterator[bytes]:
+        """
+        Stream matching tickets (every column) as an export file.
+
+        Args:
+            fmt: 'csv', 'csv.gz' or 'parquet'
+            filters: Column -> allowed values, as in ``query``
+            start: First day to include (inclusive)
+            end: Last day to include (inclusive)
+            chunk_size: Tickets read and encoded at a time
+
+        Returns:
+            Iterator of byte chunks; nothing is read until it is consumed
+        """
+        frames = self.store.iter_chunks(
+            filters=filters,
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None,
+            chunk_size=chunk_size,
+            columns=COLUMNS
+        )
+        return iter_export(frames, fmt, COLUMNS)
+
+    def load_text(self, ticket_ids: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load the text columns (plus ``ticket_id``) for specific tickets only."""
+        columns = ['ticket_id'] + [c for c in (columns or TEXT_COLUMNS) if c != 'ticket_id']
+        return self.store.get_many(ticket_ids, columns)
+
+    @staticmethod
+    def memory_report(df: pd.DataFrame) -> dict:
+        """Return per-column and total memory use of a loaded frame."""
+        return memory_report(df)
     
+    def data_version(self) -> str:
+        """Return a token that changes whenever tickets are added or updated."""
+        return self.store.version()
+
     def get_ticket_by_id(self, ticket_id: str) -> Optional[dict]:
         """Retrieve specific ticket by ID."""
-        df = self.load_tickets()
-        ticket = df[df['ticket_id'] == ticket_id]
-        if not ticket.empty:
-            return ticket.iloc[0].to_dict()
-        return None
+        return self.store.get(ticket_id)
     
-    def update_ticket_status(self, ticket_id: str, status: str, department: str = None):
+    def update_ticket(self, ticket_id: str, fields: dict) -> bool:
+        """Update arbitrary fields of a ticket. Returns False if it doesn't exist."""
+        fields = {key: value for key, value in fields.items() if key in COLUMNS and key != 'ticket_id'}
+        return self.store.update(ticket_id, fields)
+
+    def update_ticket_status(self, ticket_id: str, status: str, department: str = None) -> bool:
         """Update ticket status and optionally reassign department."""
-        df = self.load_tickets()
-        mask = df['ticket_id'] == ticket_id
-        df.loc[mask, 'status'] = status
+        fields = {'status': status}
         if department:
-            df.loc[mask, 'department'] = department
-            df.loc[mask, 'resolved_by'] = 'Escalated'
-        df.to_csv(self.csv_path, index=False)
+            fields['department'] = department
+            fields['resolved_by'] = 'Escalated'
+        return self.update_ticket(ticket_id, fields)
     
+    def get_aggregates(self) -> dict:
+        """Return ticket counts by resolved_by, category, urgency, department and status."""
+        return self.store.aggregates().counts
+
+    def load_rollup(self, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """
+        Load the per-day rollup of ticket counts.
+
+        Args:
+            start: First day to include (inclusive); defaults to the first ticket
+            end: Last day to include (inclusive); defaults to the last ticket
+
+        Returns:
+            DataFrame with one row per day x category x urgency x department
+            x status x resolved_by, and ``count``, ``confidence_sum`` and
+            ``confidence_count`` columns
+        """
+        cube = self.store.rollup(
+            start.isoformat() if start else None,
+            end.isoformat() if end else None
+        )
+        cube = apply_schema(cube)
+        cube['day'] = pd.to_datetime(cube['day'], format='%Y-%m-%d', errors='coerce')
+        return cube
+
+    @staticmethod
+    def rollup_statistics(cube: pd.DataFrame) -> dict:
+        """Return the KPI statistics (as in ``get_statistics``) of a rollup slice."""
+        totals = summarize(cube)
+        total = totals['total']
+        return {
+            'total_tickets': total,
+            'ai_resolved': totals['ai_resolved'],
+            'escalated': totals['escalated'],
+            'resolution_rate': totals['ai_resolved'] / total * 100 if total else 0.0,
+            'avg_confidence': totals['confidence_mean']
+        }
+
     def get_statistics(self) -> dict:
-        """Calculate key statistics from tickets."""
-        df = self.load_tickets()
+        """Return key statistics from the incrementally maintained aggregates."""
+        totals = self.store.statistics()
         
-        if df.empty:
+        if totals['total'] == 0:
             return {
                 'total_tickets': 0,
                 'ai_resolved': 0,
                 'escalated': 0,
                 'resolution_rate': 0.0,
-                'avg_confidence': 0.0
+                'avg_confidence': 0.0,
+                'fast_path': 0,
+                'fast_path_rate': 0.0
             }
         
         stats = {
-            'total_tickets': len(df),
-            'ai_resolved': len(df[df['resolved_by'] == 'AI']),
-            'escalated': len(df[df['resolved_by'] == 'Escalated']),
-            'resolution_rate': (len(df[df['resolved_by'] == 'AI']) / len(df) * 100) if len(df) > 0 else 0,
-            'avg_confidence': df['confidence'].mean() if 'confidence' in df.columns else 0.0
+            'total_tickets': totals['total'],
+            'ai_resolved': totals['ai_resolved'],
+            'escalated': totals['escalated'],
+            'resolution_rate': totals['ai_resolved'] / totals['total'] * 100,
+            'avg_confidence': totals['confidence_mean'],
+            'fast_path': totals['fast_path'],
+            'fast_path_rate': totals['fast_path'] / totals['total'] * 100
         }
         
         return stats